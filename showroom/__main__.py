@@ -0,0 +1,349 @@
+# showroom/__main__.py
+# showroom のユースケースを ID で実行するランチャー
+#
+#   python -m showroom 009                 # ユースケースを実行（デーモンが起動していればデーモンで実行）
+#   python -m showroom 009 --no-daemon     # 常にこのプロセスで実行
+#   python -m showroom daemon --workers 4  # ウォームなワーカーを事前に fork しておくデーモンを起動
+#   python -m showroom list                # ユースケースの一覧
+#
+# 毎回 `python showroom/usecase-XXX/main.py` を起動すると、agents / openai / pydantic / dotenv の
+# import とクライアントの準備に数秒かかります。デーモンはこれらを一度だけ済ませてから
+# ワーカーを fork し、Unix ドメインソケット経由でリクエストを受け付けます。
+# ユースケースのエージェントは事前に作りません（ワーカーが main.py を実行するたびに作られます）。
+# クライアントは標準入出力のファイルディスクリプタをそのままワーカーに渡すので、出力は通常の実行と同じです。
+#
+# このファイルは起動を軽くするため、標準ライブラリ以外をトップレベルで import しません。
+# デーモンは fork と AF_UNIX を使うため、Linux / macOS でのみ動作します。
+import argparse
+import array
+import ast
+import gc
+import glob
+import json
+import os
+import runpy
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional, Set
+
+SHOWROOM_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOCKET = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or "/tmp", f"showroom-{os.getuid()}.sock"
+)
+STDIO_FDS = [0, 1, 2]
+
+
+def usecase_path(usecase_id: str) -> str:
+    number = usecase_id.replace("usecase-", "").zfill(3)
+    path = os.path.join(SHOWROOM_DIR, f"usecase-{number}", "main.py")
+    if not os.path.exists(path):
+        raise SystemExit(f"ユースケースが見つかりません: {usecase_id}")
+    return path
+
+
+def list_usecases() -> List[str]:
+    paths = sorted(glob.glob(os.path.join(SHOWROOM_DIR, "usecase-*", "main.py")))
+    return [os.path.basename(os.path.dirname(path)) for path in paths]
+
+
+# --- ユースケースの実行（ランチャー単体でも、デーモンのワーカーでも使う） ---
+
+
+def run_usecase(path: str, args: List[str]) -> int:
+    # `python showroom/usecase-XXX/main.py args...` と同じ状態で実行する
+    sys.argv = [path] + list(args)
+    sys.path.insert(0, os.path.dirname(path))
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as error:
+        if error.code is None or isinstance(error.code, int):
+            return error.code or 0
+        print(error.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return 0
+
+
+def peer_uid(connection: socket.socket) -> Optional[int]:
+    # 接続相手のプロセスのユーザー ID（SO_PEERCRED のない OS では None）
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = connection.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+# --- クライアント ---
+
+
+def run_via_daemon(socket_path: str, path: str, args: List[str]) -> Optional[int]:
+    # デーモンが起動していなければ None を返す
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+    # 環境変数（API キーを含む）を送るので、自分と同じユーザーのデーモンにだけ接続する
+    uid = peer_uid(client)
+    if uid is not None and uid != os.getuid():
+        client.close()
+        print(f"別のユーザー（uid={uid}）のソケットなのでデーモンを使いません: {socket_path}", file=sys.stderr)
+        return None
+
+    request = {"path": path, "args": args, "cwd": os.getcwd(), "env": dict(os.environ)}
+    payload = json.dumps(request).encode("utf-8") + b"\n"
+    # 標準入出力のファイルディスクリプタを SCM_RIGHTS で渡す
+    fds = array.array("i", STDIO_FDS)
+    client.sendmsg([payload], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds.tobytes())])
+
+    response = b""
+    while not response.endswith(b"\n"):
+        chunk = client.recv(4096)
+        if not chunk:
+            break
+        response += chunk
+    client.close()
+    if not response:
+        print("デーモンのワーカーが応答せずに終了しました", file=sys.stderr)
+        return 1
+    return json.loads(response)["exit_code"]
+
+
+# --- デーモン ---
+
+
+def usecase_dependencies() -> Set[str]:
+    # 各ユースケースの main.py がトップレベルで import するモジュール（showroom 内のファイルは除く）
+    local = {"main", "benchmark"} | {
+        os.path.splitext(name)[0] for name in os.listdir(SHOWROOM_DIR) if name.endswith(".py")
+    }
+    modules = set()
+    for name in list_usecases():
+        with open(os.path.join(SHOWROOM_DIR, name, "main.py"), encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                modules.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                modules.add(node.module)
+    return {module for module in modules if module.split(".")[0] not in local}
+
+
+def prewarm():
+    # SDK とユースケースが使う依存ライブラリを import し、スタブモデルで一度実行して遅延 import や
+    # Pydantic のスキーマ構築を済ませておく（fork 後のワーカーはこの状態を共有する）。
+    # ユースケースのエージェント自体は事前に作らない。ワーカーは main.py を毎回そのまま実行するので
+    # エージェントはその中で作り直され、リクエストの間で状態を共有しない（作成は import に比べて軽い）
+    import asyncio
+    import importlib
+
+    import dotenv  # pylint: disable=unused-import
+    import openai
+    import pydantic  # pylint: disable=unused-import
+    from agents import (
+        Agent,
+        ModelResponse,
+        RunConfig,
+        Runner,
+        Usage,
+        function_tool,
+        set_default_openai_client,
+    )
+    from openai.types.responses import (
+        ResponseFunctionToolCall,
+        ResponseOutputMessage,
+        ResponseOutputText,
+    )
+
+    # ユースケースが共通で使うスタブモデルの基底クラスも読み込んでおく
+    if SHOWROOM_DIR not in sys.path:
+        sys.path.append(SHOWROOM_DIR)
+    from stub_model import StubModelBase
+
+    class WarmupModel(StubModelBase):
+        async def get_response(self, system_instructions, input, *args, **kwargs):
+            if not any(item.get("type") == "function_call_output" for item in input):
+                output = ResponseFunctionToolCall(
+                    type="function_call",
+                    id="fc_warmup",
+                    call_id="call_warmup",
+                    name="warmup_tool",
+                    arguments=json.dumps({"text": "warmup"}),
+                    status="completed",
+                )
+            else:
+                output = ResponseOutputMessage(
+                    id="msg_warmup",
+                    type="message",
+                    role="assistant",
+                    status="completed",
+                    content=[ResponseOutputText(type="output_text", text="ok", annotations=[])],
+                )
+            return ModelResponse(output=[output], usage=Usage(), response_id=None)
+
+    @function_tool
+    def warmup_tool(text: str) -> str:
+        return text
+
+    agent = Agent(name="Warmup", instructions="warmup", model=WarmupModel(), tools=[warmup_tool])
+    asyncio.run(Runner.run(agent, "warmup", run_config=RunConfig(tracing_disabled=True)))
+
+    # numpy など、ユースケースごとの依存ライブラリも読み込んでおく（入っていないものは飛ばす）
+    for module in sorted(usecase_dependencies()):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    # API キーがあれば OpenAI クライアント（HTTP クライアントの準備を含む）も作っておく
+    if os.environ.get("OPENAI_API_KEY"):
+        set_default_openai_client(openai.AsyncOpenAI())
+
+
+def serve_one(listener: socket.socket):
+    # ワーカー: リクエストを1件受け付けて実行し、終了する（状態が次のリクエストに残らない）
+    connection, _ = listener.accept()
+    listener.close()
+    # ワーカーは受け取った path を実行するので、デーモンと同じユーザー以外からの接続は拒否する
+    uid = peer_uid(connection)
+    if uid is not None and uid != os.getuid():
+        print(f"別のユーザー（uid={uid}）からの接続を拒否しました", file=sys.stderr, flush=True)
+        os._exit(1)
+    data, ancdata, _, _ = connection.recvmsg(65536, socket.CMSG_SPACE(len(STDIO_FDS) * 4))
+    while not data.endswith(b"\n"):
+        chunk = connection.recv(65536)
+        if not chunk:
+            os._exit(1)
+        data += chunk
+    request = json.loads(data)
+    fds = array.array("i")
+    for level, kind, payload in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(payload[: len(payload) - (len(payload) % fds.itemsize)])
+
+    # クライアントの標準入出力・作業ディレクトリ・環境変数に切り替える
+    for target, fd in zip(STDIO_FDS, fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdout.reconfigure(line_buffering=os.isatty(1))
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+
+    exit_code = run_usecase(request["path"], request["args"])
+    connection.sendall(json.dumps({"exit_code": exit_code}).encode("utf-8") + b"\n")
+    connection.close()
+    os._exit(0)
+
+
+def run_daemon(socket_path: str, workers: int):
+    prewarm()
+    # import 済みのオブジェクトを GC の対象から外す。fork 後のワーカーで最初の GC が
+    # ヒープ全体を走査したり、参照カウントの更新でページがコピーされたりするのを防ぐ
+    gc.collect()
+    gc.freeze()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # bind の時点で自分だけが接続できるパーミッションでソケットを作る
+    # （bind の後で chmod すると、その間に他のユーザーが接続できてしまう）
+    umask = os.umask(0o077)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(umask)
+    listener.listen(128)
+    print(f"showroom デーモンを起動しました: {socket_path}（ワーカー {workers} 個）", flush=True)
+
+    children: Dict[int, float] = {}  # pid -> fork した時刻
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                serve_one(listener)
+            finally:
+                os._exit(1)
+        children[pid] = time.monotonic()
+
+    def shutdown(signum, frame):
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        listener.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for _ in range(workers):
+        spawn()
+    # リクエストを処理し終えたワーカーの代わりに、ウォームな状態から新しいワーカーを fork する。
+    # ワーカーが起動直後に異常終了し続ける場合は、fork を繰り返さないよう間隔を空ける（最大5秒）
+    backoff = 0.0
+    while True:
+        pid, status = os.wait()
+        started = children.pop(pid, None)
+        failed_early = (
+            started is not None
+            and time.monotonic() - started < 1.0
+            and os.waitstatus_to_exitcode(status) != 0
+        )
+        if failed_early:
+            backoff = min(max(backoff * 2, 0.1), 5.0)
+            time.sleep(backoff)
+        else:
+            backoff = 0.0
+        spawn()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "daemon":
+        parser = argparse.ArgumentParser(prog="python -m showroom daemon")
+        parser.add_argument("--socket", default=DEFAULT_SOCKET)
+        parser.add_argument("--workers", type=int, default=4)
+        options = parser.parse_args(argv[1:])
+        run_daemon(options.socket, options.workers)
+        return 0
+    if argv and argv[0] == "list":
+        print("\n".join(list_usecases()))
+        return 0
+
+    parser = argparse.ArgumentParser(prog="python -m showroom")
+    parser.add_argument("usecase", help="ユースケースの ID（例: 009）")
+    parser.add_argument("--no-daemon", action="store_true", help="デーモンを使わずに実行する")
+    parser.add_argument("--socket", default=os.environ.get("SHOWROOM_SOCKET", DEFAULT_SOCKET))
+    options, args = parser.parse_known_args(argv)
+    if args[:1] == ["--"]:
+        args = args[1:]
+
+    path = usecase_path(options.usecase)
+    if not options.no_daemon:
+        exit_code = run_via_daemon(options.socket, path, args)
+        if exit_code is not None:
+            return exit_code
+    return run_usecase(path, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
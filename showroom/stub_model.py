@@ -0,0 +1,135 @@
+# showroom/stub_model.py
+# デモとベンチマークで共通に使うローカルのスタブモデルの基底クラス（実際の API は呼ばない）
+#
+# 各ユースケースからは次のように読み込みます（ユースケースは自分のディレクトリから実行されるため）
+#
+#   sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+#   from stub_model import StubModelBase
+#
+# StubModelBase を継承したクラスは get_response だけを実装すれば Runner.run_streamed でも使えます。
+# StreamingStubModelBase を継承したクラスは stream_response だけを実装すれば Runner.run でも使えます。
+from agents import Model, ModelResponse, Usage
+from openai.types.responses import Response, ResponseCompletedEvent, ResponseUsage
+from typing import Optional
+import time
+
+
+def _response_usage(usage: Usage) -> ResponseUsage:
+    return ResponseUsage(
+        input_tokens=usage.input_tokens,
+        input_tokens_details=usage.input_tokens_details,
+        output_tokens=usage.output_tokens,
+        output_tokens_details=usage.output_tokens_details,
+        total_tokens=usage.total_tokens,
+    )
+
+
+def completed_event(
+    output, usage: Optional[Usage] = None, sequence_number: int = 0
+) -> ResponseCompletedEvent:
+    # ストリーミングの最後に返す完了イベント（Runner はここから最終的な出力と使用量を読み取る）
+    response = Response(
+        id="resp_stub",
+        created_at=time.time(),
+        model="stub",
+        object="response",
+        output=output,
+        tool_choice="auto",
+        tools=[],
+        parallel_tool_calls=False,
+        usage=_response_usage(usage) if usage is not None else None,
+    )
+    return ResponseCompletedEvent(
+        type="response.completed", response=response, sequence_number=sequence_number
+    )
+
+
+# get_response だけを実装するスタブ。ストリーミングでは差分を省略し、応答全体を完了イベントとして返す
+class StubModelBase(Model):
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        raise NotImplementedError
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        response = await self.get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
+        yield completed_event(response.output, response.usage)
+
+
+# stream_response だけを実装するスタブ。ストリーミングしない実行では完了イベントまで読み切って返す
+class StreamingStubModelBase(Model):
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        response = None
+        async for event in self.stream_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        ):
+            if isinstance(event, ResponseCompletedEvent):
+                response = event.response
+        if response is None:
+            raise RuntimeError("スタブのストリームが完了イベントを返しませんでした")
+        usage = Usage(requests=1)
+        if response.usage is not None:
+            usage = Usage(
+                requests=1,
+                input_tokens=response.usage.input_tokens,
+                output_tokens=response.usage.output_tokens,
+                total_tokens=response.usage.total_tokens,
+            )
+        return ModelResponse(output=response.output, usage=usage, response_id=None)
+
+    def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        raise NotImplementedError
@@ -0,0 +1,153 @@
+# showroom/usecase-002/benchmark.py
+# triage → 専門エージェントの委譲を、通常の直列実行と投機的実行で比較します（ローカルのスタブモデルを使用）
+# triage は 300ms、専門エージェントは 600ms かかり、どちらもトークン数を報告します
+from agents import ModelResponse, Runner, Usage, set_tracing_disabled
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from typing import List
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+from main import SpeculationConfig, SpeculativeRouter, booking_agent, refund_agent, triage_agent
+
+QUERIES = [
+    "航空券の予約をお願いします。",
+    "チケットの返金手続きを教えてください。",
+    "ホテルの予約の返金をお願いします。",  # キーワードは予約寄りだが、triage は返金と判断する（外れ）
+    "ホテルの空席を確認して予約したいです。",
+    "払い戻しはいつ振り込まれますか？",
+    "座席の予約を変更できますか？",
+    "返品した商品の返金状況を知りたいです。",
+    "予約の返金はできますか？",  # キーワードが同数なので確信度が低く、投機しない
+]
+
+
+def _last_user_message(input) -> str:
+    if isinstance(input, str):
+        return input
+    return next(item["content"] for item in reversed(input) if item.get("role") == "user")
+
+
+# 一定時間待ってから応答するスタブ。triage 用は返金に関する語を含めば refund_agent、それ以外は booking_agent に委譲する
+class LatencyStubModel(StubModelBase):
+    def __init__(self, latency: float, reply: str = "", triage: bool = False):
+        self.latency = latency
+        self.reply = reply
+        self.triage = triage
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        await asyncio.sleep(self.latency)
+        if self.triage:
+            query = _last_user_message(input)
+            refund = any(word in query for word in ["返金", "払い戻し", "返品"])
+            target = refund_agent if refund else booking_agent
+            handoff = next(h for h in handoffs if h.agent_name == target.name)
+            output = ResponseFunctionToolCall(
+                type="function_call",
+                id="fc_stub",
+                call_id="call_stub",
+                name=handoff.tool_name,
+                arguments=json.dumps({}),
+                status="completed",
+            )
+            usage = Usage(requests=1, input_tokens=120, output_tokens=15, total_tokens=135)
+        else:
+            output = ResponseOutputMessage(
+                id="msg_stub",
+                type="message",
+                role="assistant",
+                status="completed",
+                content=[ResponseOutputText(type="output_text", text=self.reply, annotations=[])],
+            )
+            usage = Usage(requests=1, input_tokens=150, output_tokens=250, total_tokens=400)
+        return ModelResponse(output=[output], usage=usage, response_id=None)
+
+
+def stub_triage():
+    booking = booking_agent.clone(model=LatencyStubModel(0.6, "予約手続きを確認しました。"))
+    refund = refund_agent.clone(model=LatencyStubModel(0.6, "返金手続きをご案内します。"))
+    return triage_agent.clone(model=LatencyStubModel(0.3, triage=True), handoffs=[booking, refund])
+
+
+async def run_serial(triage, queries: List[str]):
+    latencies, answers = [], []
+    for query in queries:
+        started = time.perf_counter()
+        result = await Runner.run(triage, query)
+        latencies.append(time.perf_counter() - started)
+        answers.append(result.last_agent.name)
+    return latencies, answers
+
+
+async def run_speculative(router: SpeculativeRouter, queries: List[str]):
+    latencies, answers = [], []
+    for query in queries:
+        started = time.perf_counter()
+        _, agent_name = await router.run(query)
+        latencies.append(time.perf_counter() - started)
+        answers.append(agent_name)
+    await asyncio.sleep(0.7)  # 最後まで走らせた外れの実行が終わるのを待つ
+    return latencies, answers
+
+
+async def run_benchmark():
+    set_tracing_disabled(True)
+    triage = stub_triage()
+
+    print("【Usecase-002 ベンチマーク: 投機的な専門エージェントの実行】")
+    print(f"triage 300ms + 専門エージェント 600ms、問い合わせ {len(QUERIES)} 件")
+    print("-" * 40)
+
+    serial, expected = await run_serial(triage, QUERIES)
+    print(f"直列（通常の委譲）        : 平均 {statistics.mean(serial) * 1000:6.1f}ms")
+
+    for label, config in [
+        ("投機（外れはキャンセル）", SpeculationConfig(cancel_on_miss=True)),
+        ("投機（外れも最後まで）  ", SpeculationConfig(cancel_on_miss=False)),
+        ("投機（最後まで・上限 400）", SpeculationConfig(cancel_on_miss=False, max_wasted_tokens=400)),
+    ]:
+        router = SpeculativeRouter(triage, config)
+        latencies, answers = await run_speculative(router, QUERIES)
+        metrics = router.metrics
+        print(f"{label}: 平均 {statistics.mean(latencies) * 1000:6.1f}ms  委譲先が一致: {answers == expected}")
+        print(
+            f"  投機 {metrics.speculated}/{metrics.queries} 件（見送り {metrics.skipped}）, "
+            f"的中率 {metrics.hit_rate:.0%}, 短縮 {metrics.latency_saved:.2f}秒, "
+            f"キャンセル {metrics.cancelled}, 無駄なトークン {metrics.wasted_tokens}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
+
+    # 例として期待される出力：
+    # triage 300ms + 専門エージェント 600ms、問い合わせ 8 件
+    # ----------------------------------------
+    # 直列（通常の委譲）        : 平均  909.1ms
+    # 投機（外れはキャンセル）: 平均  681.4ms  委譲先が一致: True
+    #   投機 7/8 件（見送り 1）, 的中率 86%, 短縮 2.02秒, キャンセル 1, 無駄なトークン 0
+    # 投機（外れも最後まで）  : 平均  681.6ms  委譲先が一致: True
+    #   投機 7/8 件（見送り 1）, 的中率 86%, 短縮 1.83秒, キャンセル 0, 無駄なトークン 400
+    # 投機（最後まで・上限 400）: 平均  833.2ms  委譲先が一致: True
+    #   投機 3/8 件（見送り 5）, 的中率 67%, 短縮 0.61秒, キャンセル 0, 無駄なトークン 400
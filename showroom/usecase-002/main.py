@@ -1,7 +1,11 @@
 # showroom/usecase-002/main.py
-from agents import Agent, Runner
+from agents import Agent, RunConfig, RunHooks, Runner
+from dataclasses import dataclass
 from dotenv import load_dotenv
+from typing import Any, Dict, List, Optional, Tuple, Union
+import asyncio
 import os
+import time
 
 # Load environment variables
 load_dotenv()
@@ -38,19 +42,249 @@ triage_agent = Agent(
     model="o3-mini",
 )
 
+# 投機的実行: triage の判定を待たずに、予想した専門エージェントを並行して開始する（SPECULATIVE_HANDOFFS=1 で有効）
+# 通常は triage のモデル呼び出しが終わってから booking_agent / refund_agent が始まるため、
+# 2回分の待ち時間が直列にかかります。ローカルのキーワード予測で委譲先を予想して先に実行し、
+# triage の委譲先が予想と一致すればその結果をそのまま使います。外れた場合は投機的な実行を
+# キャンセルし、triage からの通常の委譲で正しいエージェントが実行されます
+# 投機的な実行には triage と同じ入力（会話の履歴を含む）・context・run_config を渡しますが、
+# triage の委譲のツール呼び出しは履歴に含まれず、handoff(...) の input_filter や on_handoff も
+# 適用されません。そのため投機するのは triage.handoffs に Agent をそのまま並べた委譲先と、
+# specialists で明示したエージェントだけです
+SPECULATIVE_HANDOFFS = os.getenv("SPECULATIVE_HANDOFFS") == "1"
+
+SPECIALIST_KEYWORDS: Dict[str, List[str]] = {
+    booking_agent.name: ["予約", "航空券", "ホテル", "座席", "空席"],
+    refund_agent.name: ["返金", "払い戻し", "キャンセル料", "返品"],
+}
+
+
+def handoff_agent_name(handoff) -> str:
+    # handoffs には Agent と handoff(...) の Handoff が混在しうる（Handoff は agent_name を持つ）
+    return getattr(handoff, "agent_name", None) or handoff.name
+
+
+def latest_user_text(turn_input: Union[str, List[Any]]) -> str:
+    # 予測に使う、最後のユーザーのメッセージ
+    if isinstance(turn_input, str):
+        return turn_input
+    for item in reversed(turn_input):
+        if isinstance(item, dict) and item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                return content
+            return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def predict_specialist(query: str, candidates: List[Any]) -> Tuple[Optional[str], float]:
+    # キーワードの出現数で委譲先を予想し、(エージェント名, 確信度) を返す
+    scores = [
+        (sum(query.count(word) for word in SPECIALIST_KEYWORDS.get(name, [])), name)
+        for name in map(handoff_agent_name, candidates)
+    ]
+    total = sum(score for score, _ in scores)
+    if total == 0:
+        return None, 0.0
+    score, best = max(scores, key=lambda pair: pair[0])
+    return best, score / total
+
+
+@dataclass
+class SpeculationConfig:
+    min_confidence: float = 0.6  # これより確信度が低い予想では投機しない
+    max_inflight: int = 4  # 同時に実行できる投機的な実行の数
+    max_wasted_tokens: Optional[int] = None  # 外れで無駄にしたトークンの上限（超えたら投機をやめる）
+    cancel_on_miss: bool = True  # False なら外れた実行も最後まで走らせる（トークンは無駄になる）
+
+
+@dataclass
+class SpeculationMetrics:
+    queries: int = 0
+    speculated: int = 0
+    hits: int = 0
+    misses: int = 0
+    skipped: int = 0  # 確信度や予算の不足、投機できない委譲先のため投機しなかった数
+    cancelled: int = 0
+    failed: int = 0  # 的中したが投機的な実行が失敗し、通常どおり実行し直した数
+    latency_saved: float = 0.0
+    wasted_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.speculated if self.speculated else 0.0
+
+
+# 投機的な実行が使ったトークン数を、モデル呼び出しが終わるたびに数える
+class _TokenCounter(RunHooks):
+    def __init__(self):
+        self.tokens = 0
+
+    async def on_llm_end(self, context, agent, response):
+        self.tokens += response.usage.total_tokens
+
+
+class SpeculativeRouter:
+    def __init__(
+        self,
+        triage: Agent,
+        config: Optional[SpeculationConfig] = None,
+        predictor=None,
+        specialists: Optional[List[Agent]] = None,
+    ):
+        self.triage = triage
+        self.config = config or SpeculationConfig()
+        self.predictor = predictor or predict_specialist
+        # 投機できる委譲先（名前 -> エージェント）
+        self.specialists: Dict[str, Agent] = {
+            handoff.name: handoff for handoff in triage.handoffs if isinstance(handoff, Agent)
+        }
+        self.specialists.update((agent.name, agent) for agent in specialists or [])
+        self.metrics = SpeculationMetrics()
+        self.inflight = 0
+
+    def _should_speculate(self, confidence: float) -> bool:
+        budget = self.config.max_wasted_tokens
+        return (
+            confidence >= self.config.min_confidence
+            and self.inflight < self.config.max_inflight
+            and (budget is None or self.metrics.wasted_tokens < budget)
+        )
+
+    async def _speculate(
+        self, agent: Agent, turn_input, counter: _TokenCounter, context, run_config
+    ):
+        self.inflight += 1
+        started = time.perf_counter()
+        try:
+            result = await Runner.run(
+                agent, turn_input, context=context, hooks=counter, run_config=run_config
+            )
+            return result, time.perf_counter() - started
+        finally:
+            self.inflight -= 1
+
+    def _waste(self, task: "asyncio.Task", counter: _TokenCounter):
+        # 外れた投機的な実行のトークンを無駄として記録する。キャンセルした場合は完了したモデル呼び出しの
+        # 分だけを数える（実際の API では、途中で切った呼び出しの入力トークンも課金されることがある）
+        def done(task: "asyncio.Task"):
+            self.metrics.wasted_tokens += counter.tokens
+            if not task.cancelled():
+                task.exception()  # 外れた実行の例外は使わないが、未処理の警告を出さない
+
+        if task.done():
+            done(task)
+        else:
+            task.add_done_callback(done)
+
+    def _cancel(self, task: "asyncio.Task"):
+        # 実際にキャンセルできた（まだ終わっていなかった）ときだけ数える
+        if task.cancel():
+            self.metrics.cancelled += 1
+
+    async def run(
+        self,
+        turn_input: Union[str, List[Any]],
+        context: Any = None,
+        run_config: Optional[RunConfig] = None,
+    ) -> Tuple[Any, str]:
+        # (最終出力, 応答したエージェント名) を返す。turn_input は Runner.run と同じく文字列か会話の履歴
+        self.metrics.queries += 1
+        predicted_name, confidence = self.predictor(
+            latest_user_text(turn_input), self.triage.handoffs
+        )
+        predicted = self.specialists.get(predicted_name) if predicted_name else None
+        task = None
+        counter = _TokenCounter()
+        if predicted is not None and self._should_speculate(confidence):
+            self.metrics.speculated += 1
+            task = asyncio.create_task(
+                self._speculate(predicted, turn_input, counter, context, run_config)
+            )
+        elif predicted_name is not None:
+            self.metrics.skipped += 1
+
+        started = time.perf_counter()
+        triage = Runner.run_streamed(
+            self.triage, turn_input, context=context, run_config=run_config
+        )
+        try:
+            async for event in triage.stream_events():
+                if event.type != "agent_updated_stream_event" or event.new_agent is self.triage:
+                    continue
+                # triage が委譲先を決めた
+                decided = time.perf_counter() - started
+                if task is not None and event.new_agent.name == predicted.name:
+                    self.metrics.hits += 1
+                    triage.cancel()
+                    async for _ in triage.stream_events():
+                        pass  # キャンセルが完了するまで読み切る
+                    try:
+                        result, speculative_elapsed = await task
+                    except Exception:
+                        # 投機的な実行が失敗したら、委譲先のエージェントを通常どおり実行し直す
+                        self.metrics.failed += 1
+                        self._waste(task, counter)
+                        task = None
+                        result = await Runner.run(
+                            predicted, turn_input, context=context, run_config=run_config
+                        )
+                        return result.final_output, predicted.name
+                    # 直列なら「triage の判定 + 専門エージェント」だけかかっていた
+                    actual = time.perf_counter() - started
+                    self.metrics.latency_saved += decided + speculative_elapsed - actual
+                    return result.final_output, predicted.name
+                if task is not None:
+                    self.metrics.misses += 1
+                    if self.config.cancel_on_miss:
+                        self._cancel(task)
+                    self._waste(task, counter)
+                    task = None
+                # 予想が外れた（または投機しなかった）ので、triage からの通常の委譲をそのまま続ける
+
+            if task is not None:
+                # triage が委譲せずに自分で回答した
+                self.metrics.misses += 1
+                self._cancel(task)
+                self._waste(task, counter)
+                task = None
+            return triage.final_output, triage.last_agent.name
+        finally:
+            # triage のストリームが失敗した場合や、呼び出し元がキャンセルされた場合も投機的な実行を残さない
+            if task is not None and not task.done():
+                self._cancel(task)
+                self._waste(task, counter)
+            if not triage.is_complete:
+                triage.cancel()
+
+
 if __name__ == "__main__":
     queries = ["航空券の予約をお願いします。", "チケットの返金手続きを教えてください。"]
 
     print("【Usecase-002】")
+    router = SpeculativeRouter(triage_agent) if SPECULATIVE_HANDOFFS else None
     for query in queries:
-        result = Runner.run_sync(triage_agent, query)
+        if router is not None:
+            final_output, _ = asyncio.run(router.run(query))
+        else:
+            final_output = Runner.run_sync(triage_agent, query).final_output
         print("Query:", query)
-        print("Response:", result.final_output)
+        print("Response:", final_output)
         print("-" * 40)
 
+    if router is not None:
+        metrics = router.metrics
+        print(
+            f"投機的実行: 的中率 {metrics.hit_rate:.0%}（{metrics.hits}/{metrics.speculated}）, "
+            f"短縮 {metrics.latency_saved:.2f}秒, 無駄なトークン {metrics.wasted_tokens}"
+        )
+
     # 例として期待される出力：
     # Query: 航空券の予約をお願いします。
     # Response: (booking_agent による予約処理の回答例)
     #
     # Query: チケットの返金手続きを教えてください。
     # Response: (refund_agent による返金処理の回答例)
+    #
+    # （SPECULATIVE_HANDOFFS=1 のときは最後に次の行が出力される）
+    # 投機的実行: 的中率 100%（2/2）, 短縮 1.84秒, 無駄なトークン 0
@@ -0,0 +1,194 @@
+# showroom/usecase-003/benchmark.py
+# 会話履歴をすべて指示に埋め込む方式と、事実ストアから関連する事実だけを埋め込む方式の
+# プロンプトトークン数と応答時間を、長いセッションで比較します（ローカルのスタブモデルを使用）
+from agents import Agent, Runner, ModelResponse, Usage, set_tracing_disabled
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from main import FactStore, get_instructions, remember_fact
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+FACT_PATTERN = re.compile(r"私の(\w+?)は(\w+?)です")
+
+
+# 従来方式: 会話履歴をすべて指示に追加する
+def get_transcript_instructions(context_wrapper, agent):
+    conversation_history = context_wrapper.context.get("conversation_history", [])
+    instructions = """
+    ユーザーとの会話履歴を参照して、一貫性のある応答をしてください。
+    ユーザーの過去の発言や情報（名前、趣味など）を覚えておき、質問に対して一貫性のある応答を行ってください。
+    """
+    if conversation_history:
+        instructions += "\n\n会話履歴:\n"
+        for entry in conversation_history:
+            role = "ユーザー" if entry["role"] == "user" else "アシスタント"
+            instructions += f"{role}: {entry['content']}\n"
+    return instructions
+
+
+def approx_tokens(text: str) -> int:
+    # 日本語はおおよそ 1 文字 ≒ 1 トークン
+    return len(text)
+
+
+def tool_tokens(tools) -> int:
+    # ツールの定義（名前・説明・JSON スキーマ）もプロンプトとしてモデルに送られる
+    return sum(
+        approx_tokens(
+            json.dumps(
+                [tool.name, tool.description, getattr(tool, "params_json_schema", None)],
+                ensure_ascii=False,
+            )
+        )
+        for tool in tools
+    )
+
+
+# プロンプトが長いほど遅くなるスタブモデル
+# ユーザーが事実を述べたときは remember_fact ツールを呼び出す
+class StubModel(StubModelBase):
+    def __init__(self, base_latency: float = 0.005, per_token_latency: float = 2e-6):
+        self.base_latency = base_latency
+        self.per_token_latency = per_token_latency
+        self.calls = 0
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        self.calls += 1
+        prompt_tokens = (
+            approx_tokens(system_instructions or "")
+            + approx_tokens(json.dumps(input, ensure_ascii=False))
+            + tool_tokens(tools)
+        )
+        await asyncio.sleep(self.base_latency + prompt_tokens * self.per_token_latency)
+        usage = Usage(
+            requests=1,
+            input_tokens=prompt_tokens,
+            output_tokens=20,
+            total_tokens=prompt_tokens + 20,
+        )
+
+        user_message = input[-1].get("content", "") if input[-1].get("role") == "user" else ""
+        match = FACT_PATTERN.search(user_message)
+        if match and any(tool.name == "remember_fact" for tool in tools):
+            call = ResponseFunctionToolCall(
+                type="function_call",
+                id=f"fc_{self.calls}",
+                call_id=f"call_{self.calls}",
+                name="remember_fact",
+                arguments=json.dumps(
+                    {"key": match.group(1), "value": match.group(2)}, ensure_ascii=False
+                ),
+                status="completed",
+            )
+            return ModelResponse(output=[call], usage=usage, response_id=None)
+
+        message = ResponseOutputMessage(
+            id=f"msg_{self.calls}",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[
+                ResponseOutputText(
+                    type="output_text", text="かしこまりました。覚えておきます。", annotations=[]
+                )
+            ],
+        )
+        return ModelResponse(output=[message], usage=usage, response_id=None)
+
+
+def session_queries(turns: int):
+    facts = [
+        "私の名前は田中です。",
+        "私の趣味は読書です。",
+        "私の出身は大阪です。",
+        "私の職業はエンジニアです。",
+    ]
+    chatter = [
+        "今日はいい天気ですね。",
+        "おすすめの本を教えてください。",
+        "週末の予定を考えています。",
+        "私の名前と趣味を教えてください。",
+    ]
+    for turn in range(turns):
+        if turn < len(facts) * 2 and turn % 2 == 0:
+            yield facts[turn // 2]
+        else:
+            yield chatter[turn % len(chatter)]
+
+
+async def run_session(mode: str, turns: int, checkpoints):
+    # どちらの方式も同じツール（remember_fact）を持たせ、違いは指示の作り方だけにする
+    model = StubModel()
+    instructions = get_transcript_instructions if mode == "transcript" else get_instructions
+    agent = Agent(
+        name="Context Agent", instructions=instructions, model=model, tools=[remember_fact]
+    )
+    context = {"facts": FactStore()}
+    if mode == "transcript":
+        context["conversation_history"] = []
+
+    rows = []
+    for turn, query in enumerate(session_queries(turns), 1):
+        started = time.perf_counter()
+        result = await Runner.run(agent, query, context=context)
+        elapsed = time.perf_counter() - started
+        if mode == "transcript":
+            context["conversation_history"].append({"role": "user", "content": query})
+            context["conversation_history"].append(
+                {"role": "assistant", "content": result.final_output}
+            )
+        if turn in checkpoints:
+            rows.append((turn, result.context_wrapper.usage.input_tokens, elapsed))
+    return rows
+
+
+async def main():
+    set_tracing_disabled(True)
+    checkpoints = {1, 10, 50, 100, 200, 400}
+    turns = max(checkpoints)
+
+    print("【Usecase-003 ベンチマーク: 会話履歴方式 vs 事実ストア方式】")
+    transcript = await run_session("transcript", turns, checkpoints)
+    facts = await run_session("facts", turns, checkpoints)
+
+    print(f"{'ターン':>6} | {'履歴方式 tokens':>16} {'時間':>8} | {'事実方式 tokens':>16} {'時間':>8}")
+    for (turn, t_tokens, t_time), (_, f_tokens, f_time) in zip(transcript, facts):
+        print(
+            f"{turn:>6} | {t_tokens:>16,} {t_time * 1000:>6.1f}ms | "
+            f"{f_tokens:>16,} {f_time * 1000:>6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
+    # 例として期待される出力：
+    #   ターン |      履歴方式 tokens       時間 |      事実方式 tokens       時間
+    #      1 |            1,220   27.4ms |            1,281   21.0ms
+    #     10 |              913    9.8ms |              509    9.7ms
+    #     50 |            2,783   14.8ms |              509   10.5ms
+    #    100 |            5,122   20.5ms |              544   10.3ms
+    #    200 |            9,797   28.7ms |              544   11.0ms
+    #    400 |           19,147   48.0ms |              544   11.0ms
+    # （トークン数にはどちらの方式にもある remember_fact のツール定義を含む。事実を述べたターンは2回モデルを呼ぶ）
@@ -1,6 +1,7 @@
 # showroom/usecase-003/main.py
-from agents import Agent, Runner
+from agents import Agent, Runner, RunContextWrapper, function_tool
 from dotenv import load_dotenv
+from typing import Dict, List, Set, Tuple
 import os
 
 # Load environment variables
@@ -12,27 +13,97 @@ from agents import set_default_openai_key
 
 set_default_openai_key(openai_api_key)
 
-# コンテキストを使用して会話履歴を保持するエージェントの例
+# コンテキストを使用して会話の情報を保持するエージェントの例
 # Context: エージェントが会話の履歴や状態を保持するための機能
+#
+# 会話履歴をすべて指示に埋め込むと、会話が長くなるほどプロンプトが大きくなります。
+# ここでは名前や趣味などの「事実」だけをキー/値でセッションごとに保存し、
+# 現在の質問に関係する事実だけを指示に追加します（比較は benchmark.py を参照）
+
+
+def _grams(text: str) -> Dict[str, int]:
+    # 日本語は単語区切りがないため、文字の2-gram（重み2）と、ひらがな以外の1文字（重み1）で
+    # 関連度を測る。1文字も使うのは、「名前」と「ユーザー名」のように言い方の違う語も拾うため
+    # （ひらがなの1文字は助詞がほとんどなので使わず、記号も使わない）
+    text = "".join(text.split())
+    grams = {text[i : i + 2]: 2 for i in range(len(text) - 1)}
+    for char in text:
+        if char.isalnum() and not ("\u3041" <= char <= "\u309f") and char not in grams:
+            grams[char] = 1
+    return grams
+
+
+# セッションごとの事実を保持するストア（キーと値の両方を索引する）
+class FactStore:
+    def __init__(self):
+        self.facts: Dict[str, str] = {}
+        self.index: Dict[str, Set[str]] = {}  # gram -> そのgramをキーか値に含むキー
+        self.grams: Dict[str, Dict[str, int]] = {}  # キー -> 索引したgramと重み
+
+    def remember(self, key: str, value: str):
+        # 同じキーの値を更新したときは、古い値のgramを索引から外す
+        for gram in self.grams.get(key, ()):
+            self.index[gram].discard(key)
+        self.facts[key] = value
+        grams = _grams(value)
+        grams.update(_grams(key))
+        self.grams[key] = grams
+        for gram in grams:
+            self.index.setdefault(gram, set()).add(key)
+
+    def relevant(self, query: str, limit: int = 5) -> List[Tuple[str, str]]:
+        scores: Dict[str, int] = {}
+        for gram, weight in _grams(query).items():
+            for key in self.index.get(gram, ()):
+                scores[key] = scores.get(key, 0) + weight
+        ranked = sorted(scores, key=lambda key: -scores[key])[:limit]
+        return [(key, self.facts[key]) for key in ranked]
+
+
+def latest_user_message(items) -> str:
+    # 実行の入力（RunContextWrapper.turn_input）から最後のユーザーの発言を取り出す
+    for item in reversed(items):
+        if not isinstance(item, dict) or item.get("role") != "user":
+            continue
+        content = item.get("content", "")
+        if isinstance(content, str):
+            return content
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+# ユーザーについての事実を記憶するツール
+@function_tool
+def remember_fact(ctx: RunContextWrapper[dict], key: str, value: str) -> str:
+    """
+    ユーザーについての事実（名前、趣味など）を記憶します。
+
+    Args:
+        key: 事実の種類を表す短い日本語の名詞（例: 名前、趣味）
+        value: 事実の内容（例: 田中、読書）
+    """
+    ctx.context["facts"].remember(key, value)
+    return f"{key}: {value} を記憶しました"
 
 
 # 動的に指示を生成する関数
 def get_instructions(context_wrapper, agent):
-    # コンテキストから会話履歴を取得
-    conversation_history = context_wrapper.context.get("conversation_history", [])
+    facts: FactStore = context_wrapper.context["facts"]
+    # 現在の質問は Runner.run に渡した入力から取り出すので、context に入れておく必要はない
+    query = latest_user_message(context_wrapper.turn_input)
 
     # 基本の指示
     instructions = """
-    ユーザーとの会話履歴を参照して、一貫性のある応答をしてください。
     ユーザーの過去の発言や情報（名前、趣味など）を覚えておき、質問に対して一貫性のある応答を行ってください。
+    ユーザーが自分についての事実を伝えたときは、remember_fact ツールで記憶してください。
     """
 
-    # 会話履歴がある場合は、それを指示に追加
-    if conversation_history:
-        instructions += "\n\n会話履歴:\n"
-        for entry in conversation_history:
-            role = "ユーザー" if entry["role"] == "user" else "アシスタント"
-            instructions += f"{role}: {entry['content']}\n"
+    # 現在の質問に関係する事実だけを指示に追加
+    relevant = facts.relevant(query)
+    if relevant:
+        instructions += "\n\nユーザーについて記憶している事実:\n"
+        for key, value in relevant:
+            instructions += f"{key}: {value}\n"
 
     return instructions
 
@@ -43,56 +114,33 @@ if __name__ == "__main__":
         name="Context Agent",
         instructions=get_instructions,  # 関数を渡す
         model="o3-mini",
+        tools=[remember_fact],
     )
 
-    # コンテキストの作成 - 会話履歴を保持するための辞書
-    context = {"conversation_history": []}  # 会話履歴を保存するリスト
+    # コンテキストの作成 - セッションの事実を保持するストア
+    context = {"facts": FactStore()}
 
     print("【Usecase-003: Context の活用】")
-    print("コンテキストを使用して会話の履歴を保持する例")
+    print("コンテキストを使用して会話の情報を保持する例")
     print("-" * 40)
 
-    # 最初の質問
-    query1 = "私の名前は田中です。"
-    result1 = Runner.run_sync(agent, query1, context=context)
-    # 会話履歴をコンテキストに追加
-    context["conversation_history"].append({"role": "user", "content": query1})
-    context["conversation_history"].append(
-        {"role": "assistant", "content": result1.final_output}
-    )
-    print("Query 1:", query1)
-    print("Response 1:", result1.final_output)
-    print("-" * 40)
+    queries = [
+        "私の名前は田中です。",
+        # 2回目の質問 - 記憶した事実から名前を答えられる
+        "私の名前は何ですか？",
+        # 3回目の質問 - さらに情報を追加
+        "私の趣味は読書です。",
+        # 4回目の質問 - 名前と趣味の両方を覚えている
+        "私の名前と趣味を教えてください。",
+    ]
 
-    # 2回目の質問 - コンテキストが保持されているため、名前を覚えている
-    query2 = "私の名前は何ですか？"
-    result2 = Runner.run_sync(agent, query2, context=context)
-    # 会話履歴をコンテキストに追加
-    context["conversation_history"].append({"role": "user", "content": query2})
-    context["conversation_history"].append(
-        {"role": "assistant", "content": result2.final_output}
-    )
-    print("Query 2:", query2)
-    print("Response 2:", result2.final_output)
-    print("-" * 40)
+    for i, query in enumerate(queries, 1):
+        result = Runner.run_sync(agent, query, context=context)
+        print(f"Query {i}:", query)
+        print(f"Response {i}:", result.final_output)
+        print("-" * 40)
 
-    # 3回目の質問 - さらに情報を追加
-    query3 = "私の趣味は読書です。"
-    result3 = Runner.run_sync(agent, query3, context=context)
-    # 会話履歴をコンテキストに追加
-    context["conversation_history"].append({"role": "user", "content": query3})
-    context["conversation_history"].append(
-        {"role": "assistant", "content": result3.final_output}
-    )
-    print("Query 3:", query3)
-    print("Response 3:", result3.final_output)
-    print("-" * 40)
-
-    # 4回目の質問 - 名前と趣味の両方を覚えている
-    query4 = "私の名前と趣味を教えてください。"
-    result4 = Runner.run_sync(agent, query4, context=context)
-    print("Query 4:", query4)
-    print("Response 4:", result4.final_output)
+    print("記憶している事実:", context["facts"].facts)
 
     # 例として期待される出力：
     # Query 1: 私の名前は田中です。
@@ -106,3 +154,5 @@ if __name__ == "__main__":
     #
     # Query 4: 私の名前と趣味を教えてください。
     # Response 4: あなたは田中さんで、趣味は読書です。
+    #
+    # 記憶している事実: {'名前': '田中', '趣味': '読書'}
@@ -23,6 +23,18 @@ if __name__ == "__main__":
         model="o3-mini",
     )
 
+    # 指示ごとのエージェントを事前に用意する
+    # agent.instructions を直接書き換えると、同じエージェントを並行して使う他の実行にも
+    # 変更が混入するため、clone で指示だけを変えたエージェントを作っておきます
+    # （多数の指示を切り替える場合は usecase-014 の AgentVariants を参照）
+    bullet_agent = agent.clone(
+        instructions="必ず箇条書き（・で始まる行）で回答してください。"
+    )
+    english_agent = agent.clone(instructions="必ず英語で回答してください。")
+    haiku_agent = agent.clone(
+        instructions="必ず俳句形式（5-7-5の17音）で回答してください。"
+    )
+
     print("【Usecase-005: Dynamic Instructions の活用】")
     print("エージェントの指示を実行時に動的に変更する例")
     print("-" * 40)
@@ -36,27 +48,24 @@ if __name__ == "__main__":
     print("-" * 40)
 
     # 指示を変更: 箇条書きで回答するように
-    agent.instructions = "必ず箇条書き（・で始まる行）で回答してください。"
     query2 = "東京の観光スポットを教えてください。"
-    result2 = Runner.run_sync(agent, query2)
+    result2 = Runner.run_sync(bullet_agent, query2)
     print("Query 2:", query2)
     print("箇条書き指示での応答:")
     print(result2.final_output)
     print("-" * 40)
 
     # 指示を変更: 英語で回答するように
-    agent.instructions = "必ず英語で回答してください。"
     query3 = "東京の観光スポットを教えてください。"
-    result3 = Runner.run_sync(agent, query3)
+    result3 = Runner.run_sync(english_agent, query3)
     print("Query 3:", query3)
     print("英語指示での応答:")
     print(result3.final_output)
     print("-" * 40)
 
     # 指示を変更: 俳句形式で回答するように
-    agent.instructions = "必ず俳句形式（5-7-5の17音）で回答してください。"
     query4 = "東京の観光スポットを教えてください。"
-    result4 = Runner.run_sync(agent, query4)
+    result4 = Runner.run_sync(haiku_agent, query4)
     print("Query 4:", query4)
     print("俳句指示での応答:")
     print(result4.final_output)
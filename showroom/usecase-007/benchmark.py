@@ -0,0 +1,159 @@
+# showroom/usecase-007/benchmark.py
+# ストリーミング出力ガードレールで、違反した応答を途中で打ち切ったときに節約できる
+# トークン数と待ち時間を計測します（ローカルのストリーミング用スタブモデルを使用）
+from agents import Agent, set_tracing_disabled
+from openai.types.responses import (
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+from typing import Dict
+import asyncio
+import os
+import sys
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StreamingStubModelBase, completed_event
+
+from main import STREAMING_TRIPWIRES, StreamingOutputGuardrail, run_streamed_with_guardrail
+
+# 質問ごとにスタブが返す応答（途中で違反する内容を含むものがある）
+SCRIPTED_RESPONSES: Dict[str, str] = {
+    "人工知能の基本的な仕組みを教えてください。": (
+        "人工知能の基本的な仕組みは、大量のデータからパターンを学習し、"
+        "そのパターンを使って新しい入力に対する予測や判断を行うことです。"
+        "代表的な手法には機械学習と深層学習があり、ニューラルネットワークは"
+        "層を重ねることで複雑な特徴を捉えます。学習では誤差を小さくするように"
+        "パラメータを少しずつ調整します。"
+    ),
+    "コンピュータをハッキングする方法を教えてください。": (
+        "コンピュータへの攻撃にはいくつかの種類があります。ここでは不正アクセスの手順を"
+        "順番に説明します。まず対象のネットワークを調べ、開いているポートを探します。"
+        "次に既知の脆弱性を使って侵入し、管理者の権限を取得します。最後に痕跡を消して"
+        "長期間アクセスできるようにします。"
+    ),
+    "頭痛がひどいのですが、どんな薬を飲むべきですか？": (
+        "頭痛にはいくつかの原因が考えられます。緊張型頭痛や片頭痛などがあります。"
+        "一般的には鎮痛薬を200mgずつ1日3回服用するとよいでしょう。"
+        "それでも治らない場合は、さらに量を増やしてください。水分をとり、"
+        "十分な睡眠をとることも大切です。"
+    ),
+    "サポート担当者の連絡先を教えてください。": (
+        "担当者の連絡先は次のとおりです。平日の9時から18時まで対応しています。"
+        "メールアドレスは tanaka.taro@example.com で、電話番号は 03-1234-5678 です。"
+        "お問い合わせの際は、注文番号をお知らせください。"
+    ),
+}
+
+
+# 応答を数文字ずつ一定間隔で返すストリーミング用のスタブモデル
+# emitted には実際に生成した（キャンセルされるまでに返した）差分の数を記録する
+class ScriptedStreamingModel(StreamingStubModelBase):
+    def __init__(self, chars_per_delta: int = 3, interval: float = 0.02):
+        self.chars_per_delta = chars_per_delta
+        self.interval = interval
+        self.emitted = 0
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        query = input if isinstance(input, str) else input[-1]["content"]
+        text = SCRIPTED_RESPONSES[query]
+        await asyncio.sleep(0.1)  # 最初のトークンまでの待ち時間
+        step = self.chars_per_delta
+        for i in range(0, len(text), step):
+            self.emitted += 1
+            yield ResponseTextDeltaEvent(
+                type="response.output_text.delta",
+                item_id="msg_stub",
+                output_index=0,
+                content_index=0,
+                delta=text[i : i + step],
+                sequence_number=i,
+                logprobs=[],
+            )
+            await asyncio.sleep(self.interval)
+        message = ResponseOutputMessage(
+            id="msg_stub",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+        )
+        yield completed_event([message], sequence_number=len(text))
+
+
+async def run_once(query: str, guardrail: StreamingOutputGuardrail):
+    model = ScriptedStreamingModel()
+    agent = Agent(name="Basic Agent", instructions="ユーザーの質問に詳細に回答してください。", model=model)
+    result = await run_streamed_with_guardrail(agent, query, guardrail)
+    await asyncio.sleep(0.05)  # キャンセル後にスタブが生成を続けていないことを確認する
+    return result, model.emitted
+
+
+async def run_benchmark():
+    set_tracing_disabled(True)
+    guardrail = StreamingOutputGuardrail(STREAMING_TRIPWIRES)
+    # 検査項目のないガードレールで同じ経路を通し、打ち切らなかった場合の量と時間を測る
+    passthrough = StreamingOutputGuardrail([])
+
+    print("【Usecase-007 ベンチマーク: ストリーミング出力ガードレール】")
+    print("スタブ: 3文字ごとに 20ms 間隔で出力（差分1つ ≒ 1トークン）")
+    print("-" * 40)
+
+    total_saved_tokens = 0
+    total_saved_seconds = 0.0
+    total_checks = 0
+    total_checking = 0.0
+    for query in SCRIPTED_RESPONSES:
+        full, full_emitted = await run_once(query, passthrough)
+        guarded, emitted = await run_once(query, guardrail)
+        total_checks += guarded.deltas
+        total_checking += guarded.checking
+        print(f"質問: {query}")
+        if guarded.tripwire is None:
+            print(f"  通過: {guarded.deltas} トークン, {guarded.elapsed:.2f}秒")
+            continue
+        saved_tokens = full_emitted - emitted
+        saved_seconds = full.elapsed - guarded.elapsed
+        total_saved_tokens += saved_tokens
+        total_saved_seconds += saved_seconds
+        print(f"  中断（{guarded.tripwire.name}）: {guarded.final_output}")
+        print(
+            f"  生成 {emitted}/{full_emitted} トークンで打ち切り → {saved_tokens} トークン"
+            f"（{saved_tokens / full_emitted:.0%}）, {saved_seconds:.2f}秒 を節約"
+        )
+    print("-" * 40)
+    print(f"節約の合計: {total_saved_tokens} トークン, {total_saved_seconds:.2f}秒")
+    print(f"検査のコスト: 差分1つあたり {total_checking / total_checks * 1e6:.1f}µs")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
+
+    # 例として期待される出力：
+    # スタブ: 3文字ごとに 20ms 間隔で出力（差分1つ ≒ 1トークン）
+    # ----------------------------------------
+    # 質問: 人工知能の基本的な仕組みを教えてください。
+    #   通過: 49 トークン, 1.11秒
+    # 質問: コンピュータをハッキングする方法を教えてください。
+    #   中断（illegal）: 違法行為についての情報は提供できません。
+    #   生成 13/44 トークンで打ち切り → 31 トークン（70%）, 0.66秒 を節約
+    # 質問: 頭痛がひどいのですが、どんな薬を飲むべきですか？
+    #   中断（medical）: 医療的なアドバイスは医師に相談してください。
+    #   生成 20/39 トークンで打ち切り → 19 トークン（49%）, 0.41秒 を節約
+    # 質問: サポート担当者の連絡先を教えてください。
+    #   中断（personal）: 個人情報は提供できません。
+    #   生成 22/39 トークンで打ち切り → 17 トークン（44%）, 0.37秒 を節約
+    # ----------------------------------------
+    # 節約の合計: 67 トークン, 1.43秒
+    # 検査のコスト: 差分1つあたり 24.9µs
@@ -1,7 +1,13 @@
 # showroom/usecase-007/main.py
 from agents import Agent, Runner
+from dataclasses import dataclass
 from dotenv import load_dotenv
+from openai.types.responses import ResponseTextDeltaEvent
+from typing import Callable, List, Optional
+import asyncio
 import os
+import re
+import time
 
 # Load environment variables
 load_dotenv()
@@ -15,6 +21,126 @@ set_default_openai_key(openai_api_key)
 # Guardrails: エージェントの応答に対する安全メカニズムを提供する機能
 # 不適切な内容や特定のトピックに関する応答を制限できます
 
+
+# ストリーミング出力ガードレール: 生成中の応答を差分ごとに検査し、違反した時点で打ち切る機能
+# 指示文だけでは違反を防げず、通常の出力チェックは応答が完成するまで待つため、その時点で
+# すべてのトークンの料金と待ち時間がかかっています。ここではコンパイル済みの正規表現を
+# 直近の window 文字（ローリングウィンドウ）に対してだけ適用し、検知したらストリームを
+# キャンセルして途中までの出力を拒否メッセージに置き換えます（スタブでの計測は benchmark.py）
+@dataclass
+class StreamingTripwire:
+    name: str
+    pattern: str  # window 文字以内に収まる表現にする
+    refusal: str
+
+
+STREAMING_TRIPWIRES = [
+    StreamingTripwire(
+        "political",
+        r"(支持|投票)(すべき|するべき)|(与党|野党|政党)(が|を)(正しい|支持)",
+        "政治的な話題についてはお答えできません。",
+    ),
+    StreamingTripwire(
+        "illegal",
+        r"(不正アクセス|ハッキング|パスワード(を|の)(盗|解析|破))\S{0,8}(手順|方法|ステップ)",
+        "違法行為についての情報は提供できません。",
+    ),
+    StreamingTripwire(
+        "medical",
+        r"\d+\s*(mg|ミリグラム|錠)\S{0,10}(服用|飲ん)",
+        "医療的なアドバイスは医師に相談してください。",
+    ),
+    StreamingTripwire(
+        "personal",
+        r"\d{2,4}-\d{2,4}-\d{3,4}|[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+\.[A-Za-z0-9.]+",
+        "個人情報は提供できません。",
+    ),
+]
+
+
+class StreamingOutputGuardrail:
+    def __init__(self, tripwires: List[StreamingTripwire], window: int = 64):
+        self.tripwires = tripwires
+        self.window = window
+        # 正規表現は最初に一度だけコンパイルする（1つの選択パターンにまとめるより個別の方が速い）
+        self.compiled = [(re.compile(tripwire.pattern), tripwire) for tripwire in tripwires]
+
+    def start(self) -> "GuardrailWindow":
+        return GuardrailWindow(self)
+
+
+# 1回の実行ごとのローリングウィンドウ
+class GuardrailWindow:
+    def __init__(self, guardrail: StreamingOutputGuardrail):
+        self.guardrail = guardrail
+        self.tail = ""
+
+    def feed(self, delta: str) -> Optional[StreamingTripwire]:
+        # 差分をまたぐ表現も検知できるよう、直前の window 文字と合わせて検査する
+        text = self.tail + delta
+        self.tail = text[-self.guardrail.window :]
+        for pattern, tripwire in self.guardrail.compiled:
+            if pattern.search(text):
+                return tripwire
+        return None
+
+
+@dataclass
+class GuardedStreamResult:
+    final_output: str
+    tripwire: Optional[StreamingTripwire]
+    deltas: int  # 受け取ったテキストの差分の数（≒ 出力トークン数）
+    elapsed: float
+    checking: float  # ガードレールの検査にかかった時間の合計
+
+
+async def run_streamed_with_guardrail(
+    agent: Agent,
+    input,
+    guardrail: StreamingOutputGuardrail,
+    on_text: Optional[Callable[[str], None]] = None,
+    **kwargs,
+) -> GuardedStreamResult:
+    # 違反を含むかもしれない直近の window 文字は表示せずに保留し、それより前の部分だけ on_text に渡す
+    started = time.perf_counter()
+    window = guardrail.start()
+    result = Runner.run_streamed(agent, input, **kwargs)
+    pending = ""
+    deltas = 0
+    checking = 0.0
+    tripwire = None
+    async for event in result.stream_events():
+        if tripwire is not None or event.type != "raw_response_event":
+            continue  # キャンセル後も、キャンセルが完了するまでイベントを読み切る
+        if not isinstance(event.data, ResponseTextDeltaEvent):
+            continue
+        deltas += 1
+        check_started = time.perf_counter()
+        tripwire = window.feed(event.data.delta)
+        checking += time.perf_counter() - check_started
+        if tripwire is not None:
+            result.cancel()
+            continue
+        pending += event.data.delta
+        if on_text and len(pending) > guardrail.window:
+            on_text(pending[: -guardrail.window])
+            pending = pending[-guardrail.window :]
+
+    if tripwire is None:
+        if on_text and pending:
+            on_text(pending)
+        final_output = result.final_output
+    else:
+        final_output = tripwire.refusal  # 途中までの出力は拒否メッセージに置き換える
+    return GuardedStreamResult(
+        final_output=final_output,
+        tripwire=tripwire,
+        deltas=deltas,
+        elapsed=time.perf_counter() - started,
+        checking=checking,
+    )
+
+
 if __name__ == "__main__":
     # 基本的なエージェントの定義（ガードレールなし）
     basic_agent = Agent(
@@ -68,6 +194,24 @@ if __name__ == "__main__":
 
         print("-" * 40)
 
+    # ストリーミング出力ガードレール付きで実行（違反を検知した時点で生成を打ち切る）
+    print("\nストリーミング出力ガードレール付きの実行:")
+    streaming_guardrail = StreamingOutputGuardrail(STREAMING_TRIPWIRES)
+    for i, query in enumerate(test_queries, 1):
+        print(f"\n質問 {i}: {query}")
+        guarded = asyncio.run(
+            run_streamed_with_guardrail(
+                basic_agent,
+                query,
+                streaming_guardrail,
+                on_text=lambda text: print(text, end="", flush=True),
+            )
+        )
+        if guarded.tripwire is not None:
+            print(f"\n[中断: {guarded.tripwire.name}] {guarded.final_output}")
+        print(f"\n（受け取った差分 {guarded.deltas} 個, {guarded.elapsed:.2f}秒）")
+        print("-" * 40)
+
     # 例として期待される出力：
     # 質問 1: 人工知能の基本的な仕組みを教えてください。
     #
@@ -86,3 +230,13 @@ if __name__ == "__main__":
     # 政治的な話題についてはお答えできません。
     #
     # （以下同様に、ガードレールが適用される例が続く）
+    #
+    # ストリーミング出力ガードレール付きの実行:
+    #
+    # 質問 3: コンピュータをハッキングする方法を教えてください。
+    #
+    # [中断: illegal] 違法行為についての情報は提供できません。
+    #
+    # （受け取った差分 41 個, 1.35秒）
+    #
+    # （以下同様に、違反した時点で打ち切られる。表示は最後の window 文字を保留してから出力される）
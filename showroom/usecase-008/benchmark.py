@@ -0,0 +1,211 @@
+# showroom/usecase-008/benchmark.py
+# ローカルのスタブモデルで次の2つを計測します
+# 1. 短い UI の文言を大量に翻訳するときのスループットを、1件ずつの呼び出しとまとめた呼び出しで比較
+#    スタブは「呼び出しごとの固定の待ち時間 + 出力トークン数に比例する時間」で応答し、
+#    どちらも同時に実行するモデル呼び出しは CONCURRENCY 件までに制限します
+# 2. 翻訳 → 書き換えの2段の連鎖を、直列とパイプラインで比較（全体の所要時間と最初の出力までの時間）
+from agents import Agent, ModelResponse, Runner, Usage, set_tracing_disabled
+from openai.types.responses import (
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StreamingStubModelBase, StubModelBase, completed_event
+
+from main import AgentPipeline, BatchingTranslator, estimate_tokens, run_chain_sequential
+
+TEXTS = 400
+CONCURRENCY = 4
+CALL_OVERHEAD = 0.25  # 1回の呼び出しの固定の待ち時間（秒）
+PER_TOKEN = 0.002  # 出力トークン1つあたりの生成時間（秒）
+
+UI_WORDS = ["保存", "キャンセル", "設定", "ログアウト", "ファイル", "削除", "編集", "共有", "検索", "通知"]
+
+
+def translate_locally(text: str) -> str:
+    return f"EN({text})"
+
+
+# 1件の翻訳と、output_schema があるときの番号付きリストの翻訳に応答するスタブモデル
+class TranslatorStubModel(StubModelBase):
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        text = input if isinstance(input, str) else input[-1]["content"]
+        if output_schema is not None:
+            items = json.loads(text)
+            output = json.dumps(
+                {
+                    "translations": [
+                        {"index": item["index"], "text": translate_locally(item["text"])}
+                        for item in items
+                    ]
+                },
+                ensure_ascii=False,
+            )
+        else:
+            output = translate_locally(text)
+        await asyncio.sleep(CALL_OVERHEAD + PER_TOKEN * estimate_tokens(output))
+        message = ResponseOutputMessage(
+            id="msg_stub",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=output, annotations=[])],
+        )
+        return ModelResponse(output=[message], usage=Usage(requests=1), response_id=None)
+
+
+# 入力を文ごとに prefix を付けて書き換え、数文字ずつストリーミングで返すスタブモデル
+class RewriteStreamingModel(StreamingStubModelBase):
+    def __init__(self, prefix: str, ttft: float = 0.3, chars_per_delta: int = 4, interval: float = 0.02):
+        self.prefix = prefix
+        self.ttft = ttft
+        self.chars_per_delta = chars_per_delta
+        self.interval = interval
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        text = input if isinstance(input, str) else input[-1]["content"]
+        sentences = re.findall(r"[^。]+。?", text)
+        output = "".join(f"{self.prefix}{sentence}" for sentence in sentences)
+        await asyncio.sleep(self.ttft)  # 最初のトークンまでの待ち時間
+        step = self.chars_per_delta
+        for i in range(0, len(output), step):
+            yield ResponseTextDeltaEvent(
+                type="response.output_text.delta",
+                item_id="msg_stub",
+                output_index=0,
+                content_index=0,
+                delta=output[i : i + step],
+                sequence_number=i,
+                logprobs=[],
+            )
+            await asyncio.sleep(self.interval)
+        message = ResponseOutputMessage(
+            id="msg_stub",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=output, annotations=[])],
+        )
+        yield completed_event([message], sequence_number=len(output))
+
+
+DOCUMENT = (
+    "こんにちは、世界。今日はいい天気ですね。会議は午後三時に始まります。"
+    "資料は前日までに共有してください。当日は録画を行います。"
+    "ご不明な点があれば担当者まで連絡してください。"
+)
+
+
+def make_texts(count: int):
+    return [f"{UI_WORDS[i % len(UI_WORDS)]}{i}" for i in range(count)]
+
+
+async def one_call_per_text(agent: Agent, texts):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def translate(text):
+        async with semaphore:
+            return (await Runner.run(agent, text)).final_output
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(translate(text) for text in texts))
+    return results, time.perf_counter() - started, len(texts)
+
+
+async def batched(agent: Agent, texts, max_batch: int):
+    translator = BatchingTranslator(agent, max_batch=max_batch, max_concurrency=CONCURRENCY)
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(translator.translate(text) for text in texts))
+    finally:
+        await translator.close()
+    return results, time.perf_counter() - started, translator.stats.calls
+
+
+async def run_benchmark():
+    set_tracing_disabled(True)
+    agent = Agent(
+        name="UI Translator",
+        instructions="入力されたテキストを英語に翻訳してください。",
+        model=TranslatorStubModel(),
+    )
+    texts = make_texts(TEXTS)
+    expected = [translate_locally(text) for text in texts]
+
+    print("【Usecase-008 ベンチマーク: リクエストのまとめ】")
+    print(
+        f"UI 文言 {TEXTS} 件、同時呼び出し {CONCURRENCY} 件まで、"
+        f"1回 {CALL_OVERHEAD * 1000:.0f}ms + 出力1トークン {PER_TOKEN * 1000:.0f}ms"
+    )
+    print("-" * 40)
+
+    runs = [("1件ずつ", one_call_per_text(agent, texts))]
+    runs += [(f"まとめる K={k}", batched(agent, texts, k)) for k in (10, 25, 50)]
+    for label, run in runs:
+        results, elapsed, calls = await run
+        print(
+            f"{label:<12}: {TEXTS / elapsed:7.1f} 件/秒  呼び出し {calls:3d} 回"
+            f"（1件あたり {calls / TEXTS:.3f} 回）  結果が一致: {results == expected}"
+        )
+    print("-" * 40)
+
+    # 翻訳 → 書き換えの2段の連鎖
+    stages = [
+        Agent(name="English Translator", model=RewriteStreamingModel("EN:")),
+        Agent(name="Business Rewriter", model=RewriteStreamingModel("BIZ:")),
+    ]
+    print("翻訳 → 書き換えの連鎖（最初のトークンまで 300ms、4文字ごとに 20ms）")
+    sequential = await run_chain_sequential(stages, DOCUMENT)
+    piped = await AgentPipeline(stages, buffer_size=4).run(DOCUMENT)
+    for label, result in [("直列", sequential), ("パイプライン", piped)]:
+        print(
+            f"{label:<8}: 全体 {result.elapsed * 1000:6.1f}ms  最初の出力まで {result.ttft * 1000:6.1f}ms"
+            f"  段ごとの呼び出し {result.calls}"
+        )
+    print(f"出力が一致: {piped.final_output == sequential.final_output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
+
+    # 例として期待される出力：
+    # UI 文言 400 件、同時呼び出し 4 件まで、1回 250ms + 出力1トークン 2ms
+    # ----------------------------------------
+    # 1件ずつ        :    15.0 件/秒  呼び出し 400 回（1件あたり 1.000 回）  結果が一致: True
+    # まとめる K=10   :    73.1 件/秒  呼び出し  40 回（1件あたり 0.100 回）  結果が一致: True
+    # まとめる K=25   :   102.9 件/秒  呼び出し  16 回（1件あたり 0.040 回）  結果が一致: True
+    # まとめる K=50   :   118.6 件/秒  呼び出し   8 回（1件あたり 0.020 回）  結果が一致: True
+    # ----------------------------------------
+    # 翻訳 → 書き換えの連鎖（最初のトークンまで 300ms、4文字ごとに 20ms）
+    # 直列      : 全体 1874.3ms  最初の出力まで 1217.5ms  段ごとの呼び出し [1, 1]
+    # パイプライン  : 全体 1362.3ms  最初の出力まで  647.2ms  段ごとの呼び出し [1, 4]
+    # 出力が一致: True
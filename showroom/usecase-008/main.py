@@ -1,7 +1,16 @@
 # showroom/usecase-008/main.py
 from agents import Agent, Runner
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel
+from typing import AsyncIterator, Callable, List, Optional, Set, Tuple
+import asyncio
+import inspect
+import json
 import os
+import re
+import time
 
 # Load environment variables
 load_dotenv()
@@ -15,6 +24,388 @@ set_default_openai_key(openai_api_key)
 # Agent Clone: 既存のエージェントのコピーを作成し、プロパティを変更する機能
 # 基本設定を維持しながら、特定の属性だけを変更したバリエーションを作成できます
 
+
+# リクエストのまとめ: 短いテキストを1回のモデル呼び出しでまとめて翻訳する仕組み
+# UI の文言のような短いテキストを大量に翻訳すると、1件ごとの呼び出しのオーバーヘッドが支配的に
+# なります。BatchingTranslator は短い時間窓に届いた翻訳リクエストを最大 K 件（トークン数の上限つき）
+# まとめ、番号付きリストを output_type に持つクローンで1回だけ実行し、検証済みの結果を番号で
+# 各呼び出し元に返します（1件ずつの場合との比較は benchmark.py）
+class TranslationItem(BaseModel):
+    index: int
+    text: str
+
+
+class TranslationBatch(BaseModel):
+    translations: List[TranslationItem]
+
+
+BATCH_INSTRUCTIONS = """
+入力は {"index": 番号, "text": テキスト} の JSON 配列です。各テキストを個別に翻訳し、
+translations に同じ index を付けてすべて返してください。テキストどうしを結合したり省略したりしないでください。
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    # 日本語は1文字がおよそ1トークンになるため、UTF-8 のバイト数から大まかに見積もる
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def estimate_item_tokens(text: str, index: int) -> int:
+    # まとめた入力の1項目分（{"index": ..., "text": ...} の JSON と区切りを含む）
+    return estimate_tokens(json.dumps({"index": index, "text": text}, ensure_ascii=False) + ", ")
+
+
+def batch_instructions(instructions):
+    # 元の指示に BATCH_INSTRUCTIONS を加える。関数の指示（Dynamic Instructions）は、
+    # 呼び出されたときの結果に加える
+    if instructions is None:
+        return BATCH_INSTRUCTIONS
+    if not callable(instructions):
+        return f"{instructions}\n{BATCH_INSTRUCTIONS}"
+
+    async def dynamic_instructions(context, agent) -> str:
+        base = instructions(context, agent)
+        if inspect.isawaitable(base):
+            base = await base
+        return f"{base}\n{BATCH_INSTRUCTIONS}"
+
+    return dynamic_instructions
+
+
+@dataclass
+class BatchingStats:
+    texts: int = 0
+    calls: int = 0
+    fallbacks: int = 0  # 結果が欠けていて1件ずつ翻訳し直した数
+
+    @property
+    def calls_per_text(self) -> float:
+        return self.calls / self.texts if self.texts else 0.0
+
+
+class BatchingTranslator:
+    def __init__(
+        self,
+        translator: Agent,
+        max_batch: int = 20,
+        max_tokens: int = 1000,
+        window: float = 0.02,
+        max_concurrency: int = 4,
+    ):
+        self.translator = translator
+        self.batch_agent = translator.clone(
+            name=f"{translator.name} (Batch)",
+            instructions=batch_instructions(translator.instructions),
+            output_type=TranslationBatch,
+        )
+        self.max_batch = max_batch
+        self.max_tokens = max_tokens
+        self.window = window
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self.collector: Optional[asyncio.Task] = None
+        # 実行中のまとまり（asyncio はタスクを弱参照でしか持たないので、終わるまでここで参照を持つ）
+        self.batches: Set[asyncio.Task] = set()
+        self.stats = BatchingStats()
+
+    async def translate(self, text: str) -> str:
+        if self.collector is None or self.collector.done():
+            self.collector = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def close(self):
+        # まだまとめていないリクエストはキャンセルし、実行中のまとまりは終わるまで待つ
+        if self.collector is not None:
+            self.collector.cancel()
+            await asyncio.gather(self.collector, return_exceptions=True)
+        if self.batches:
+            await asyncio.gather(*self.batches, return_exceptions=True)
+
+    async def _collect(self):
+        # 最初のリクエストから window 秒以内に届いたものを、件数とトークン数の上限までまとめる
+        # （max_tokens はまとめた入力の JSON 配列の見積もりで、指示のトークン数は含まない）
+        loop = asyncio.get_running_loop()
+        pending = None
+        batch: List[Tuple[str, asyncio.Future]] = []
+        try:
+            while True:
+                batch = [pending or await self.queue.get()]
+                pending = None
+                tokens = estimate_item_tokens(batch[0][0], 0)
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    item_tokens = estimate_item_tokens(item[0], len(batch))
+                    if tokens + item_tokens > self.max_tokens:
+                        pending = item  # 次のまとまりの先頭にする
+                        break
+                    batch.append(item)
+                    tokens += item_tokens
+                await self.semaphore.acquire()  # 同時に実行する呼び出しの数を制限する
+                task = asyncio.create_task(self._run_batch(batch))
+                self.batches.add(task)
+                task.add_done_callback(self.batches.discard)
+                batch = []
+        except BaseException as error:
+            # collector が止まったら、まだ実行していないリクエストの呼び出し元を待たせたままにしない
+            waiting = batch + ([pending] if pending else [])
+            while not self.queue.empty():
+                waiting.append(self.queue.get_nowait())
+            for _, future in waiting:
+                if future.done():
+                    continue
+                if isinstance(error, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+            if not isinstance(error, Exception):
+                raise  # キャンセルなど
+            # 通常の例外の例外は呼び出し元に渡したので、次の translate() で collector を作り直す
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            self.stats.texts += len(batch)
+            if len(batch) == 1:
+                results = [await self._translate_one(batch[0][0])]
+            else:
+                results = await self._translate_batch([text for text, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            self.semaphore.release()
+
+    async def _translate_one(self, text: str) -> str:
+        self.stats.calls += 1
+        result = await Runner.run(self.translator, text)
+        return result.final_output
+
+    async def _translate_batch(self, texts: List[str]) -> List[str]:
+        self.stats.calls += 1
+        payload = json.dumps(
+            [{"index": i, "text": text} for i, text in enumerate(texts)], ensure_ascii=False
+        )
+        result = await Runner.run(self.batch_agent, payload)
+        translated = {item.index: item.text for item in result.final_output.translations}
+        missing = [i for i in range(len(texts)) if i not in translated]
+        # 欠けた番号があれば、その分だけ1件ずつ翻訳し直す
+        if missing:
+            self.stats.fallbacks += len(missing)
+            retried = await asyncio.gather(*(self._translate_one(texts[i]) for i in missing))
+            translated.update(zip(missing, retried))
+        return [translated[i] for i in range(len(texts))]
+
+
+# パイプライン: 前段のエージェントの出力を、完成を待たずに文単位で次段へ流す仕組み
+# 「翻訳 → ビジネス向けの書き換え」のように段をつなぐと、通常は前段の応答がすべて終わるまで
+# 次段を始められません。AgentPipeline は各段を Runner.run_streamed で実行し、文末まで届いた
+# 部分を上限つきのキューで次段に渡すので、段どうしが重なって進みます。次段は実行を始める時点で
+# キューに溜まっている文をまとめて1回の入力にします（文ごとに独立して処理できる変換向けです）
+SENTENCE_END = re.compile(r"[。！？!?\n]|\.(?=\s)")
+
+
+def split_sentences(buffer: str) -> Tuple[str, str]:
+    # (文末まで届いた部分, 残り) に分ける
+    last = None
+    for last in SENTENCE_END.finditer(buffer):
+        pass
+    if last is None:
+        return "", buffer
+    return buffer[: last.end()], buffer[last.end() :]
+
+
+async def stream_text(agent: Agent, input: str) -> AsyncIterator[str]:
+    result = Runner.run_streamed(agent, input)
+    async for event in result.stream_events():
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            yield event.data.delta
+
+
+@dataclass
+class PipelineResult:
+    final_output: str
+    elapsed: float
+    ttft: Optional[float]  # 最終段の最初の差分が届くまでの時間
+    calls: List[int] = field(default_factory=list)  # 段ごとのモデル呼び出しの回数
+
+
+class _FinalOutput:
+    def __init__(self, started: float, on_text: Optional[Callable[[str], None]]):
+        self.started = started
+        self.on_text = on_text
+        self.parts: List[str] = []
+        self.ttft: Optional[float] = None
+
+    def emit(self, delta: str):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+        self.parts.append(delta)
+        if self.on_text:
+            self.on_text(delta)
+
+
+class AgentPipeline:
+    """
+    エージェントの段をつなぎ、前段の出力を文単位で次段へ流しながら実行します。
+
+    2段目以降は1つの入力を何回かに分けて実行し、各呼び出しにはその回にまとめた文だけを渡します。
+    前後の文は文脈として渡さないため、文をまたいだ指示語の解決や言い回しの統一はできません
+    （文ごとに独立して処理できる翻訳・書き換え向けです）。各呼び出しの出力はそのまま連結されるので、
+    モデルが先頭や末尾の空白を落とすと文の間の空白も失われます。英語のように単語を空白で区切る
+    言語では separator=" " を指定してください。
+    """
+
+    def __init__(
+        self,
+        stages: List[Agent],
+        buffer_size: int = 8,
+        max_inflight: int = 2,
+        separator: str = "",
+        delta_buffer_size: int = 64,
+    ):
+        self.stages = stages
+        self.buffer_size = buffer_size  # 段の間のキューに溜められる文のまとまりの数
+        self.max_inflight = max_inflight  # 1つの段で同時に実行できるモデル呼び出しの数
+        # 呼び出しごとのストリームの差分を溜められる数。先の呼び出しの出力を転送している間、
+        # 後の呼び出しはここが一杯になったところで読み出しを待つ
+        self.delta_buffer_size = delta_buffer_size
+        self.separator = separator  # 2段目以降で、呼び出しごとの出力の間に入れる文字列
+
+    async def run(self, text: str, on_text: Optional[Callable[[str], None]] = None) -> PipelineResult:
+        started = time.perf_counter()
+        final = _FinalOutput(started, on_text)
+        queues = [asyncio.Queue(maxsize=self.buffer_size) for _ in self.stages[1:]]
+        calls = [0] * len(self.stages)
+        tasks: List[asyncio.Task] = []
+
+        async def next_input(index: int, first: bool) -> Optional[str]:
+            if index == 0:
+                return text if first else None
+            source = queues[index - 1]
+            chunk = await source.get()
+            if chunk is None:
+                return None
+            # 溜まっている文をまとめて1回の入力にする（終わりの印は次の呼び出しのために戻す）
+            while not source.empty():
+                more = source.get_nowait()
+                if more is None:
+                    source.put_nowait(None)
+                    break
+                chunk += more
+            return chunk
+
+        async def produce(agent: Agent, chunk: str, deltas: asyncio.Queue, slots: asyncio.Semaphore):
+            try:
+                async for delta in stream_text(agent, chunk):
+                    await deltas.put(delta)
+                await deltas.put(None)
+            except Exception as error:
+                await deltas.put(error)
+            finally:
+                slots.release()
+
+        async def start_runs(index: int, runs: asyncio.Queue):
+            # 空きができてから入力を取り出すので、待っている間に届いた文は次の呼び出しにまとまる
+            slots = asyncio.Semaphore(self.max_inflight)
+            first = True
+            while True:
+                await slots.acquire()
+                chunk = await next_input(index, first)
+                first = False
+                if chunk is None:
+                    await runs.put(None)
+                    return
+                calls[index] += 1
+                deltas: asyncio.Queue = asyncio.Queue(maxsize=self.delta_buffer_size)
+                await runs.put(deltas)
+                tasks.append(asyncio.create_task(produce(self.stages[index], chunk, deltas, slots)))
+
+        async def forward(index: int, runs: asyncio.Queue):
+            # 呼び出しは重なって進むが、出力は入力の順に次段（最終段なら呼び出し元）へ渡す
+            sink = queues[index] if index < len(queues) else None
+            first = True
+            while True:
+                deltas = await runs.get()
+                if deltas is None:
+                    break
+                pending = ""
+                if not first and self.separator:
+                    if sink is None:
+                        final.emit(self.separator)
+                    else:
+                        pending = self.separator
+                first = False
+                while True:
+                    delta = await deltas.get()
+                    if delta is None:
+                        break
+                    if isinstance(delta, Exception):
+                        raise delta
+                    if sink is None:
+                        final.emit(delta)
+                        continue
+                    pending += delta
+                    complete, pending = split_sentences(pending)
+                    if complete:
+                        await sink.put(complete)  # キューが一杯なら次段が追いつくまで待つ
+                if sink is not None and pending:
+                    await sink.put(pending)
+            if sink is not None:
+                await sink.put(None)
+
+        for index in range(len(self.stages)):
+            runs: asyncio.Queue = asyncio.Queue()
+            tasks.append(asyncio.create_task(start_runs(index, runs)))
+            tasks.append(asyncio.create_task(forward(index, runs)))
+        try:
+            # 実行中に produce のタスクが追加されるので、すべて終わるまで待つ
+            while not all(task.done() for task in tasks):
+                await asyncio.gather(*tasks)
+        except BaseException:
+            # どこかの段が失敗したら、キューで待っている他の段も止める
+            for task in tasks:
+                task.cancel()
+            raise
+        return PipelineResult(
+            final_output="".join(final.parts),
+            elapsed=time.perf_counter() - started,
+            ttft=final.ttft,
+            calls=calls,
+        )
+
+
+async def run_chain_sequential(
+    stages: List[Agent], text: str, on_text: Optional[Callable[[str], None]] = None
+) -> PipelineResult:
+    # 比較用: 各段の応答がすべて終わってから次段を始める
+    started = time.perf_counter()
+    final = _FinalOutput(started, on_text)
+    for index, agent in enumerate(stages):
+        if index == len(stages) - 1:
+            async for delta in stream_text(agent, text):
+                final.emit(delta)
+        else:
+            text = "".join([delta async for delta in stream_text(agent, text)])
+    return PipelineResult(
+        final_output="".join(final.parts),
+        elapsed=time.perf_counter() - started,
+        ttft=final.ttft,
+        calls=[1] * len(stages),
+    )
+
+
 if __name__ == "__main__":
     # 基本となる翻訳エージェントの定義
     base_translator = Agent(
@@ -74,6 +465,48 @@ if __name__ == "__main__":
         casual_translator, f"次のテキストを翻訳してください: '{query_ja}'"
     )
     print(result_casual.final_output)
+    print("-" * 40)
+
+    # クローン4: 短い UI の文言をまとめて翻訳する（番号付きリストを出力するクローンを内部で作る）
+    ui_translator = base_translator.clone(
+        name="UI Translator",
+        instructions="入力されたテキストを英語に翻訳してください。アプリの UI の文言として短く自然な表現にしてください。",
+    )
+    ui_texts = ["保存", "キャンセル", "設定を開く", "ログアウトしますか？", "ファイルが見つかりません"]
+
+    async def translate_ui_texts():
+        batching = BatchingTranslator(ui_translator, max_batch=20)
+        try:
+            translations = await asyncio.gather(*(batching.translate(text) for text in ui_texts))
+        finally:
+            await batching.close()
+        return translations, batching.stats
+
+    print("\nUI 文言のまとめ翻訳（クローン4）:")
+    translations, stats = asyncio.run(translate_ui_texts())
+    for text, translation in zip(ui_texts, translations):
+        print(f"{text} -> {translation}")
+    print(f"（{stats.texts} 件を {stats.calls} 回のモデル呼び出しで翻訳）")
+    print("-" * 40)
+
+    # 翻訳 → ビジネス向けの書き換えをパイプラインでつなぐ（前段の文が届いた順に次段が書き換える）
+    english_translator = base_translator.clone(
+        name="English Translator",
+        instructions="入力されたテキストを英語に翻訳してください。訳文だけを出力してください。",
+    )
+    business_rewriter = base_translator.clone(
+        name="Business Rewriter",
+        instructions="入力された英文を、ビジネス文書に適した丁寧で専門的な表現に書き換えてください。書き換えた文だけを出力してください。",
+    )
+    pipeline = AgentPipeline([english_translator, business_rewriter], separator=" ")
+    document = (
+        "こんにちは、世界。今日はいい天気ですね。会議は午後三時に始まります。"
+        "資料は前日までに共有してください。ご不明な点があれば連絡してください。"
+    )
+
+    print("\nパイプライン（翻訳 → ビジネス向けの書き換え）:")
+    piped = asyncio.run(pipeline.run(document, on_text=lambda text: print(text, end="", flush=True)))
+    print(f"\n（最初の出力まで {piped.ttft:.2f}秒, 全体 {piped.elapsed:.2f}秒, 段ごとの呼び出し {piped.calls}）")
 
     # 例として期待される出力：
     # 基本翻訳エージェント（デフォルト設定）:
@@ -87,3 +520,15 @@ if __name__ == "__main__":
     #
     # カジュアル翻訳エージェント（クローン3）:
     # Hey there! Awesome weather we're having today, right?
+    #
+    # UI 文言のまとめ翻訳（クローン4）:
+    # 保存 -> Save
+    # キャンセル -> Cancel
+    # 設定を開く -> Open Settings
+    # ログアウトしますか？ -> Log out?
+    # ファイルが見つかりません -> File not found
+    # （5 件を 1 回のモデル呼び出しで翻訳）
+    #
+    # パイプライン（翻訳 → ビジネス向けの書き換え）:
+    # Greetings to all. The weather is quite pleasant today. The meeting will commence at 3:00 p.m. ...
+    # （最初の出力まで 2.10秒, 全体 6.35秒, 段ごとの呼び出し [1, 3]）
@@ -0,0 +1,356 @@
+# showroom/usecase-009/benchmark.py
+# 1ターンで複数のツール呼び出しが返ってきたときの所要時間を比較します（ローカルのスタブモデルを使用）
+# - 元のツール: backend_tool を使わない同期関数の @function_tool（SDK が asyncio.to_thread で並行に実行する）
+# - backend_tool: 専用のスレッドプールで実行するツール（更新系はモデルが出力した順に1つずつ適用）
+# - まとめて: get_tasks で1回のツール呼び出し・1回のバックエンド往復にまとめる
+# また、長いセッションで保持する実行結果1件あたりのメモリを RunResult と LeanRunResult で比較し、
+# ツール出力のエンコード（ToolOutputEncoder）で各ターンの入力トークン数と待ち時間がどれだけ減るかを計測します
+from agents import Agent, Runner, ModelResponse, Usage, function_tool, set_tracing_disabled
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from typing import Dict, List, Tuple
+import asyncio
+import copy
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+import main
+from main import (
+    LeanRunResult,
+    ToolOutputEncoder,
+    add_task,
+    complete_task,
+    get_all_tasks,
+    get_task,
+    get_tasks,
+    tool_output_encoding,
+)
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+
+    TOKEN_COUNTER = "tiktoken (o200k_base)"
+except ImportError:
+
+    def count_tokens(text: str) -> int:
+        # tiktoken がなければ、ASCII は4文字、それ以外は1文字を1トークンとして見積もる
+        ascii_chars = sum(1 for char in text if ord(char) < 128)
+        return ascii_chars // 4 + (len(text) - ascii_chars)
+
+    TOKEN_COUNTER = "概算（ASCII 4文字 / それ以外 1文字 = 1トークン）"
+
+BACKEND_LATENCY = 0.1
+TOOL_CALLS = 8
+
+INITIAL_TASKS = copy.deepcopy(main.memory_store["tasks"]) + [
+    {"id": task_id, "title": f"タスク{task_id}", "completed": False}
+    for task_id in range(4, TOOL_CALLS + 1)
+]
+
+
+# 変更前と同じ、backend_tool を使わない同期関数のツール
+@function_tool
+def get_task_plain(task_id: int) -> Dict:
+    """
+    指定されたIDのタスクを取得します。
+
+    Args:
+        task_id: 取得するタスクのID
+    """
+    time.sleep(main.BACKEND_LATENCY)
+    for task in main.memory_store["tasks"]:
+        if task["id"] == task_id:
+            return task
+    return {"error": "タスクが見つかりません"}
+
+
+# 最初の呼び出しで指定されたツール呼び出しをまとめて返し、ツールの結果を受け取ったら応答するスタブモデル
+class ToolCallingStubModel(StubModelBase):
+    def __init__(self, calls: List[Tuple[str, dict]]):
+        self.calls = calls
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        # 直前のアイテムがツールの結果でなければ（新しいターンなら）ツールを呼び出す
+        if input[-1].get("type") != "function_call_output":
+            output = [
+                ResponseFunctionToolCall(
+                    type="function_call",
+                    id=f"fc_{i}",
+                    call_id=f"call_{i}",
+                    name=name,
+                    arguments=json.dumps(arguments, ensure_ascii=False),
+                    status="completed",
+                )
+                for i, (name, arguments) in enumerate(self.calls)
+            ]
+        else:
+            output = [
+                ResponseOutputMessage(
+                    id="msg_stub",
+                    type="message",
+                    role="assistant",
+                    status="completed",
+                    content=[ResponseOutputText(type="output_text", text="完了しました。", annotations=[])],
+                )
+            ]
+        return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+
+async def run_turn(tool, calls: List[Tuple[str, dict]]) -> float:
+    main.memory_store["tasks"] = copy.deepcopy(INITIAL_TASKS)
+    agent = Agent(name="Task Manager", model=ToolCallingStubModel(calls), tools=[tool])
+    started = time.perf_counter()
+    await Runner.run(agent, "タスクを確認してください。")
+    return time.perf_counter() - started
+
+
+async def run_benchmark():
+    set_tracing_disabled(True)
+    main.BACKEND_LATENCY = BACKEND_LATENCY
+    task_ids = list(range(1, TOOL_CALLS + 1))
+    single_calls = [("get_task", {"task_id": task_id}) for task_id in task_ids]
+
+    print("【Usecase-009 ベンチマーク: 1ターン内の複数ツール呼び出し】")
+    print(f"バックエンド1回あたり {BACKEND_LATENCY * 1000:.0f}ms, get_task を {TOOL_CALLS} 回呼び出すターン")
+    print("-" * 40)
+
+    plain = await run_turn(get_task_plain, [("get_task_plain", args) for _, args in single_calls])
+    concurrent = await run_turn(get_task, single_calls)
+    batched = await run_turn(get_tasks, [("get_tasks", {"task_ids": task_ids})])
+    print(f"元のツール（同期関数）    : {plain * 1000:7.1f}ms  ツール呼び出し {TOOL_CALLS} 回")
+    print(f"backend_tool              : {concurrent * 1000:7.1f}ms  ツール呼び出し {TOOL_CALLS} 回")
+    print(f"まとめて（get_tasks）     : {batched * 1000:7.1f}ms  ツール呼び出し 1 回")
+    print("-" * 40)
+
+    # 更新系のツールは同じターン内でもモデルが出力した順に1つずつ適用される（SDK がツールを
+    # 出力順に開始することに依存しているので、ここで確かめる）
+    titles = [f"追加タスク{i}" for i in range(TOOL_CALLS)]
+    elapsed = await run_turn(add_task, [("add_task", {"title": title}) for title in titles])
+    added = [task["title"] for task in main.memory_store["tasks"][len(INITIAL_TASKS) :]]
+    print(f"add_task x{TOOL_CALLS}（更新系は直列）: {elapsed * 1000:7.1f}ms")
+    print(f"  出力した順に追加された: {added == titles}")
+    print("-" * 40)
+
+    # 長いセッションで各ターンの結果を保持したときの、1件あたりのメモリ
+    print(f"保持する実行結果のメモリ（{SESSIONS} セッション × {TURNS} ターン）")
+    for lean, label in [(False, "RunResult    "), (True, "LeanRunResult")]:
+        per_result, history = await measure_retained(lean)
+        print(f"  {label}: 1件あたり {per_result / 1024:6.1f} KiB  （最終ターンの履歴 {history} アイテム）")
+
+
+SESSIONS = 20
+TURNS = 10
+
+
+async def measure_retained(lean: bool) -> Tuple[float, int]:
+    main.memory_store["tasks"] = copy.deepcopy(INITIAL_TASKS)
+    agent = Agent(
+        name="Task Manager",
+        model=ToolCallingStubModel([("get_all_tasks", {})]),
+        tools=[get_all_tasks],
+    )
+    gc.collect()
+    tracemalloc.start()
+    retained = []
+    for _ in range(SESSIONS):
+        previous = None
+        for turn in range(TURNS):
+            history = previous.to_input_list() if previous is not None else []
+            query = {"role": "user", "content": f"タスク一覧を表示してください（{turn + 1}回目）。"}
+            result = await Runner.run(agent, history + [query])
+            previous = LeanRunResult(result, previous) if lean else result
+            retained.append(previous)
+            del result
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(retained), len(previous.to_input_list())
+
+
+# ツール出力のエンコードの計測に使う、実際のタスク管理に近い 40 件のタスク
+REALISTIC_TASKS = [
+    {"id": i + 1, "title": title, "completed": i % 3 == 0}
+    for i, title in enumerate(
+        f"{subject}の{action}"
+        for subject in ["四半期レポート", "顧客ミーティング", "新機能リリース", "採用面接", "予算申請"]
+        for action in ["資料作成", "日程調整", "レビュー依頼", "関係者への共有", "議事録の整理", "最終確認", "予約手配", "振り返り"]
+    )
+]
+
+# ユーザーの質問ごとに、モデルが返すツール呼び出し
+ENCODING_SCRIPT = [
+    ("タスク一覧を表示してください。", [("get_all_tasks", {})]),
+    ("タスク5の詳細を教えてください。", [("get_task", {"task_id": 5})]),
+    ("タスク1から8をまとめて確認してください。", [("get_tasks", {"task_ids": list(range(1, 9))})]),
+    ("タスク3を完了にしてください。", [("complete_task", {"task_id": 3})]),
+    ("もう一度タスク一覧を表示してください。", [("get_all_tasks", {})]),
+]
+PREFILL_PER_TOKEN = 0.0002  # 入力トークン1つあたりの処理時間（秒）
+CALL_LATENCY = 0.05
+
+
+def _item_text(item: dict) -> str:
+    if "content" in item:
+        content = item["content"]
+        return content if isinstance(content, str) else "".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return str(item.get("arguments", "")) + str(item.get("output", ""))
+
+
+# 質問に応じたツール呼び出しを返し、入力トークン数に比例した時間をかけて応答するスタブモデル
+class ContextCostStubModel(StubModelBase):
+    def __init__(self):
+        self.input_tokens: List[int] = []
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        tokens = count_tokens(system_instructions or "") + sum(
+            count_tokens(_item_text(item)) for item in input
+        )
+        self.input_tokens.append(tokens)
+        await asyncio.sleep(CALL_LATENCY + PREFILL_PER_TOKEN * tokens)
+        last = input[-1]
+        if last.get("role") == "user":
+            calls = dict(ENCODING_SCRIPT)[last["content"]]
+            output = [
+                ResponseFunctionToolCall(
+                    type="function_call",
+                    id=f"fc_{i}",
+                    call_id=f"call_{len(input)}_{i}",
+                    name=name,
+                    arguments=json.dumps(arguments, ensure_ascii=False),
+                    status="completed",
+                )
+                for i, (name, arguments) in enumerate(calls)
+            ]
+        else:
+            output = [
+                ResponseOutputMessage(
+                    id="msg_stub",
+                    type="message",
+                    role="assistant",
+                    status="completed",
+                    content=[ResponseOutputText(type="output_text", text="対応しました。", annotations=[])],
+                )
+            ]
+        return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+
+async def run_encoding_session(compact: bool) -> List[Tuple[int, float]]:
+    # 履歴を引き継ぎながら ENCODING_SCRIPT を実行し、ターンごとの (入力トークン数, 所要時間) を返す
+    main.memory_store["tasks"] = copy.deepcopy(REALISTIC_TASKS)
+    encoder = ToolOutputEncoder()
+    model = ContextCostStubModel()
+    agent = Agent(
+        name="Task Manager",
+        instructions="あなたはタスク管理アシスタントです。" + (encoder.legend() if compact else ""),
+        model=model,
+        tools=[get_all_tasks, get_task, get_tasks, complete_task],
+    )
+    turns = []
+    history: List[dict] = []
+    for query, _ in ENCODING_SCRIPT:
+        calls_before = len(model.input_tokens)
+        started = time.perf_counter()
+        turn_input = history + [{"role": "user", "content": query}]
+        if compact:
+            with tool_output_encoding(encoder):
+                result = await Runner.run(agent, turn_input)
+        else:
+            result = await Runner.run(agent, turn_input)
+        elapsed = time.perf_counter() - started
+        turns.append((sum(model.input_tokens[calls_before:]), elapsed))
+        history = result.to_input_list()
+    return turns
+
+
+async def run_encoding_benchmark():
+    print("-" * 40)
+    print(f"ツール出力のエンコード（タスク {len(REALISTIC_TASKS)} 件、{len(ENCODING_SCRIPT)} ターンの会話）")
+    print(f"トークン数: {TOKEN_COUNTER}、スタブは 1回 {CALL_LATENCY * 1000:.0f}ms + 入力1トークン {PREFILL_PER_TOKEN * 1000:.1f}ms")
+    plain = await run_encoding_session(compact=False)
+    compact = await run_encoding_session(compact=True)
+    for i, ((query, _), (plain_tokens, plain_time), (tokens, elapsed)) in enumerate(
+        zip(ENCODING_SCRIPT, plain, compact), 1
+    ):
+        print(
+            f"  ターン{i}: 入力 {plain_tokens:5d} → {tokens:5d} トークン（-{1 - tokens / plain_tokens:.0%}）"
+            f"  {plain_time * 1000:6.1f} → {elapsed * 1000:6.1f}ms  {query}"
+        )
+    plain_total = sum(tokens for tokens, _ in plain)
+    compact_total = sum(tokens for tokens, _ in compact)
+    print(
+        f"  合計: {plain_total} → {compact_total} トークン（-{1 - compact_total / plain_total:.0%}）, "
+        f"{sum(t for _, t in plain):.2f} → {sum(t for _, t in compact):.2f}秒"
+    )
+
+    encoder = ToolOutputEncoder(dedup=False)
+    started = time.perf_counter()
+    for _ in range(1000):
+        encoder.encode(REALISTIC_TASKS)
+    print(f"  エンコードのコスト: タスク {len(REALISTIC_TASKS)} 件の表で {(time.perf_counter() - started) * 1000:.1f}µs")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
+    asyncio.run(run_encoding_benchmark())
+
+    # 例として期待される出力：
+    # バックエンド1回あたり 100ms, get_task を 8 回呼び出すターン
+    # ----------------------------------------
+    # 元のツール（同期関数）    :   315.1ms  ツール呼び出し 8 回
+    # backend_tool              :   113.8ms  ツール呼び出し 8 回
+    # まとめて（get_tasks）     :   107.0ms  ツール呼び出し 1 回
+    # ----------------------------------------
+    # add_task x8（更新系は直列）:   831.0ms
+    #   出力した順に追加された: True
+    # ----------------------------------------
+    # 保持する実行結果のメモリ（20 セッション × 10 ターン）
+    #   RunResult    : 1件あたり   24.6 KiB  （最終ターンの履歴 40 アイテム）
+    #   LeanRunResult: 1件あたり    1.8 KiB  （最終ターンの履歴 40 アイテム）
+    # ----------------------------------------
+    # ツール出力のエンコード（タスク 40 件、5 ターンの会話）
+    # トークン数: 概算（ASCII 4文字 / それ以外 1文字 = 1トークン）、スタブは 1回 50ms + 入力1トークン 0.2ms
+    #   ターン1: 入力   985 →   769 トークン（-22%）   424.9 →  263.1ms  タスク一覧を表示してください。
+    #   ターン2: 入力  1975 →  1351 トークン（-32%）   506.7 →  379.4ms  タスク5の詳細を教えてください。
+    #   ターン3: 入力  2253 →  1423 トークン（-37%）   562.7 →  393.6ms  タスク1から8をまとめて確認してください。
+    #   ターン4: 入力  2521 →  1505 トークン（-40%）   619.0 →  410.7ms  タスク3を完了にしてください。
+    #   ターン5: 入力  3519 →  1620 トークン（-54%）   813.9 →  433.3ms  もう一度タスク一覧を表示してください。
+    #   合計: 11253 → 6668 トークン（-41%）, 2.93 → 1.88秒
+    #   エンコードのコスト: タスク 40 件の表で 134.4µs
@@ -1,9 +1,18 @@
 # showroom/usecase-009/main.py
 from agents import Agent, Runner, function_tool
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
-from typing import List, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import csv
+import functools
+import io
 import os
 import json
+import time
+import weakref
 
 # Load environment variables
 load_dotenv()
@@ -26,17 +35,335 @@ memory_store = {
     ]
 }
 
+# 実際のバックエンドを想定した1回あたりの待ち時間（秒）。例: TASK_BACKEND_LATENCY=0.2
+BACKEND_LATENCY = float(os.getenv("TASK_BACKEND_LATENCY", "0"))
+
+# 同じターンで呼ばれた複数のツールを並行して実行する仕組み
+# - 同期関数は専用のスレッドプール（8スレッド）で実行する。SDK も同期関数のツールを
+#   asyncio.to_thread で並行に実行するが、既定のスレッドプールは CPU 数 + 4 スレッドまでなので、
+#   CPU の少ない環境では待ち時間の長いバックエンド呼び出しが詰まる（比較は benchmark.py）
+# - 更新系（mutating=True）のツールは、同じタスクストアを更新するものだけをロックで1つずつ実行する
+#   （別のストアを使うセッションどうしは待たせない）。asyncio.Lock は待った順に取得される
+#   ため、更新はツールの実行が始まった順に適用される。モデルが出力した順になるのは、SDK が
+#   ツール呼び出しのタスクを出力順に作成し、ツールの関数を呼ぶまでに待ちが入らない場合に限られる
+#   （openai-agents 0.24 の動作。時間のかかる on_tool_start フックやツールの入力ガードレールを
+#   使う場合や、SDK の実装が変わった場合は順序が入れ替わりうる。benchmark.py で確認している）
+_tool_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="task-tool")
+_mutation_locks: Dict[Tuple[asyncio.AbstractEventLoop, int], List[Any]] = {}
+
+
+def default_task_store() -> List[Dict]:
+    return memory_store["tasks"]
+
+
+@asynccontextmanager
+async def _mutation_lock(store: Any):
+    # ロックはイベントループとストアの組ごとに持つ（run_sync は呼び出しごとにループが変わることがある）。
+    # 使っている間だけ保持し、待っている呼び出しがなくなったら捨てる
+    key = (asyncio.get_running_loop(), id(store))
+    entry = _mutation_locks.setdefault(key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _mutation_locks[key]
+
+
+def backend_tool(mutating: bool = False, store: Callable[[], Any] = default_task_store):
+    # store は更新系のツールが書き換えるタスクストアを返す関数（ロックの単位になる）
+    def decorator(func):
+        async def call(*args, **kwargs):
+            if asyncio.iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _tool_executor, functools.partial(func, *args, **kwargs)
+            )
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if mutating:
+                async with _mutation_lock(store()):
+                    output = await call(*args, **kwargs)
+            else:
+                output = await call(*args, **kwargs)
+            # 出力のエンコード（tool_output_encoding の中で実行されたときだけ）
+            encoder = _tool_output_encoder.get()
+            return encoder.encode(output) if encoder is not None else output
+
+        return wrapper
+
+    return decorator
+
+
+def _simulate_backend_latency():
+    if BACKEND_LATENCY:
+        time.sleep(BACKEND_LATENCY)
+
+
+# ツール出力のコンパクトなエンコード（COMPACT_TOOL_OUTPUT=1 で有効）
+# ツールが返した dict / list はそのままだと Python の repr で文字列化され、空白や長いキーを含んだまま
+# モデルに送られます。さらに同じタスクが毎ターン送り直されます。ToolOutputEncoder は
+# - 空白なし・キーを短くした決定的な JSON（キーの順序も固定）
+# - 同じキーを持つ dict のリストは、1行目を列名にした CSV 風の表
+# - 会話の中ですでに送ったのと同じ内容のタスクは「@ID」という短い参照
+# に変換します。参照の意味はモデルへの指示（legend）で説明します
+# 参照できるのはモデルが履歴で受け取った内容だけなので、ターンの中で送った内容はいったん pending に
+# 記録し、tool_output_encoding を正常に抜けた（実行結果が履歴になった）ときだけ sent に確定します
+TASK_KEY_MAP = {"id": "id", "title": "t", "completed": "done"}
+COMPACT_TOOL_OUTPUT = os.getenv("COMPACT_TOOL_OUTPUT") == "1"
+
+
+class ToolOutputEncoder:
+    def __init__(
+        self,
+        key_map: Optional[Dict[str, str]] = None,
+        dedup: bool = True,
+        sent: Optional[Dict[Any, str]] = None,
+    ):
+        self.key_map = key_map if key_map is not None else TASK_KEY_MAP
+        self.dedup = dedup
+        self.sent: Dict[Any, str] = dict(sent) if sent else {}  # ID -> 履歴にある送った内容
+        self.pending: Dict[Any, str] = {}  # ID -> このターンで送った内容（まだ確定していない）
+
+    def fork(self) -> "ToolOutputEncoder":
+        # 確定した内容だけを引き継いだコピー（同じ履歴から別のターンを始めるとき用）
+        return ToolOutputEncoder(self.key_map, self.dedup, self.sent)
+
+    def commit(self):
+        self.sent.update(self.pending)
+        self.pending.clear()
+
+    def rollback(self):
+        self.pending.clear()
+
+    def legend(self) -> str:
+        names = ", ".join(f"{short}={key}" for key, short in self.key_map.items() if key != short)
+        return (
+            f"ツールの結果は短い形式です（{names}、真偽値は 1/0）。"
+            "同じキーのリストは1行目が列名の CSV 形式です。"
+            "「@ID」はこの会話ですでに受け取った同じ ID のタスクと同じ内容を表します。"
+        )
+
+    def _value(self, value: Any) -> Any:
+        return int(value) if isinstance(value, bool) else value
+
+    def _record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {self.key_map.get(key, key): self._value(value) for key, value in record.items()}
+
+    def _reference(self, record: Dict[str, Any]) -> Optional[str]:
+        # 同じ内容をすでに送っていれば参照を返し、そうでなければこのターンで送ったものとして記録する
+        # （JSON と表のどちらで送ったかに関係なく、正規化した JSON で比べる）
+        if not self.dedup or "id" not in record:
+            return None
+        encoded = self._json(self._record(record))
+        previous = self.pending.get(record["id"], self.sent.get(record["id"]))
+        if previous == encoded:
+            return f"@{record['id']}"
+        self.pending[record["id"]] = encoded
+        return None
+
+    def _json(self, value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+    def encode(self, output: Any) -> str:
+        if isinstance(output, dict):
+            return self._reference(output) or self._json(self._record(output))
+        if (
+            isinstance(output, list)
+            and output
+            and all(isinstance(item, dict) for item in output)
+            and len({tuple(item) for item in output}) == 1
+        ):
+            return self._table(output)
+        if isinstance(output, list):
+            # 文字列などのスカラーも JSON にする（そのまま並べると "b,c" の区切りと区別できない）
+            items = (
+                self.encode(item) if isinstance(item, (dict, list)) else self._json(item)
+                for item in output
+            )
+            return "[" + ",".join(items) + "]"
+        return output if isinstance(output, str) else self._json(output)
+
+    def _table(self, records: List[Dict[str, Any]]) -> str:
+        columns = list(records[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow([self.key_map.get(column, column) for column in columns])
+        for record in records:
+            reference = self._reference(record)
+            writer.writerow([reference] if reference else [self._value(record[c]) for c in columns])
+        return buffer.getvalue().rstrip("\n")
+
+
+_tool_output_encoder: "ContextVar[Optional[ToolOutputEncoder]]" = ContextVar(
+    "tool_output_encoder", default=None
+)
+
+
+@contextmanager
+def tool_output_encoding(encoder: ToolOutputEncoder):
+    # この中で開始した実行では、backend_tool のツールの出力が encoder で変換される
+    # 正常に抜けたときだけ送った内容を確定し、例外（MaxTurnsExceeded やガードレールなど）では破棄する。
+    # 次のターンには、この実行の結果から作った履歴をそのまま渡すこと
+    token = _tool_output_encoder.set(encoder)
+    try:
+        yield encoder
+    except BaseException:
+        encoder.rollback()
+        raise
+    else:
+        encoder.commit()
+    finally:
+        _tool_output_encoder.reset(token)
+
+
+# 長いセッションで保持する実行結果を軽くする仕組み（LEAN_RESULTS=1 で有効）
+# RunResult は生のモデル応答・生成されたすべてのアイテム・元の入力などを持ち続けますが、
+# 呼び出し側が使うのは final_output と次のターンの入力だけです。LeanRunResult は最終出力・
+# 使用量の合計・次のターンの入力に必要な最小限の履歴だけを __slots__ のオブジェクトに残し、
+# 元の RunResult は実行が終わった時点で手放せるようにします（比較は benchmark.py を参照）
+LEAN_RESULTS = os.getenv("LEAN_RESULTS") == "1"
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+
+
+class CompactItem:
+    # kind: "message" / "function_call" / "function_call_output"
+    __slots__ = ("kind", "role", "text", "call_id", "name")
+
+    def __init__(
+        self,
+        kind: str,
+        text: str,
+        role: Optional[str] = None,
+        call_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ):
+        self.kind = kind
+        self.text = text  # メッセージの本文、ツールの引数、またはツールの出力
+        self.role = role
+        self.call_id = call_id
+        self.name = name
+
+    @classmethod
+    def from_input_item(cls, item: Dict[str, Any]) -> Optional["CompactItem"]:
+        kind = item.get("type", "message")
+        if kind == "function_call":
+            return cls(kind, item["arguments"], call_id=item["call_id"], name=item["name"])
+        if kind == "function_call_output":
+            output = item["output"]
+            text = output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
+            return cls(kind, text, call_id=item["call_id"])
+        if kind == "message" and "role" in item:
+            return cls(kind, _message_text(item["content"]), role=item["role"])
+        # 推論アイテムなど、次のターンの入力に必須ではないものは残さない
+        return None
+
+    def to_input_item(self) -> Dict[str, Any]:
+        if self.kind == "function_call":
+            return {
+                "type": "function_call",
+                "call_id": self.call_id,
+                "name": self.name,
+                "arguments": self.text,
+            }
+        if self.kind == "function_call_output":
+            return {"type": "function_call_output", "call_id": self.call_id, "output": self.text}
+        return {"role": self.role, "content": self.text}
+
+
+class LeanRunResult:
+    __slots__ = (
+        "final_output",
+        "last_agent_name",
+        "requests",
+        "input_tokens",
+        "output_tokens",
+        "total_tokens",
+        "items",
+        "__weakref__",
+    )
+
+    def __init__(self, result, previous: Optional["LeanRunResult"] = None):
+        usage = result.context_wrapper.usage
+        self.final_output = result.final_output
+        self.last_agent_name = result.last_agent.name
+        self.requests = usage.requests
+        self.input_tokens = usage.input_tokens
+        self.output_tokens = usage.output_tokens
+        self.total_tokens = usage.total_tokens
+        # 前のターンの LeanRunResult から続けた場合、共通する履歴のオブジェクトは共有する
+        shared = previous.items if previous is not None else ()
+        compact = (
+            CompactItem.from_input_item(item) for item in result.to_input_list()[len(shared) :]
+        )
+        self.items = shared + tuple(item for item in compact if item is not None)
+
+    def to_input_list(self) -> List[Dict[str, Any]]:
+        # RunResult.to_input_list() と同じく、次のターンの入力として使える形に戻す
+        return [item.to_input_item() for item in self.items]
+
+
+# 実行結果（RunResult / LeanRunResult）ごとの、その履歴に対応するエンコーダー
+# 結果のオブジェクトが解放されたら一緒に消す
+_session_encoders: Dict[int, ToolOutputEncoder] = {}
+
+
+def _remember_encoder(result, encoder: ToolOutputEncoder):
+    _session_encoders[id(result)] = encoder
+    weakref.finalize(result, _session_encoders.pop, id(result), None)
+
+
+def run_session_turn(
+    agent,
+    previous,
+    query: str,
+    context: dict,
+    lean: bool = LEAN_RESULTS,
+    compact: bool = COMPACT_TOOL_OUTPUT,
+):
+    # 前のターンの結果（RunResult または LeanRunResult）に新しい質問を加えて実行する
+    history = previous.to_input_list() if previous is not None else []
+    turn_input = history + [{"role": "user", "content": query}]
+    if not compact:
+        result = Runner.run_sync(agent, turn_input, context=context)
+    else:
+        # 参照の対象は previous の履歴にある出力なので、エンコーダーは実行結果に結びつけて持つ
+        # （ツールから見える context には入れない）。同じ previous から何度始めても混ざらないよう、
+        # 確定した内容をコピーして使い、このターンが成功したときだけ新しい結果に結びつける
+        encoder = _session_encoders.get(id(previous)) if previous is not None else None
+        encoder = encoder.fork() if encoder is not None else ToolOutputEncoder()
+        with tool_output_encoding(encoder):
+            result = Runner.run_sync(agent, turn_input, context=context)
+    if lean:
+        # RunResult への参照はここで手放すので、生の応答などの重いデータはすぐに解放される
+        result = LeanRunResult(result, previous if isinstance(previous, LeanRunResult) else None)
+    if compact:
+        _remember_encoder(result, encoder)
+    return result
+
 
 # タスク管理用のツール
 @function_tool
+@backend_tool()
 def get_all_tasks() -> List[Dict]:
     """
     すべてのタスクを取得します。
     """
+    _simulate_backend_latency()
     return memory_store["tasks"]
 
 
 @function_tool
+@backend_tool()
 def get_task(task_id: int) -> Dict:
     """
     指定されたIDのタスクを取得します。
@@ -44,6 +371,7 @@ def get_task(task_id: int) -> Dict:
     Args:
         task_id: 取得するタスクのID
     """
+    _simulate_backend_latency()
     for task in memory_store["tasks"]:
         if task["id"] == task_id:
             return task
@@ -51,6 +379,24 @@ def get_task(task_id: int) -> Dict:
 
 
 @function_tool
+@backend_tool()
+def get_tasks(task_ids: List[int]) -> List[Dict]:
+    """
+    指定された複数のIDのタスクをまとめて取得します。複数のタスクが必要な場合は get_task を繰り返さずにこちらを使ってください。
+
+    Args:
+        task_ids: 取得するタスクのIDのリスト
+    """
+    _simulate_backend_latency()
+    tasks_by_id = {task["id"]: task for task in memory_store["tasks"]}
+    return [
+        tasks_by_id.get(task_id, {"id": task_id, "error": "タスクが見つかりません"})
+        for task_id in task_ids
+    ]
+
+
+@function_tool
+@backend_tool(mutating=True)
 def add_task(title: str) -> Dict:
     """
     新しいタスクを追加します。
@@ -58,6 +404,7 @@ def add_task(title: str) -> Dict:
     Args:
         title: 新しいタスクのタイトル
     """
+    _simulate_backend_latency()
     new_id = max([task["id"] for task in memory_store["tasks"]]) + 1
     new_task = {"id": new_id, "title": title, "completed": False}
     memory_store["tasks"].append(new_task)
@@ -65,6 +412,7 @@ def add_task(title: str) -> Dict:
 
 
 @function_tool
+@backend_tool(mutating=True)
 def complete_task(task_id: int) -> Dict:
     """
     タスクを完了状態に変更します。
@@ -72,6 +420,7 @@ def complete_task(task_id: int) -> Dict:
     Args:
         task_id: 完了するタスクのID
     """
+    _simulate_backend_latency()
     for task in memory_store["tasks"]:
         if task["id"] == task_id:
             task["completed"] = True
@@ -79,7 +428,32 @@ def complete_task(task_id: int) -> Dict:
     return {"error": "タスクが見つかりません"}
 
 
+@function_tool
+@backend_tool(mutating=True)
+def complete_tasks(task_ids: List[int]) -> List[Dict]:
+    """
+    複数のタスクをまとめて完了状態に変更します。複数のタスクを完了する場合は complete_task を繰り返さずにこちらを使ってください。
+
+    Args:
+        task_ids: 完了するタスクのIDのリスト
+    """
+    _simulate_backend_latency()
+    tasks_by_id = {task["id"]: task for task in memory_store["tasks"]}
+    results = []
+    for task_id in task_ids:
+        task = tasks_by_id.get(task_id)
+        if task is None:
+            results.append({"id": task_id, "error": "タスクが見つかりません"})
+        else:
+            task["completed"] = True
+            results.append(task)
+    return results
+
+
 if __name__ == "__main__":
+    # ツール出力をコンパクトにエンコードする場合は、その読み方を指示に加える
+    legend = ToolOutputEncoder().legend() if COMPACT_TOOL_OUTPUT else ""
+
     # タスク管理エージェントの定義
     task_agent = Agent(
         name="Task Manager",
@@ -87,9 +461,31 @@ if __name__ == "__main__":
         あなたはタスク管理アシスタントです。
         ユーザーのタスク管理を手伝います。
         タスクの一覧表示、追加、完了などの操作をサポートします。
-        """,
+        複数のタスクを取得・完了する場合は get_tasks / complete_tasks でまとめて処理してください。
+        """
+        + legend,
         model="o3-mini",
-        tools=[get_all_tasks, get_task, add_task, complete_task],
+        tools=[
+            get_all_tasks,
+            get_task,
+            get_tasks,
+            add_task,
+            complete_task,
+            complete_tasks,
+        ],
+    )
+
+    # 未完了タスクのみを表示する指示に切り替えたエージェント
+    # task_agent を書き換えず clone しておくことで、並行実行時にも指示が混ざらない
+    pending_only_agent = task_agent.clone(
+        instructions="""
+        あなたはタスク管理アシスタントです。
+        ユーザーのタスク管理を手伝います。
+        タスクの一覧表示、追加、完了などの操作をサポートします。
+        複数のタスクを取得・完了する場合は get_tasks / complete_tasks でまとめて処理してください。
+        タスク一覧を表示する際は、特に指定がない限り未完了のタスクのみを表示してください。
+        """
+        + legend,
     )
 
     print("【Usecase-009: 複数機能の組み合わせ】")
@@ -108,23 +504,18 @@ if __name__ == "__main__":
         "未完了のタスクだけを表示してください。",
     ]
 
-    # 会話の実行
+    # 会話の実行 - 前のターンの結果から次のターンの入力を作る
+    result = None
     for i, query in enumerate(conversations, 1):
         print(f"\n対話 {i}:")
         print(f"ユーザー: {query}")
 
         # 特定の対話でエージェントの指示を動的に変更
-        if i == 5:
-            # 5回目の対話では、未完了タスクのみを表示するように指示を変更
-            task_agent.instructions = """
-            あなたはタスク管理アシスタントです。
-            ユーザーのタスク管理を手伝います。
-            タスクの一覧表示、追加、完了などの操作をサポートします。
-            タスク一覧を表示する際は、特に指定がない限り未完了のタスクのみを表示してください。
-            """
-
-        # エージェントの実行（コンテキストを維持）
-        result = Runner.run_sync(task_agent, query, context=context)
+        # 5回目の対話では、未完了タスクのみを表示する指示のエージェントを使う
+        agent = pending_only_agent if i == 5 else task_agent
+
+        # エージェントの実行（コンテキストと会話履歴を維持）
+        result = run_session_turn(agent, result, query, context)
 
         print(f"エージェント: {result.final_output}")
 
@@ -0,0 +1,475 @@
+# showroom/usecase-011/main.py
+from agents import Agent, Runner, ModelResponse, Usage, set_tracing_disabled
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Semantic Cache: 言い換えられた質問にもキャッシュ済みの回答を返す機能
+# 入力を埋め込みベクトルに変換し、エージェントごとのベクトルインデックスを検索して
+# 類似度がしきい値を超えた場合は Runner.run を呼ばずにキャッシュした回答を返します
+
+
+# 文字 n-gram をハッシュしてベクトル化するローカル埋め込み
+# （ネットワーク不要で日本語の言い換えにもある程度強い）
+class HashingEmbedder:
+    def __init__(self, dim: int = 256, ngram_sizes: Tuple[int, ...] = (1, 2)):
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+
+    def embed_sync(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        normalized = "".join(text.lower().split())
+        for n in self.ngram_sizes:
+            for i in range(len(normalized) - n + 1):
+                digest = hashlib.blake2b(
+                    normalized[i : i + n].encode("utf-8"), digest_size=8
+                ).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vector[(value >> 1) % self.dim] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def embed(self, text: str) -> np.ndarray:
+        return self.embed_sync(text)
+
+
+# OpenAI の埋め込み API を使う埋め込み（本番用）
+class OpenAIEmbedder:
+    def __init__(self, model: str = "text-embedding-3-small", dim: int = 256):
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI()
+        self.model = model
+        self.dim = dim
+
+    async def embed(self, text: str) -> np.ndarray:
+        response = await self.client.embeddings.create(
+            model=self.model, input=text, dimensions=self.dim
+        )
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+
+# 1つのスコープ（エージェント名 + 指示のハッシュ）に対応するベクトルインデックス
+# 正規化済みベクトルを連続した float32 行列に保持し、内積1回で全件のコサイン類似度を求めます
+class VectorIndex:
+    def __init__(self, dim: int, initial_capacity: int = 64):
+        self.dim = dim
+        self.vectors = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self.valid = np.zeros(initial_capacity, dtype=bool)
+        self.queries: List[Optional[str]] = [None] * initial_capacity
+        self.answers: List[Optional[str]] = [None] * initial_capacity
+        self.high_water = 0  # これまでに使用したスロットの上限
+        self.free_slots: List[int] = []
+
+    def __len__(self) -> int:
+        return int(self.valid[: self.high_water].sum())
+
+    def _ensure_writable(self):
+        # mmap で読み込んだ読み取り専用配列は、最初の書き込み時にメモリへコピーする
+        if not self.vectors.flags.writeable:
+            self.vectors = np.array(self.vectors)
+
+    def _grow(self):
+        capacity = max(64, len(self.vectors) * 2)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[: self.high_water] = self.vectors[: self.high_water]
+        valid = np.zeros(capacity, dtype=bool)
+        valid[: self.high_water] = self.valid[: self.high_water]
+        self.vectors, self.valid = vectors, valid
+        extra = capacity - len(self.queries)
+        self.queries.extend([None] * extra)
+        self.answers.extend([None] * extra)
+
+    def add(self, vector: np.ndarray, query: str, answer: str) -> int:
+        self._ensure_writable()
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            if self.high_water == len(self.vectors):
+                self._grow()
+            slot = self.high_water
+            self.high_water += 1
+        self.vectors[slot] = vector
+        self.valid[slot] = True
+        self.queries[slot] = query
+        self.answers[slot] = answer
+        return slot
+
+    def remove(self, slot: int):
+        # ベクトルを0にしておけば、検索時にマスク用の配列を作らずに済む
+        self._ensure_writable()
+        self.vectors[slot] = 0.0
+        self.valid[slot] = False
+        self.queries[slot] = None
+        self.answers[slot] = None
+        self.free_slots.append(slot)
+
+    def search(self, vector: np.ndarray) -> Tuple[Optional[int], float]:
+        if self.high_water == 0:
+            return None, 0.0
+        scores = self.vectors[: self.high_water] @ vector.astype(np.float32, copy=False)
+        slot = int(np.argmax(scores))
+        if not self.valid[slot]:
+            return None, 0.0
+        return slot, float(scores[slot])
+
+
+@dataclass
+class CacheStats:
+    lookups: int = 0
+    hits: int = 0
+    evictions: int = 0
+    # 長時間動かしても増え続けないよう、直近の検索時間だけを保持する
+    lookup_seconds: Deque[float] = field(default_factory=lambda: deque(maxlen=10_000))
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def lookup_ms(self, percentile: float) -> float:
+        if not self.lookup_seconds:
+            return 0.0
+        return float(np.percentile(self.lookup_seconds, percentile) * 1000)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hit_rate, 3),
+            "evictions": self.evictions,
+            "lookup_p50_ms": round(self.lookup_ms(50), 3),
+            "lookup_p99_ms": round(self.lookup_ms(99), 3),
+        }
+
+
+@dataclass
+class CachedRunResult:
+    final_output: Any
+    cache_hit: bool
+    similarity: float
+    result: Any = None  # キャッシュミス時のみ RunResult が入る
+
+
+# Runner.run の前段に置くセマンティックキャッシュ
+# エントリ数またはバイト数の上限を超えると、全スコープ共通の LRU 順で追い出します
+class SemanticCache:
+    def __init__(
+        self,
+        embedder,
+        threshold: float = 0.9,
+        max_entries: Optional[int] = 10_000,
+        max_bytes: Optional[int] = None,
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.indexes: Dict[str, VectorIndex] = {}
+        self.lru: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+        self.total_bytes = 0
+        self.stats = CacheStats()
+
+    @staticmethod
+    def _describe(value: Any) -> str:
+        # 関数やモデルのインスタンスは repr にアドレスが入るので、型や名前で表す
+        if value is None or isinstance(value, str):
+            return value or ""
+        if callable(value) and hasattr(value, "__qualname__"):
+            return f"{value.__module__}.{value.__qualname__}"
+        name = f"{type(value).__module__}.{type(value).__qualname__}"
+        model_name = getattr(value, "model", None)  # OpenAIResponsesModel などのモデル名
+        return f"{name}:{model_name}" if isinstance(model_name, str) else name
+
+    @staticmethod
+    def scope_for(agent: Agent, context: Any = None) -> str:
+        # 指示・モデル・モデル設定・ツール・出力の型・context のどれかが変われば
+        # スコープも変わるので、別の設定のエージェントの回答が返ることはない
+        tools = [
+            [tool.name, getattr(tool, "params_json_schema", None)] for tool in agent.tools
+        ]
+        settings = agent.model_settings.to_json_dict() if agent.model_settings else None
+        parts = {
+            "instructions": SemanticCache._describe(agent.instructions),
+            "model": SemanticCache._describe(agent.model),
+            "model_settings": settings,
+            "tools": tools,
+            "output_type": SemanticCache._describe(agent.output_type),
+            "context": context,  # JSON にできる値なら、同じ内容の context 同士で回答を共有する
+        }
+        encoded = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=repr)
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        return f"{agent.name}:{digest[:16]}"
+
+    def _index(self, scope: str) -> VectorIndex:
+        if scope not in self.indexes:
+            self.indexes[scope] = VectorIndex(self.embedder.dim)
+        return self.indexes[scope]
+
+    def lookup_vector(
+        self, scope: str, vector: np.ndarray
+    ) -> Tuple[Optional[str], float]:
+        started = time.perf_counter()
+        index = self.indexes.get(scope)
+        slot, score = index.search(vector) if index else (None, 0.0)
+        self.stats.lookups += 1
+        self.stats.lookup_seconds.append(time.perf_counter() - started)
+        if slot is None or score < self.threshold:
+            return None, score
+        self.stats.hits += 1
+        self.lru.move_to_end((scope, slot))
+        return index.answers[slot], score
+
+    def store_vector(self, scope: str, vector: np.ndarray, query: str, answer: str):
+        index = self._index(scope)
+        slot = index.add(vector, query, answer)
+        nbytes = vector.nbytes + len(query.encode("utf-8")) + len(answer.encode("utf-8"))
+        self.lru[(scope, slot)] = nbytes
+        self.total_bytes += nbytes
+        self._evict()
+
+    def _evict(self):
+        while self.lru and (
+            (self.max_entries is not None and len(self.lru) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            (scope, slot), nbytes = self.lru.popitem(last=False)
+            self.indexes[scope].remove(slot)
+            self.total_bytes -= nbytes
+            self.stats.evictions += 1
+
+    async def run(self, agent: Agent, input: str, **kwargs) -> CachedRunResult:
+        scope = self.scope_for(agent, kwargs.get("context"))
+        vector = await self.embedder.embed(input)
+        answer, score = self.lookup_vector(scope, vector)
+        if answer is not None:
+            return CachedRunResult(final_output=answer, cache_hit=True, similarity=score)
+
+        result = await Runner.run(agent, input, **kwargs)
+        # キャッシュには文字列で保存するので、output_type で構造化した出力はキャッシュしない
+        # （文字列にすると、ヒットしたときにモデルのインスタンスではなく文字列が返ってしまう）
+        if isinstance(result.final_output, str):
+            self.store_vector(scope, vector, input, result.final_output)
+        return CachedRunResult(
+            final_output=result.final_output,
+            cache_hit=False,
+            similarity=score,
+            result=result,
+        )
+
+    # スコープごとに vectors.npy（行列）と entries.json（文字列と LRU 順）を書き出す
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        manifest = {"dim": self.embedder.dim, "scopes": []}
+        for number, (scope, index) in enumerate(self.indexes.items()):
+            slots = [s for (sc, s) in self.lru if sc == scope]  # LRU の古い順
+            if not slots:
+                continue
+            vectors_file = f"scope-{number}.npy"
+            np.save(os.path.join(directory, vectors_file), index.vectors[slots])
+            manifest["scopes"].append(
+                {
+                    "scope": scope,
+                    "vectors": vectors_file,
+                    "queries": [index.queries[s] for s in slots],
+                    "answers": [index.answers[s] for s in slots],
+                }
+            )
+        with open(os.path.join(directory, "entries.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        # スコープが減ったときに、前回の保存で書き出した使われないファイルを残さない
+        written = {entry["vectors"] for entry in manifest["scopes"]}
+        for path in glob.glob(os.path.join(directory, "scope-*.npy")):
+            if os.path.basename(path) not in written:
+                os.remove(path)
+
+    # ベクトル行列は mmap で開くので、大きなキャッシュでも起動時に全体を読み込まない
+    def load(self, directory: str, mmap: bool = True):
+        with open(os.path.join(directory, "entries.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["dim"] != self.embedder.dim:
+            raise ValueError(
+                f"埋め込み次元が一致しません: {manifest['dim']} != {self.embedder.dim}"
+            )
+        for entry in manifest["scopes"]:
+            vectors = np.load(
+                os.path.join(directory, entry["vectors"]),
+                mmap_mode="r" if mmap else None,
+            )
+            count = len(entry["queries"])
+            index = VectorIndex(self.embedder.dim, initial_capacity=1)
+            index.vectors = vectors
+            index.valid = np.ones(count, dtype=bool)
+            index.queries = list(entry["queries"])
+            index.answers = list(entry["answers"])
+            index.high_water = count
+            # 同じスコープのエントリがすでにあれば置き換えるので、LRU からも取り除いておく
+            if entry["scope"] in self.indexes:
+                for key in [key for key in self.lru if key[0] == entry["scope"]]:
+                    self.total_bytes -= self.lru.pop(key)
+            self.indexes[entry["scope"]] = index
+            for slot in range(count):
+                nbytes = (
+                    vectors[slot].nbytes
+                    + len(index.queries[slot].encode("utf-8"))
+                    + len(index.answers[slot].encode("utf-8"))
+                )
+                self.lru[(entry["scope"], slot)] = nbytes
+                self.total_bytes += nbytes
+        self._evict()
+
+
+# ベンチマーク用のローカルスタブモデル（実際の API は呼ばない）
+class StubModel(StubModelBase):
+    def __init__(self, latency: float = 0.3):
+        self.latency = latency
+        self.calls = 0
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        question = input if isinstance(input, str) else input[-1]["content"]
+        text = f"（{system_instructions}）{question} への回答です。"
+        message = ResponseOutputMessage(
+            id=f"msg_{self.calls}",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+        )
+        return ModelResponse(
+            output=[message],
+            usage=Usage(requests=1, input_tokens=20, output_tokens=20, total_tokens=40),
+            response_id=None,
+        )
+
+
+async def run_demo():
+    set_tracing_disabled(True)
+    embedder = HashingEmbedder()
+    cache = SemanticCache(embedder, threshold=0.75, max_entries=1000)
+    model = StubModel()
+
+    # usecase-005 / usecase-007 のようなエージェントを想定
+    tourism_agent = Agent(
+        name="Dynamic Agent", instructions="標準的な応答をしてください。", model=model
+    )
+    bullet_agent = tourism_agent.clone(
+        instructions="必ず箇条書き（・で始まる行）で回答してください。"
+    )
+
+    queries = [
+        (tourism_agent, "東京の観光スポットを教えてください。"),
+        (tourism_agent, "東京の観光スポットを教えて下さい"),
+        (tourism_agent, "東京のおすすめ観光スポットを教えてください。"),
+        (tourism_agent, "大阪の名物料理を教えてください。"),
+        (bullet_agent, "東京の観光スポットを教えてください。"),  # 指示が違うので別スコープ
+        (tourism_agent, "大阪の名物料理を教えて。"),
+    ]
+
+    print("【Usecase-011: Semantic Cache の活用】")
+    print("言い換えられた質問にキャッシュ済みの回答を返す例")
+    print("-" * 40)
+    for agent, query in queries:
+        started = time.perf_counter()
+        cached = await cache.run(agent, query)
+        elapsed = time.perf_counter() - started
+        label = "HIT " if cached.cache_hit else "MISS"
+        print(f"[{label}] sim={cached.similarity:.3f} {elapsed * 1000:7.1f}ms  {query}")
+    print(f"モデル呼び出し回数: {model.calls} / {len(queries)}")
+    print("キャッシュ統計:", cache.stats.summary())
+    print("-" * 40)
+
+    # 10万件を格納した状態での検索時間を計測
+    entries = 100_000
+    print(f"\n{entries:,} 件キャッシュ時の検索時間:")
+    big_cache = SemanticCache(embedder, threshold=0.9, max_entries=entries)
+    scope = SemanticCache.scope_for(tourism_agent)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((entries, embedder.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    for i in range(entries):
+        big_cache.store_vector(scope, vectors[i], f"q{i}", f"a{i}")
+
+    # 半分は既存エントリにノイズを加えた「言い換え」、半分は未知の質問
+    for i in range(200):
+        if i % 2 == 0:
+            noisy = vectors[rng.integers(entries)] + rng.normal(0, 0.01, embedder.dim)
+            probe = (noisy / np.linalg.norm(noisy)).astype(np.float32)
+        else:
+            probe = rng.standard_normal(embedder.dim).astype(np.float32)
+            probe /= np.linalg.norm(probe)
+        big_cache.lookup_vector(scope, probe)
+    print("キャッシュ統計:", big_cache.stats.summary())
+    print(f"使用バイト数: {big_cache.total_bytes / 1024 / 1024:.1f} MiB")
+
+    # mmap 形式で保存して再読み込み
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        big_cache.save(directory)
+        saved = time.perf_counter() - started
+
+        started = time.perf_counter()
+        warm_cache = SemanticCache(embedder, threshold=0.9, max_entries=entries)
+        warm_cache.load(directory, mmap=True)
+        loaded = time.perf_counter() - started
+
+        answer, score = warm_cache.lookup_vector(scope, vectors[42])
+        print(f"\n保存: {saved:.2f}秒 / mmap 読み込み: {loaded:.2f}秒")
+        print(f"再読み込み後の検索: {answer} (sim={score:.3f})")
+        del warm_cache  # Windows では mmap を閉じないと一時ディレクトリを削除できない
+
+
+if __name__ == "__main__":
+    asyncio.run(run_demo())
+
+    # 例として期待される出力：
+    # [MISS] sim=0.000   306.9ms  東京の観光スポットを教えてください。
+    # [HIT ] sim=0.827     0.3ms  東京の観光スポットを教えて下さい
+    # [HIT ] sim=0.887     0.1ms  東京のおすすめ観光スポットを教えてください。
+    # [MISS] sim=0.601   303.2ms  大阪の名物料理を教えてください。
+    # [MISS] sim=0.000   303.4ms  東京の観光スポットを教えてください。
+    # [HIT ] sim=0.798     0.3ms  大阪の名物料理を教えて。
+    # モデル呼び出し回数: 3 / 6
+    #
+    # 100,000 件キャッシュ時の検索時間:
+    # キャッシュ統計: {'lookups': 200, 'hits': 100, 'hit_rate': 0.5, 'evictions': 0, 'lookup_p50_ms': 8.9, 'lookup_p99_ms': 11.1}
+    # 使用バイト数: 98.8 MiB
+    #
+    # 保存: 0.14秒 / mmap 読み込み: 0.23秒
+    # 再読み込み後の検索: a42 (sim=1.000)
@@ -0,0 +1,476 @@
+# showroom/usecase-012/main.py
+from agents import Agent, Runner, ModelResponse, Usage, set_tracing_disabled
+from agents.models import get_default_model
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from collections import deque
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from typing import Any, Deque, Dict, List, Optional
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+import openai
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Adaptive Concurrency: レート制限（429）に合わせて同時実行数を自動調整する機能
+# モデルごとに RPM/TPM のトークンバケットと AIMD（加算増加・乗算減少）の同時実行上限を持ち、
+# すべての Runner.run 呼び出しを優先度付きキュー経由で実行します
+
+
+# 1分あたりの上限を連続的に補充するトークンバケット
+class TokenBucket:
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        # amount を取り出せるようになるまでの秒数（0 なら今すぐ取り出せる）
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        # 実際の使用量が見積もりを超えた場合は負債として持ち越す
+        self._refill()
+        self.tokens -= amount
+
+
+# AIMD による同時実行上限の調整
+class AIMDLimiter:
+    def __init__(
+        self,
+        initial: float = 4,
+        minimum: float = 1,
+        maximum: float = 64,
+        decrease_factor: float = 0.5,
+        latency_target: Optional[float] = None,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.last_decrease = 0.0
+
+    def on_success(self, latency: float):
+        if self.latency_target and latency > self.latency_target:
+            # 遅延の悪化は 429 の前兆なので、少しだけ絞る
+            self.limit = max(self.minimum, self.limit * 0.95)
+        else:
+            # 上限1つ分の成功ごとに +1 されるよう、1成功あたり 1/limit 増やす
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_rate_limited(self):
+        # 同時に返ってきた複数の 429 で何度も半減しないよう、短い間隔で間引く
+        now = time.monotonic()
+        if now - self.last_decrease < 0.1:
+            return
+        self.last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+
+
+@dataclass(order=True)
+class _Ticket:
+    priority: int
+    sequence: int
+    tokens: float = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+# 長時間動かしても統計が増え続けないよう、サンプルは直近の分だけを保持する
+STATS_WINDOW = 10_000
+
+
+def _window() -> Deque:
+    return deque(maxlen=STATS_WINDOW)
+
+
+@dataclass
+class LaneStats:
+    completed: int = 0
+    rate_limited: int = 0
+    failed: int = 0
+    max_queue_depth: int = 0
+    queue_depth_samples: Deque[int] = field(default_factory=_window)
+    wait_seconds: Dict[int, Deque[float]] = field(default_factory=dict)
+    limit_history: Deque[float] = field(default_factory=_window)
+
+    def summary(self) -> Dict[str, Any]:
+        waits = {}
+        for priority, samples in sorted(self.wait_seconds.items()):
+            ordered = sorted(samples)
+            waits[priority] = {
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 1),
+            }
+        return {
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "max_queue_depth": self.max_queue_depth,
+            "mean_queue_depth": round(statistics.mean(self.queue_depth_samples or [0]), 1),
+            "wait_by_priority": waits,
+        }
+
+
+# モデルごとのキュー・バケット・同時実行上限
+class ModelLane:
+    def __init__(self, rpm: float, tpm: float, limiter: AIMDLimiter):
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.limiter = limiter
+        self.queue: List[_Ticket] = []
+        self.in_flight = 0
+        self.stats = LaneStats()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self):
+        # asyncio.run() や Runner.run_sync を繰り返すとイベントループが変わるので、
+        # 前のループに結びついたタスクとイベントは捨てて、今のループで作り直す
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._stop()
+        # 前のループで待っていた呼び出しは、そのループとともに終わっている
+        self.queue = [ticket for ticket in self.queue if not ticket.future.done()]
+        heapq.heapify(self.queue)
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._dispatch())
+
+    def _stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._task is not None and not self._task.done():
+            try:
+                self._task.cancel()
+            except RuntimeError:
+                pass  # ループがすでに閉じられている
+        self._task = None
+
+    async def close(self):
+        # ディスパッチのタスクを止める（同じループで呼ぶこと）
+        task = self._task
+        self._stop()
+        if task is not None and self._loop is asyncio.get_running_loop():
+            await asyncio.gather(task, return_exceptions=True)
+
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def acquire(self, priority: int, tokens: float, sequence: int) -> float:
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        ticket = _Ticket(priority, sequence, tokens, loop.time(), loop.create_future())
+        heapq.heappush(self.queue, ticket)
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self.queue))
+        self.stats.queue_depth_samples.append(len(self.queue))
+        self.wake()
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            # 枠が割り当てられた直後、呼び出し側が再開する前にキャンセルされた場合は枠を返す
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.release()
+            raise
+        waited = loop.time() - ticket.enqueued_at
+        self.stats.wait_seconds.setdefault(priority, _window()).append(waited)
+        return waited
+
+    def release(self):
+        self.in_flight -= 1
+        self.stats.limit_history.append(self.limiter.limit)
+        self.wake()
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self.queue and self.in_flight < int(self.limiter.limit):
+                ticket = self.queue[0]
+                if ticket.future.done():  # 待機中にキャンセルされた
+                    heapq.heappop(self.queue)
+                    continue
+                delay = max(self.rpm.time_until(1), self.tpm.time_until(ticket.tokens))
+                if delay > 0:
+                    if self._timer is None or self._timer.when() <= loop.time():
+                        self._timer = loop.call_later(delay, self.wake)
+                    break
+                heapq.heappop(self.queue)
+                self.rpm.take(1)
+                self.tpm.take(ticket.tokens)
+                self.in_flight += 1
+                ticket.future.set_result(None)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    return isinstance(error, openai.RateLimitError) or getattr(
+        error, "status_code", None
+    ) == 429
+
+
+# すべての Runner.run をこのスケジューラ経由で実行する
+class AdaptiveScheduler:
+    def __init__(
+        self,
+        rpm: float = 500,
+        tpm: float = 200_000,
+        initial_concurrency: float = 4,
+        max_concurrency: float = 64,
+        latency_target: Optional[float] = None,
+        max_retries: int = 6,
+        expected_output_tokens: int = 500,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.expected_output_tokens = expected_output_tokens
+        self.lanes: Dict[str, ModelLane] = {}
+        self._sequence = itertools.count()
+
+    def lane_for(self, agent: Agent) -> ModelLane:
+        model = agent.model
+        if model is None:
+            name = get_default_model()  # モデルを指定しないエージェントは既定のモデルで実行される
+        elif isinstance(model, str):
+            name = model
+        else:
+            name = getattr(model, "name", None) or type(model).__name__
+        if name not in self.lanes:
+            limiter = AIMDLimiter(
+                initial=self.initial_concurrency,
+                maximum=self.max_concurrency,
+                latency_target=self.latency_target,
+            )
+            self.lanes[name] = ModelLane(self.rpm, self.tpm, limiter)
+        return self.lanes[name]
+
+    def estimate_tokens(self, agent: Agent, input: Any) -> float:
+        # 日本語を含むため、おおよそ 2 文字 = 1 トークンとして見積もる
+        instructions = agent.instructions if isinstance(agent.instructions, str) else ""
+        return (len(instructions) + len(str(input))) / 2 + self.expected_output_tokens
+
+    async def close(self):
+        for lane in self.lanes.values():
+            await lane.close()
+
+    async def run(self, agent: Agent, input: Any, priority: int = 1, **kwargs):
+        lane = self.lane_for(agent)
+        estimate = self.estimate_tokens(agent, input)
+        sequence = next(self._sequence)
+        for attempt in range(self.max_retries + 1):
+            await lane.acquire(priority, estimate, sequence)
+            # 取得した枠は、タイムアウトやキャンセル（CancelledError）を含めてどの経路でも必ず返す
+            try:
+                started = time.monotonic()
+                try:
+                    result = await Runner.run(agent, input, **kwargs)
+                except Exception as error:
+                    if not is_rate_limit_error(error) or attempt == self.max_retries:
+                        lane.stats.failed += 1
+                        raise
+                    lane.stats.rate_limited += 1
+                    lane.limiter.on_rate_limited()
+                else:
+                    lane.limiter.on_success(time.monotonic() - started)
+                    actual = result.context_wrapper.usage.total_tokens
+                    if actual > estimate:
+                        lane.tpm.take(actual - estimate)
+                    lane.stats.completed += 1
+                    return result
+            finally:
+                lane.release()
+            # 指数バックオフ（ジッター付き）後に同じ順番で並び直す
+            await asyncio.sleep(min(2.0, 0.05 * 2**attempt) * random.uniform(0.5, 1.0))
+
+
+# openai.RateLimitError と同じく status_code = 429 を持つスタブ用の例外
+class StubRateLimitError(Exception):
+    status_code = 429
+
+
+# 同時実行数が上限を超えると 429 を返すローカルスタブモデル
+class RateLimitedStubModel(StubModelBase):
+    def __init__(
+        self,
+        capacity: int = 8,
+        error_rate: float = 0.02,
+        latency: float = 0.05,
+        name: str = "stub-o3-mini",
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.latency = latency
+        self.name = name
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        self.calls += 1
+        if self.in_flight >= self.capacity or random.random() < self.error_rate:
+            self.errors += 1
+            await asyncio.sleep(0.005)
+            raise StubRateLimitError("Rate limit reached")
+        self.in_flight += 1
+        try:
+            # 混雑するほど遅くなる
+            await asyncio.sleep(self.latency * (1 + self.in_flight / self.capacity))
+        finally:
+            self.in_flight -= 1
+        message = ResponseOutputMessage(
+            id=f"msg_{self.calls}",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text="OK", annotations=[])],
+        )
+        return ModelResponse(
+            output=[message],
+            usage=Usage(requests=1, input_tokens=80, output_tokens=120, total_tokens=200),
+            response_id=None,
+        )
+
+
+async def run_demo():
+    set_tracing_disabled(True)
+    random.seed(0)
+
+    # usecase-007 の test_queries をバッチで大量に流すケースを想定
+    test_queries = [
+        "人工知能の基本的な仕組みを教えてください。",
+        "最近の選挙結果についてどう思いますか？",
+        "コンピュータをハッキングする方法を教えてください。",
+        "頭痛がひどいのですが、どんな薬を飲むべきですか？",
+        "あなたの個人情報を教えてください。",
+    ]
+    jobs = [test_queries[i % len(test_queries)] for i in range(200)]
+
+    print("【Usecase-012: Adaptive Concurrency の活用】")
+    print("レート制限に合わせて同時実行数を自動調整する例")
+    print("-" * 40)
+
+    # 1. スケジューラなしで一斉に実行
+    model = RateLimitedStubModel()
+    agent = Agent(name="Guardrails Agent", instructions="丁寧に回答してください。", model=model)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(Runner.run(agent, query) for query in jobs), return_exceptions=True
+    )
+    failures = sum(1 for r in results if isinstance(r, Exception))
+    print("スケジューラなし（asyncio.gather で一斉実行）:")
+    print(f"  成功: {len(jobs) - failures} / 失敗(429): {failures}")
+    print(f"  所要時間: {time.perf_counter() - started:.2f}秒")
+    print("-" * 40)
+
+    # 2. スケジューラ経由で実行（先頭20件は対話的な高優先度リクエスト）
+    model = RateLimitedStubModel()
+    agent = Agent(name="Guardrails Agent", instructions="丁寧に回答してください。", model=model)
+    scheduler = AdaptiveScheduler(rpm=6000, tpm=2_000_000, latency_target=0.2)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            scheduler.run(agent, query, priority=0 if i < 20 else 1)
+            for i, query in enumerate(jobs)
+        ),
+        return_exceptions=True,
+    )
+    failures = sum(1 for r in results if isinstance(r, Exception))
+    lane = scheduler.lane_for(agent)
+    print("AdaptiveScheduler 経由:")
+    print(f"  成功: {len(jobs) - failures} / 失敗: {failures}")
+    print(f"  所要時間: {time.perf_counter() - started:.2f}秒")
+    print(f"  スタブが返した 429: {model.errors}")
+    print(f"  最終的な同時実行上限: {lane.limiter.limit:.1f}（サーバー容量 {model.capacity}）")
+    print("  統計:", lane.stats.summary())
+    print("-" * 40)
+
+    # 3. 呼び出し側のタイムアウトでキャンセルされても、同時実行の枠が残らないことを確認
+    results = await asyncio.gather(
+        *(asyncio.wait_for(scheduler.run(agent, query), timeout=0.05) for query in jobs[:50]),
+        return_exceptions=True,
+    )
+    timed_out = sum(1 for r in results if isinstance(r, asyncio.TimeoutError))
+    print("asyncio.wait_for(timeout=0.05) 経由:")
+    print(f"  タイムアウト: {timed_out} / {len(results)}, キャンセル後に実行中の枠: {lane.in_flight}")
+    print("-" * 40)
+    return scheduler, agent
+
+
+async def run_in_new_loop(scheduler: AdaptiveScheduler, agent: Agent):
+    # 4. 別の asyncio.run() から同じスケジューラを使う（レーンのタスクは新しいループで作り直される）
+    started = time.perf_counter()
+    result = await asyncio.wait_for(scheduler.run(agent, "もう一度お願いします。"), timeout=5)
+    print("別の asyncio.run() から同じスケジューラで実行:")
+    print(f"  応答: {result.final_output}（{time.perf_counter() - started:.2f}秒）")
+    await scheduler.close()
+
+
+if __name__ == "__main__":
+    scheduler, agent = asyncio.run(run_demo())
+    asyncio.run(run_in_new_loop(scheduler, agent))
+
+    # 例として期待される出力：
+    # スケジューラなし（asyncio.gather で一斉実行）:
+    #   成功: 8 / 失敗(429): 192
+    #   所要時間: 0.43秒
+    # ----------------------------------------
+    # AdaptiveScheduler 経由:
+    #   成功: 200 / 失敗: 0
+    #   所要時間: 2.96秒
+    #   スタブが返した 429: 7
+    #   最終的な同時実行上限: 9.3（サーバー容量 8）
+    #   統計: {'completed': 200, 'rate_limited': 7, 'failed': 0, 'max_queue_depth': 200, ...
+    #          'wait_by_priority': {0: {'p50_ms': 146.5, 'p95_ms': 240.2}, 1: {'p50_ms': 1535.5, 'p95_ms': 2743.4}}}
+    # ----------------------------------------
+    # asyncio.wait_for(timeout=0.05) 経由:
+    #   タイムアウト: 50 / 50, キャンセル後に実行中の枠: 0
+    # ----------------------------------------
+    # 別の asyncio.run() から同じスケジューラで実行:
+    #   応答: OK（0.05秒）
@@ -0,0 +1,394 @@
+# showroom/usecase-013/main.py
+from agents import Agent, Runner, Model, ModelResponse, Usage, set_tracing_disabled
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+from collections import deque
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import os
+import random
+import statistics
+import time
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Hedged Requests: 遅いリクエストの複製を投げてテールレイテンシを削減する機能
+# 最初のリクエストが直近の遅延分布のパーセンタイルを超えても最初の1バイトを返さない場合に
+# 同じリクエストをもう1本送り、先に応答した方を採用してもう一方をキャンセルします
+# 削減できた時間を測るため、ヘッジが勝った一部（監査）だけは最初のリクエストを最後まで待ちます
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    audited_wins: int = 0  # 最初のリクエストを最後まで待って、削減できた時間を実測したヘッジの勝ち
+    audited_saved_seconds: float = 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        # 監査した勝ちで実測した削減の平均を、すべての勝ちに当てはめた推定値
+        if not self.audited_wins:
+            return 0.0
+        return self.audited_saved_seconds / self.audited_wins * self.hedge_wins
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedge_rate": round(self.hedged / self.requests, 3) if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "audited_wins": self.audited_wins,
+            "saved_seconds": round(self.saved_seconds, 2),
+        }
+
+
+# Agent の model に指定して使うヘッジ付きモデルラッパー
+class HedgedModel(Model):
+    def __init__(
+        self,
+        inner: Model,
+        percentile: float = 95,
+        initial_delay: float = 1.0,
+        min_samples: int = 20,
+        window: int = 500,
+        audit_rate: float = 0.2,
+        min_audits: int = 5,
+        audit_timeout: float = 30.0,
+    ):
+        self.inner = inner
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.latencies: deque = deque(maxlen=window)  # 最初の1バイトまでの秒数
+        # ヘッジが勝ったうち audit_rate の割合（最初の min_audits 回は必ず）だけ、最初のリクエストを
+        # キャンセルせずに最初の1バイト（ストリーミングでないなら完了）まで待ち、削減できた時間を実測する。
+        # 監査した分だけ料金と負荷が増える
+        self.audit_rate = audit_rate
+        self.min_audits = min_audits
+        self.audit_timeout = audit_timeout
+        self._audits: Set[asyncio.Task] = set()
+        self.stats = HedgeStats()
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+    def _should_audit(self) -> bool:
+        if self.stats.audited_wins + len(self._audits) < self.min_audits:
+            return True
+        return random.random() < self.audit_rate
+
+    def _audit(self, primary: asyncio.Task, started: float, won_at: float, cleanup):
+        # 負けた最初のリクエストを最後まで待ち、ヘッジの勝ちとの差を削減できた時間として記録する
+        async def audit():
+            loop = asyncio.get_running_loop()
+            try:
+                done, _ = await asyncio.wait({primary}, timeout=self.audit_timeout)
+                # audit_timeout までに応答しなければ、そこまでを削減とみなす。失敗した場合は数えない
+                if not done or primary.exception() is None:
+                    self.stats.audited_wins += 1
+                    self.stats.audited_saved_seconds += loop.time() - started - won_at
+            finally:
+                primary.cancel()
+                await asyncio.gather(primary, return_exceptions=True)
+                if cleanup is not None:
+                    await cleanup(primary)
+
+        task = asyncio.ensure_future(audit())
+        self._audits.add(task)
+        task.add_done_callback(self._audits.discard)
+
+    async def wait_audits(self):
+        # 実行中の監査が終わるまで待つ（統計を読む前に呼ぶ）
+        while self._audits:
+            await asyncio.gather(*self._audits, return_exceptions=True)
+
+    async def _discard(self, task: asyncio.Task, stream=None):
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        if stream is not None:
+            await stream.aclose()
+
+    async def _race(
+        self,
+        start_attempt,
+        cleanup: Optional[Callable[[asyncio.Task], Awaitable[None]]] = None,
+    ):
+        # start_attempt() は「最初の1バイト」を待つコルーチンを返す
+        # cleanup は監査が終わった最初のリクエストの後始末（ストリームを閉じるなど）
+        loop = asyncio.get_running_loop()
+        self.stats.requests += 1
+        started = loop.time()
+        primary = asyncio.ensure_future(start_attempt())
+        hedge = None
+        audited = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay())
+            if done:
+                self.latencies.append(loop.time() - started)
+                return primary, []
+
+            self.stats.hedged += 1
+            hedge_started = loop.time()
+            hedge = asyncio.ensure_future(start_attempt())
+            pending = {primary, hedge}
+            winner = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # 両方同時に終わった場合は最初のリクエストを優先する
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if winner is None and task.exception() is None:
+                        winner = task
+            if winner is None:
+                return primary, []  # 両方失敗したので最初のリクエストの例外をそのまま返す
+
+            if winner is hedge:
+                self.stats.hedge_wins += 1
+                if primary in pending and self._should_audit():
+                    audited = primary
+                    pending.discard(primary)
+                    self._audit(primary, started, loop.time() - started, cleanup)
+            winner_latency = loop.time() - (started if winner is primary else hedge_started)
+            self.latencies.append(winner_latency)
+            return winner, list(pending)
+        finally:
+            # 呼び出し側がキャンセルされた場合も、送ったリクエストを残さない（監査中のものは監査が止める）
+            # （勝った側は完了済みなので何も起きず、負けた側は呼び出し元が待って後始末する）
+            for task in (primary, hedge):
+                if task is not None and task is not audited:
+                    task.cancel()
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        winner, losers = await self._race(
+            lambda: self.inner.get_response(*args, **kwargs)
+        )
+        # 負けた側は監査するもの以外すぐにキャンセルする（料金と負荷を2倍にしない）
+        for loser in losers:
+            await self._discard(loser)
+        return winner.result()
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator[Any]:
+        streams: Dict[asyncio.Future, Any] = {}
+
+        async def first_event():
+            stream = self.inner.stream_response(*args, **kwargs)
+            task = asyncio.current_task()
+            streams[task] = stream
+            return await stream.__anext__()
+
+        async def close_stream(task: asyncio.Future):
+            stream = streams.pop(task, None)
+            if stream is not None:
+                await stream.aclose()
+
+        winner, losers = await self._race(first_event, close_stream)
+        for loser in losers:
+            await self._discard(loser, streams.get(loser))
+        stream = streams[winner]
+        try:
+            yield winner.result()
+            async for event in stream:
+                yield event
+        finally:
+            await stream.aclose()
+
+
+# 重い裾（ヘビーテール）を持つ遅延分布のローカルスタブモデル
+class HeavyTailStubModel(Model):
+    def __init__(self, median: float = 0.05, sigma: float = 0.5, stall_rate: float = 0.05):
+        self.median = median
+        self.sigma = sigma
+        self.stall_rate = stall_rate
+        self.calls = 0
+        self.cancelled = 0
+
+    def _first_byte_delay(self) -> float:
+        delay = random.lognormvariate(0, self.sigma) * self.median
+        if random.random() < self.stall_rate:
+            delay *= 20  # まれに大きく詰まる
+        return delay
+
+    @staticmethod
+    def _message(text: str) -> ResponseOutputMessage:
+        return ResponseOutputMessage(
+            id="msg_stub",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+        )
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self._first_byte_delay())
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return ModelResponse(
+            output=[self._message("予約手続きをご案内します。")],
+            usage=Usage(requests=1, input_tokens=30, output_tokens=20, total_tokens=50),
+            response_id=None,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        self.calls += 1
+        text = "予約手続きをご案内します。"
+        try:
+            await asyncio.sleep(self._first_byte_delay())
+            for i, char in enumerate(text):
+                yield ResponseTextDeltaEvent(
+                    type="response.output_text.delta",
+                    item_id="msg_stub",
+                    output_index=0,
+                    content_index=0,
+                    delta=char,
+                    sequence_number=i,
+                    logprobs=[],
+                )
+                await asyncio.sleep(0.001)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        response = Response(
+            id="resp_stub",
+            created_at=time.time(),
+            model="stub",
+            object="response",
+            output=[self._message(text)],
+            tool_choice="auto",
+            tools=[],
+            parallel_tool_calls=False,
+        )
+        yield ResponseCompletedEvent(
+            type="response.completed", response=response, sequence_number=len(text)
+        )
+
+
+def latency_summary(samples: List[float]) -> str:
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000
+
+    return (
+        f"p50={pct(50):6.1f}ms  p95={pct(95):6.1f}ms  p99={pct(99):6.1f}ms  "
+        f"mean={statistics.mean(ordered) * 1000:6.1f}ms"
+    )
+
+
+async def measure(agent: Agent, queries: List[str], concurrency: int = 20) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(query: str):
+        async with semaphore:
+            started = time.perf_counter()
+            await Runner.run(agent, query)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(q) for q in queries))
+    return latencies
+
+
+async def run_demo():
+    set_tracing_disabled(True)
+    queries = ["航空券の予約をお願いします。"] * 400
+
+    print("【Usecase-013: Hedged Requests の活用】")
+    print("遅いリクエストを複製してテールレイテンシを削減する例")
+    print("-" * 40)
+
+    random.seed(1)
+    baseline_model = HeavyTailStubModel()
+    baseline_agent = Agent(name="Booking Agent", instructions="予約に答えてください。", model=baseline_model)
+    baseline = await measure(baseline_agent, queries)
+    print("ヘッジなし :", latency_summary(baseline))
+
+    random.seed(1)
+    inner = HeavyTailStubModel()
+    hedged_model = HedgedModel(inner, percentile=90, initial_delay=0.2)
+    hedged_agent = baseline_agent.clone(model=hedged_model)
+    hedged = await measure(hedged_agent, queries)
+    await hedged_model.wait_audits()
+    print("ヘッジあり :", latency_summary(hedged))
+    print("ヘッジ統計:", hedged_model.stats.summary())
+    print(f"ヘッジなしとの合計の差: {sum(baseline) - sum(hedged):.2f}秒")
+    extra = inner.calls - len(queries)
+    print(f"追加リクエスト: {extra} 件（+{extra / len(queries):.1%}）")
+    print("-" * 40)
+
+    # ストリーミングでは最初のイベント（最初の1バイト）の到着でヘッジを判定する
+    random.seed(2)
+    stream_model = HedgedModel(HeavyTailStubModel(stall_rate=0.1), initial_delay=0.15)
+    stream_agent = baseline_agent.clone(model=stream_model)
+    ttfts = []
+    for i in range(30):
+        result = Runner.run_streamed(stream_agent, queries[0])
+        started = time.perf_counter()
+        ttft = None
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(
+                event.data, ResponseTextDeltaEvent
+            ):
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                if i == 0:
+                    print(event.data.delta, end="", flush=True)
+        ttfts.append(ttft)
+    await stream_model.wait_audits()
+    print("\nストリーミング TTFT:", latency_summary(ttfts))
+    print("ヘッジ統計:", stream_model.stats.summary())
+
+
+if __name__ == "__main__":
+    asyncio.run(run_demo())
+
+    # 例として期待される出力：
+    # ヘッジなし : p50=  60.6ms  p95= 166.0ms  p99=1295.0ms  mean= 100.4ms
+    # ヘッジあり : p50=  63.4ms  p95= 136.4ms  p99= 194.6ms  mean=  71.1ms
+    # ヘッジ統計: {'requests': 400, 'hedge_rate': 0.145, 'hedge_wins': 23, 'audited_wins': 8, 'saved_seconds': 11.22}
+    # ヘッジなしとの合計の差: 11.73秒
+    # 追加リクエスト: 58 件（+14.5%）
+    # ----------------------------------------
+    # 予約手続きをご案内します。
+    # ストリーミング TTFT: p50=  70.4ms  p95= 194.9ms  p99= 209.9ms  mean=  82.2ms
+    # ヘッジ統計: {'requests': 30, 'hedge_rate': 0.133, 'hedge_wins': 4, 'audited_wins': 4, 'saved_seconds': 2.76}
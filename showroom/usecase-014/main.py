@@ -0,0 +1,230 @@
+# showroom/usecase-014/main.py
+from agents import (
+    Agent,
+    Runner,
+    ModelResponse,
+    ModelSettings,
+    Usage,
+    set_tracing_disabled,
+)
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from collections import OrderedDict
+from dotenv import load_dotenv
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import time
+import tracemalloc
+import weakref
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Per-run Overrides: 共有エージェントを書き換えずに、実行ごとに指示やモデル設定を変える機能
+# usecase-005 / usecase-009 のように agent.instructions を代入すると、並行実行時に
+# 別のリクエストの指示が混ざってしまいます。ここでは上書き内容のハッシュをキーに
+# 事前に clone したエージェントをキャッシュし、リクエストごとの clone コストも避けます
+
+
+# 上書き内容ごとに clone したエージェントを保持するキャッシュ
+# 返されるエージェントは複数の実行で共有されるため、取得後に属性を書き換えないでください
+class AgentVariants:
+    def __init__(self, max_variants: int = 1024):
+        self.max_variants = max_variants
+        self._variants: "OrderedDict[Tuple[int, str], Tuple[weakref.ref, Agent]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def override_key(
+        instructions: Optional[str], model_settings: Optional[ModelSettings]
+    ) -> str:
+        # ModelSettings は dataclass なので repr が内容を表す
+        payload = f"{instructions!r}\x00{model_settings!r}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        base: Agent,
+        instructions: Optional[str] = None,
+        model_settings: Optional[ModelSettings] = None,
+    ) -> Agent:
+        if instructions is None and model_settings is None:
+            return base
+        key = (id(base), self.override_key(instructions, model_settings))
+        cached = self._variants.get(key)
+        # id() は再利用されることがあるので、元のエージェントが同一かも確認する
+        if cached is not None and cached[0]() is base:
+            self.hits += 1
+            self._variants.move_to_end(key)
+            return cached[1]
+
+        self.misses += 1
+        overrides: Dict[str, Any] = {}
+        if instructions is not None:
+            overrides["instructions"] = instructions
+        if model_settings is not None:
+            overrides["model_settings"] = base.model_settings.resolve(model_settings)
+        variant = base.clone(**overrides)
+        self._variants[key] = (weakref.ref(base), variant)
+        if len(self._variants) > self.max_variants:
+            self._variants.popitem(last=False)
+        return variant
+
+    async def run(
+        self,
+        base: Agent,
+        input: Any,
+        instructions: Optional[str] = None,
+        model_settings: Optional[ModelSettings] = None,
+        **kwargs,
+    ):
+        agent = self.get(base, instructions=instructions, model_settings=model_settings)
+        return await Runner.run(agent, input, **kwargs)
+
+
+# 受け取った system instructions をそのまま返すローカルスタブモデル
+# 応答までの時間をランダムにして、並行実行時の割り込みを起こしやすくしています
+class EchoInstructionsStubModel(StubModelBase):
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        await asyncio.sleep(random.uniform(0, 0.01))
+        message = ResponseOutputMessage(
+            id="msg_stub",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[
+                ResponseOutputText(
+                    type="output_text", text=system_instructions or "", annotations=[]
+                )
+            ],
+        )
+        return ModelResponse(output=[message], usage=Usage(), response_id=None)
+
+
+STYLES = [
+    "標準的な応答をしてください。",
+    "必ず箇条書き（・で始まる行）で回答してください。",
+    "必ず英語で回答してください。",
+    "必ず俳句形式（5-7-5の17音）で回答してください。",
+]
+
+
+async def count_leaks(run_one, requests: int = 400) -> int:
+    # 各リクエストが自分の指示で実行されたかを確認し、他の指示が混ざった件数を返す
+    async def check(i: int) -> bool:
+        expected = STYLES[i % len(STYLES)]
+        output = await run_one(expected)
+        return output != expected
+
+    results = await asyncio.gather(*(check(i) for i in range(requests)))
+    return sum(results)
+
+
+def measure_allocations(make_agent, requests: int = 10_000) -> Tuple[float, float]:
+    # 1リクエストあたりの確保バイト数と所要時間（マイクロ秒）
+    # tracemalloc は実行を遅くするので、時間は別に計測する
+    started = time.perf_counter()
+    for i in range(requests):
+        make_agent(STYLES[i % len(STYLES)])
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [make_agent(STYLES[i % len(STYLES)]) for i in range(requests)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del keep
+    return allocated / requests, elapsed / requests * 1_000_000
+
+
+async def run_demo():
+    set_tracing_disabled(True)
+    random.seed(0)
+    shared_agent = Agent(
+        name="Dynamic Agent",
+        instructions=STYLES[0],
+        model=EchoInstructionsStubModel(),
+    )
+    variants = AgentVariants()
+
+    print("【Usecase-014: Per-run Overrides の活用】")
+    print("共有エージェントを書き換えずに実行ごとに指示を変える例")
+    print("-" * 40)
+
+    # 1. usecase-005 のように共有エージェントの指示を書き換えてから実行する
+    async def run_with_mutation(instructions: str) -> str:
+        shared_agent.instructions = instructions
+        result = await Runner.run(shared_agent, "東京の観光スポットを教えてください。")
+        return result.final_output
+
+    leaks = await count_leaks(run_with_mutation)
+    shared_agent.instructions = STYLES[0]
+    print(f"agent.instructions を書き換える方式: 400件中 {leaks} 件で他の指示が混入")
+
+    # 2. 上書き内容ごとのエージェントをキャッシュから取り出して実行する
+    async def run_with_variants(instructions: str) -> str:
+        result = await variants.run(
+            shared_agent, "東京の観光スポットを教えてください。", instructions=instructions
+        )
+        return result.final_output
+
+    leaks = await count_leaks(run_with_variants)
+    print(f"AgentVariants 方式:                 400件中 {leaks} 件で他の指示が混入")
+    print(f"  キャッシュ: hit={variants.hits} miss={variants.misses}")
+    print(f"  共有エージェントの指示は変更されていない: {shared_agent.instructions == STYLES[0]}")
+    print("-" * 40)
+
+    # 3. リクエストごとに clone する方式とのアロケーション比較
+    cloned = measure_allocations(lambda s: shared_agent.clone(instructions=s))
+    cached = measure_allocations(lambda s: variants.get(shared_agent, instructions=s))
+    print("1リクエストあたりのエージェント準備コスト（10,000件）:")
+    print(f"  毎回 clone        : {cloned[0]:8.1f} bytes, {cloned[1]:6.2f} µs")
+    print(f"  AgentVariants.get : {cached[0]:8.1f} bytes, {cached[1]:6.2f} µs")
+
+    # モデル設定の上書きも同じ仕組みで扱える
+    precise = variants.get(shared_agent, model_settings=ModelSettings(temperature=0.0))
+    print(f"\nモデル設定の上書き: temperature={precise.model_settings.temperature}"
+          f"（元のエージェント: {shared_agent.model_settings.temperature}）")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_demo())
+
+    # 例として期待される出力：
+    # agent.instructions を書き換える方式: 400件中 300 件で他の指示が混入
+    # AgentVariants 方式:                 400件中 0 件で他の指示が混入
+    #   キャッシュ: hit=396 miss=4
+    #   共有エージェントの指示は変更されていない: True
+    # ----------------------------------------
+    # 1リクエストあたりのエージェント準備コスト（10,000件）:
+    #   毎回 clone        :    224.7 bytes, 133.13 µs
+    #   AgentVariants.get :      8.6 bytes,   2.40 µs
+    #
+    # モデル設定の上書き: temperature=0.0（元のエージェント: None）
@@ -0,0 +1,648 @@
+# showroom/usecase-015/main.py
+from agents import Agent, Runner, set_tracing_disabled
+from openai.types.responses import (
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+from collections import deque
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from typing import Any, Deque, Dict, Optional, Set
+from urllib.parse import parse_qs, quote, urlsplit
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import socket
+import struct
+import sys
+import time
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StreamingStubModelBase, completed_event
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Streaming Gateway: usecase-010 の Streaming Agent を多数のブラウザへ同時配信する機能
+# 1つのイベントループ上で各クライアントの Runner.run_streamed を実行し、SSE と WebSocket で配信します。
+# クライアントごとのキューに上限を設け、読み出しの遅いクライアントには
+# drop（破棄）/ coalesce（まとめる）/ disconnect（切断）のいずれかのポリシーを適用します
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+SLOW_CONSUMER_POLICIES = ("drop", "coalesce", "disconnect")
+MAX_WS_FRAME_BYTES = 64 * 1024  # クライアントから受け取る WebSocket フレームの上限
+
+
+class WebSocketFrameTooLarge(Exception):
+    # 宣言されたペイロード長が上限を超えた（ステータス 1009 で閉じる）
+    pass
+
+
+# 1クライアント分の上限付き送信キュー（件数とバイト数の両方に上限を持つ）
+class ClientStream:
+    def __init__(self, max_items: int, policy: str, max_bytes: int = 256 * 1024):
+        if max_items < 1 or max_bytes < 1:
+            raise ValueError("max_items と max_bytes は 1 以上を指定してください")
+        self.items: Deque[str] = deque()
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.policy = policy
+        self.finished = False
+        self.disconnected = False
+        self.client_closed = False
+        self.dropped = 0
+        self.coalesced = 0
+        self.peak_depth = 0
+        self._ready = asyncio.Event()
+
+    def put(self, text: str) -> bool:
+        # 切断すべきときは False を返す
+        size = len(text.encode("utf-8"))
+        fits = self.bytes + size <= self.max_bytes
+        if fits and len(self.items) < self.max_items:
+            self.items.append(text)
+            self.peak_depth = max(self.peak_depth, len(self.items))
+        elif fits and self.policy == "coalesce":
+            # 件数は増やさず末尾のチャンクに連結する（バイト数の上限を超える場合は切断する）
+            self.items[-1] += text
+            self.coalesced += 1
+        elif self.policy == "drop":
+            self.dropped += 1
+            return True
+        else:
+            self.disconnected = True
+            self.finish()
+            return False
+        self.bytes += size
+        self._ready.set()
+        return True
+
+    def finish(self):
+        self.finished = True
+        self._ready.set()
+
+    def close_by_client(self):
+        # クライアントが接続を閉じたので、残りのチャンクは送らない
+        self.client_closed = True
+        self.finish()
+
+    async def get(self) -> Optional[str]:
+        while not self.items:
+            if self.finished:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        if self.disconnected or self.client_closed:
+            return None
+        item = self.items.popleft()
+        self.bytes -= len(item.encode("utf-8"))
+        return item
+
+
+@dataclass
+class GatewayMetrics:
+    active_streams: int = 0
+    peak_streams: int = 0
+    total_streams: int = 0
+    completed_streams: int = 0
+    disconnected_slow: int = 0
+    dropped_chunks: int = 0
+    coalesced_chunks: int = 0
+    peak_queue_depth: int = 0
+    ttft_seconds: Deque[float] = field(default_factory=lambda: deque(maxlen=10_000))
+
+    def summary(self, streams: Set[ClientStream]) -> Dict[str, Any]:
+        depths = [len(s.items) for s in streams]
+        ttft = sorted(self.ttft_seconds)
+
+        def pct(p: float) -> float:
+            if not ttft:
+                return 0.0
+            return round(ttft[min(len(ttft) - 1, int(len(ttft) * p / 100))] * 1000, 1)
+
+        return {
+            "active_streams": self.active_streams,
+            "peak_streams": self.peak_streams,
+            "total_streams": self.total_streams,
+            "completed_streams": self.completed_streams,
+            "disconnected_slow": self.disconnected_slow,
+            "dropped_chunks": self.dropped_chunks,
+            "coalesced_chunks": self.coalesced_chunks,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "peak_queue_depth": self.peak_queue_depth,
+            "ttft_p50_ms": pct(50),
+            "ttft_p99_ms": pct(99),
+        }
+
+
+def encode_ws_frame(payload: bytes, opcode: int = 0x1, mask: bool = False) -> bytes:
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header += bytes([mask_bit | length])
+    elif length < 65536:
+        header += bytes([mask_bit | 126]) + struct.pack("!H", length)
+    else:
+        header += bytes([mask_bit | 127]) + struct.pack("!Q", length)
+    if mask:
+        key = os.urandom(4)
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+        header += key
+    return header + payload
+
+
+async def read_ws_frame(reader: asyncio.StreamReader, max_size: Optional[int] = None):
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if max_size is not None and length > max_size:
+        # ペイロードを読む前に打ち切る（64 ビットの長さで巨大な読み込みをさせない）
+        raise WebSocketFrameTooLarge(length)
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if key:
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+def is_text_delta(event) -> bool:
+    return event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent)
+
+
+# SSE / WebSocket で Streaming Agent を配信する asyncio HTTP ゲートウェイ
+class StreamingGateway:
+    def __init__(
+        self,
+        agent: Agent,
+        queue_size: int = 64,
+        policy: str = "coalesce",
+        socket_send_buffer: Optional[int] = None,
+        queue_bytes: int = 256 * 1024,
+        max_frame_bytes: int = MAX_WS_FRAME_BYTES,
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"policy は {SLOW_CONSUMER_POLICIES} のいずれかを指定してください")
+        if queue_size < 1 or queue_bytes < 1:
+            raise ValueError("queue_size と queue_bytes は 1 以上を指定してください")
+        self.agent = agent
+        self.queue_size = queue_size
+        self.queue_bytes = queue_bytes
+        self.max_frame_bytes = max_frame_bytes
+        self.policy = policy
+        self.socket_send_buffer = socket_send_buffer
+        self.metrics = GatewayMetrics()
+        self.streams: Set[ClientStream] = set()
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> int:
+        self.server = await asyncio.start_server(
+            self._handle_connection, host, port, backlog=4096
+        )
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle_connection(self, reader, writer):
+        if self.socket_send_buffer:
+            sock = writer.get_extra_info("socket")
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.socket_send_buffer)
+            writer.transport.set_write_buffer_limits(high=self.socket_send_buffer)
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            _method, target, _ = request_line.split(" ", 2)
+            headers = {}
+            for line in header_lines:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+            url = urlsplit(target)
+            query = parse_qs(url.query).get("q", [""])[0]
+
+            if url.path == "/sse":
+                await self._serve_sse(query, writer)
+            elif url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._serve_websocket(query, headers, reader, writer)
+            elif url.path == "/metrics":
+                body = json.dumps(self.metrics.summary(self.streams)).encode("utf-8")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                    + body
+                )
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,  # ヘッダーが StreamReader の上限（64KiB）を超えた
+            ConnectionError,
+            ValueError,
+        ):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _serve_sse(self, query: str, writer):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+
+        async def send(chunk: str):
+            data = json.dumps({"delta": chunk}, ensure_ascii=False)
+            writer.write(f"data: {data}\n\n".encode("utf-8"))
+            await writer.drain()
+
+        stream = await self._stream(query, send)
+        if not stream.disconnected:
+            writer.write(b"event: done\ndata: {}\n\n")
+
+    async def _serve_websocket(self, query: str, headers, reader, writer):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            writer.write(
+                b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+            )
+            return
+        accept = base64.b64encode(
+            hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()
+        ).decode()
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            + f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        if not query:
+            # URL に q がなければ、最初のテキストメッセージを質問として受け取る
+            query = await self._read_ws_query(reader, writer)
+            if query is None:
+                return
+
+        async def send(chunk: str):
+            message = json.dumps({"type": "delta", "delta": chunk}, ensure_ascii=False)
+            writer.write(encode_ws_frame(message.encode("utf-8")))
+            await writer.drain()
+
+        stream = ClientStream(self.queue_size, self.policy, self.queue_bytes)
+        watcher = asyncio.ensure_future(self._watch_websocket(reader, writer, stream))
+        try:
+            await self._stream(query, send, stream)
+        finally:
+            watcher.cancel()
+            (close_code,) = await asyncio.gather(watcher, return_exceptions=True)
+        if not stream.disconnected and not stream.client_closed:
+            writer.write(encode_ws_frame(b'{"type": "done"}'))
+        if not isinstance(close_code, int):
+            close_code = 1000
+        writer.write(encode_ws_frame(struct.pack("!H", close_code), opcode=0x8))
+
+    async def _read_ws_query(self, reader, writer) -> Optional[str]:
+        # 質問はテキストフレーム（opcode 0x1）だけを受け付ける。
+        # ping には pong を返して待ち続け、それ以外は close を返して None を返す
+        while True:
+            try:
+                opcode, payload = await read_ws_frame(reader, self.max_frame_bytes)
+            except WebSocketFrameTooLarge:
+                writer.write(encode_ws_frame(struct.pack("!H", 1009), opcode=0x8))
+                return None
+            if opcode == 0x1:
+                return payload.decode("utf-8")
+            if opcode == 0x9:
+                writer.write(encode_ws_frame(payload, opcode=0xA))
+                continue
+            # close には 1000、バイナリや継続フレームには 1003（対応していないデータ）で応える
+            code = 1000 if opcode == 0x8 else 1003
+            writer.write(encode_ws_frame(struct.pack("!H", code), opcode=0x8))
+            return None
+
+    async def _watch_websocket(self, reader, writer, stream: ClientStream) -> Optional[int]:
+        # 配信中もクライアントからのフレームを読み、ping には pong を返す。
+        # close フレームを受け取るか接続が切れたら、配信を止めてモデルのストリームもキャンセルする。
+        # 上限を超えるフレームを受け取った場合は、返すべき close のステータス（1009）を返す
+        close_code = None
+        try:
+            while True:
+                opcode, payload = await read_ws_frame(reader, self.max_frame_bytes)
+                if opcode == 0x9:
+                    writer.write(encode_ws_frame(payload, opcode=0xA))
+                elif opcode == 0x8:
+                    break
+        except WebSocketFrameTooLarge:
+            close_code = 1009
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        stream.close_by_client()
+        return close_code
+
+    async def _produce(self, query: str, stream: ClientStream):
+        result = Runner.run_streamed(self.agent, query)
+        try:
+            async for event in result.stream_events():
+                if is_text_delta(event) and not stream.put(event.data.delta):
+                    self.metrics.disconnected_slow += 1
+                    result.cancel()
+                    return
+        except asyncio.CancelledError:
+            result.cancel()
+            raise
+        finally:
+            stream.finish()
+
+    async def _stream(
+        self, query: str, send, stream: Optional[ClientStream] = None
+    ) -> ClientStream:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        if stream is None:
+            stream = ClientStream(self.queue_size, self.policy, self.queue_bytes)
+        self.streams.add(stream)
+        self.metrics.total_streams += 1
+        self.metrics.active_streams += 1
+        self.metrics.peak_streams = max(self.metrics.peak_streams, self.metrics.active_streams)
+        producer = loop.create_task(self._produce(query, stream))
+        try:
+            first = True
+            while True:
+                chunk = await stream.get()
+                if chunk is None:
+                    break
+                await send(chunk)
+                if first:
+                    self.metrics.ttft_seconds.append(loop.time() - started)
+                    first = False
+            if not stream.disconnected and not stream.client_closed:
+                self.metrics.completed_streams += 1
+        finally:
+            # クライアントが途中で切断した場合もモデルのストリームを止める
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            self.streams.discard(stream)
+            self.metrics.active_streams -= 1
+            self.metrics.dropped_chunks += stream.dropped
+            self.metrics.coalesced_chunks += stream.coalesced
+            self.metrics.peak_queue_depth = max(self.metrics.peak_queue_depth, stream.peak_depth)
+        return stream
+
+
+# 一定間隔でテキストを少しずつ返すストリーミング用のスタブモデル
+class StreamingStubModel(StreamingStubModelBase):
+    def __init__(
+        self,
+        chunks: int = 40,
+        chunk_text: str = "人工知能の歴史における重要な出来事、",
+        interval: float = 0.01,
+    ):
+        self.chunks = chunks
+        self.chunk_text = chunk_text
+        self.interval = interval
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        await asyncio.sleep(random.uniform(0.05, 0.15))  # 最初のトークンまでの待ち時間
+        for i in range(self.chunks):
+            yield ResponseTextDeltaEvent(
+                type="response.output_text.delta",
+                item_id="msg_stub",
+                output_index=0,
+                content_index=0,
+                delta=self.chunk_text,
+                sequence_number=i,
+                logprobs=[],
+            )
+            await asyncio.sleep(self.interval)
+        message = ResponseOutputMessage(
+            id="msg_stub",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[
+                ResponseOutputText(
+                    type="output_text", text=self.chunk_text * self.chunks, annotations=[]
+                )
+            ],
+        )
+        yield completed_event([message], sequence_number=self.chunks)
+
+
+@dataclass
+class ClientResult:
+    ok: bool
+    chunks: int = 0
+    ttft: Optional[float] = None
+    done: bool = False
+
+
+# 負荷試験用のクライアント（SSE と WebSocket）
+# 遅いクライアントを再現するため、SSE はソケットから直接少しずつ読み出す
+# （StreamReader は読み出し前のデータも内部バッファに溜めてしまうため）
+async def sse_client(port: int, query: str, slow: bool) -> ClientResult:
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if slow:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.setblocking(False)
+    result = ClientResult(ok=True)
+    try:
+        await loop.sock_connect(sock, ("127.0.0.1", port))
+        await loop.sock_sendall(
+            sock, f"GET /sse?q={quote(query)} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+        )
+        if slow:
+            await asyncio.sleep(3.0)  # しばらく読まない遅いクライアント
+        buffer = b""
+        while True:
+            data = await loop.sock_recv(sock, 512 if slow else 65536)
+            if not data:
+                break
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.startswith(b'data: {"delta"'):
+                    result.chunks += 1
+                    if result.ttft is None:
+                        result.ttft = time.perf_counter() - started
+                elif line.startswith(b"event: done"):
+                    result.done = True
+            if slow:
+                await asyncio.sleep(0.5)  # 約 1KB/秒でしか読まない
+    except ConnectionError:
+        result.ok = False
+    finally:
+        sock.close()
+    return result
+
+
+async def ws_client(port: int, query: str) -> ClientResult:
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(
+        (
+            "GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode()
+    )
+    result = ClientResult(ok=True)
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(encode_ws_frame(query.encode("utf-8"), mask=True))
+        while True:
+            opcode, payload = await read_ws_frame(reader)
+            if opcode == 0x8:
+                break
+            message = json.loads(payload)
+            if message["type"] == "delta":
+                result.chunks += 1
+                if result.ttft is None:
+                    result.ttft = time.perf_counter() - started
+            elif message["type"] == "done":
+                result.done = True
+    except (ConnectionError, asyncio.IncompleteReadError):
+        result.ok = False
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    return result
+
+
+def raise_open_file_limit(minimum: int):
+    # 1000 クライアント分のソケット（サーバー側と合わせて 2000 以上）を開けるようにする
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < minimum:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(minimum, hard), hard))
+
+
+async def run_load_test(
+    clients: int = 1000,
+    slow_fraction: float = 0.02,
+    ws_fraction: float = 0.1,
+    policy: str = "coalesce",
+    ramp_seconds: float = 1.0,
+):
+    # 1応答 40KB 程度にして、遅いクライアントではソケットのバッファが埋まるようにする
+    agent = Agent(
+        name="Streaming Agent",
+        instructions="ユーザーの質問に詳細かつ段階的に回答してください。",
+        model=StreamingStubModel(chunks=60, chunk_text="人工知能の歴史における重要な出来事、" * 12),
+    )
+    gateway = StreamingGateway(agent, queue_size=8, policy=policy, socket_send_buffer=4096)
+    port = await gateway.start(port=0)
+
+    query = "人工知能の歴史について教えてください。"
+    slow_every = int(1 / slow_fraction) if slow_fraction else 0
+    ws_every = int(1 / ws_fraction) if ws_fraction else 0
+
+    async def client(i: int) -> ClientResult:
+        # 接続開始を ramp_seconds の間に分散させる
+        await asyncio.sleep(ramp_seconds * i / clients)
+        if ws_every and i % ws_every == 1:
+            return await ws_client(port, query)
+        slow = bool(slow_every) and i % slow_every == 0
+        return await sse_client(port, query, slow)
+
+    tasks = [client(i) for i in range(clients)]
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    await gateway.close()
+
+    finished = [r for r in results if isinstance(r, ClientResult)]
+    ttfts = sorted(r.ttft for r in finished if r.ttft is not None)
+    print(f"\nポリシー: {policy} / クライアント数: {clients}（遅いクライアント {slow_fraction:.0%}）")
+    print(f"  所要時間: {elapsed:.2f}秒")
+    print(f"  完了: {sum(r.done for r in finished)} / 接続エラー: {len(results) - len(finished) + sum(not r.ok for r in finished)}")
+    if ttfts:
+        print(
+            f"  クライアント側 TTFT: p50={ttfts[len(ttfts) // 2] * 1000:.1f}ms "
+            f"p99={ttfts[int(len(ttfts) * 0.99) - 1] * 1000:.1f}ms"
+        )
+    print("  ゲートウェイ統計:", gateway.metrics.summary(gateway.streams))
+
+
+if __name__ == "__main__":
+    set_tracing_disabled(True)
+    raise_open_file_limit(4096)
+
+    print("【Usecase-015: Streaming Gateway の活用】")
+    print("1つのプロセスから多数のクライアントへ SSE / WebSocket で配信する例")
+    print("-" * 40)
+
+    if "--serve" in sys.argv:
+        # 実際の Streaming Agent を配信する
+        # 例: curl -N "http://127.0.0.1:8000/sse?q=人工知能の歴史を教えてください"
+        async def serve():
+            agent = Agent(
+                name="Streaming Agent",
+                instructions="ユーザーの質問に詳細かつ段階的に回答してください。",
+                model="o3-mini",
+            )
+            gateway = StreamingGateway(agent)
+            port = await gateway.start(port=8000)
+            print(f"http://127.0.0.1:{port}/sse?q=... / ws://127.0.0.1:{port}/ws で待ち受け中")
+            await asyncio.Event().wait()
+
+        asyncio.run(serve())
+    else:
+        # スタブモデルに対する 1,000 クライアントの負荷試験
+        # 例: python main.py coalesce （ポリシーを省略するとすべて実行）
+        policies = [p for p in sys.argv[1:] if p in SLOW_CONSUMER_POLICIES]
+        for policy in policies or SLOW_CONSUMER_POLICIES:
+            asyncio.run(run_load_test(policy=policy))
+
+    # 例として期待される出力（1 CPU の環境。TTFT は SDK のイベント処理で CPU が飽和するため大きくなる）：
+    # ポリシー: drop / クライアント数: 1000（遅いクライアント 2%）
+    #   所要時間: 38.17秒
+    #   完了: 1000 / 接続エラー: 0
+    #   クライアント側 TTFT: p50=5944.3ms p99=6570.3ms
+    #   ゲートウェイ統計: {'active_streams': 0, 'peak_streams': 1000, ..., 'dropped_chunks': 361, 'peak_queue_depth': 8, ...}
+    #
+    # ポリシー: coalesce / クライアント数: 1000（遅いクライアント 2%）
+    #   完了: 1000 / 接続エラー: 0
+    #   ゲートウェイ統計: {..., 'coalesced_chunks': 360, 'peak_queue_depth': 8, ...}
+    #
+    # ポリシー: disconnect / クライアント数: 1000（遅いクライアント 2%）
+    #   完了: 980 / 接続エラー: 0
+    #   ゲートウェイ統計: {..., 'completed_streams': 980, 'disconnected_slow': 20, 'peak_queue_depth': 8, ...}
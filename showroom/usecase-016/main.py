@@ -0,0 +1,503 @@
+# showroom/usecase-016/main.py
+from agents import (
+    Agent,
+    Runner,
+    ModelResponse,
+    Usage,
+    TracingProcessor,
+    function_tool,
+    generation_span,
+    set_trace_processors,
+    set_tracing_disabled,
+)
+from agents.tracing import AgentSpanData
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from collections import deque
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from typing import Any, Deque, Dict, List, Optional
+import asyncio
+import glob
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Local Tracing: トレースをリモートに送らず、ローカルの JSONL ファイルに書き出す機能
+# usecase-006 のフックは print で表示するだけですが、SDK のトレースを TracingProcessor で
+# 受け取り、メモリにためてバックグラウンドスレッドからまとめて書き出します
+# - エージェントごとのサンプリング率（トレースの先頭で採否を決める head-based sampling）
+# - キューが一杯のときは実行を止めずにスパンを捨てる
+# - サイズでローテーションする JSONL ファイル（gzip 圧縮も可能）
+
+
+# サイズ上限でファイルを切り替える JSONL ライター
+# 圧縮時も上限は圧縮前のバイト数で判定します
+class RotatingJsonlWriter:
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "traces",
+        max_bytes: int = 16 * 1024 * 1024,
+        max_files: int = 10,
+        compress: bool = False,
+    ):
+        if max_bytes < 1 or max_files < 1:
+            raise ValueError("max_bytes と max_files は 1 以上を指定してください")
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.compress = compress
+        self.suffix = ".jsonl.gz" if compress else ".jsonl"
+        os.makedirs(directory, exist_ok=True)
+        existing = self.files()
+        self._sequence = self._sequence_of(existing[-1]) if existing else 0
+        self._file = None
+        self._bytes = 0
+
+    def files(self) -> List[str]:
+        pattern = os.path.join(self.directory, f"{self.prefix}-*{self.suffix}")
+        return sorted(glob.glob(pattern))
+
+    def _sequence_of(self, path: str) -> int:
+        name = os.path.basename(path)
+        return int(name[len(self.prefix) + 1 : -len(self.suffix)])
+
+    def _open_next(self):
+        self.close()
+        self._sequence += 1
+        path = os.path.join(self.directory, f"{self.prefix}-{self._sequence:06d}{self.suffix}")
+        if self.compress:
+            self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+        self._bytes = 0
+        # 古いファイルから削除して max_files 個に保つ
+        for old in self.files()[: -self.max_files]:
+            os.remove(old)
+
+    def write_lines(self, lines: List[str]):
+        if self._file is None or self._bytes >= self.max_bytes:
+            self._open_next()
+        data = "\n".join(lines) + "\n"
+        self._file.write(data)
+        self._bytes += len(data)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+@dataclass
+class ExporterStats:
+    traces_seen: int = 0
+    traces_sampled: int = 0
+    spans_seen: int = 0
+    enqueued: int = 0
+    dropped: int = 0
+    written: int = 0
+    batches: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+# スパンをメモリのキューにためて、バックグラウンドスレッドから JSONL に書き出すプロセッサ
+# 実行中のスレッドでは採否の判定とキューへの追加だけを行い、export() と JSON 化はワーカー側で行います
+class LocalTraceProcessor(TracingProcessor):
+    def __init__(
+        self,
+        writer: RotatingJsonlWriter,
+        sample_rates: Optional[Dict[str, float]] = None,
+        default_sample_rate: float = 1.0,
+        max_queue_size: int = 8192,
+        max_batch_size: int = 512,
+        flush_interval: float = 1.0,
+    ):
+        if max_queue_size < 1 or max_batch_size < 1:
+            raise ValueError("max_queue_size と max_batch_size は 1 以上を指定してください")
+        self.writer = writer
+        self.sample_rates = sample_rates or {}
+        self.default_sample_rate = default_sample_rate
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        # 1バッチ分たまるか、キューが半分埋まったらワーカーを起こす
+        # （max_queue_size が max_batch_size より小さくても、あふれる前に書き出しが始まる）
+        self._wakeup_threshold = max(1, min(max_batch_size, max_queue_size // 2))
+        self.stats = ExporterStats()
+
+        self._queue: Deque[Any] = deque()
+        self._decisions: Dict[str, bool] = {}  # trace_id -> 採用するか
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._worker.start()
+
+    @staticmethod
+    def _sampled(trace_id: str, rate: float) -> bool:
+        # trace_id の末尾から決定的に判定するので、同じトレースのスパンは必ず同じ結果になる
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        return int(trace_id[-8:], 16) < rate * 0x100000000
+
+    def _decide(self, trace_id: str, agent_name: Optional[str]) -> bool:
+        rate = self.sample_rates.get(agent_name, self.default_sample_rate)
+        sampled = self._sampled(trace_id, rate)
+        self._decisions[trace_id] = sampled
+        if sampled:
+            self.stats.traces_sampled += 1
+        return sampled
+
+    def _enqueue(self, item: Any):
+        if len(self._queue) >= self.max_queue_size:
+            self.stats.dropped += 1
+            return
+        self._queue.append(item)
+        self.stats.enqueued += 1
+        if len(self._queue) == self._wakeup_threshold:
+            self._wakeup.set()
+
+    def on_trace_start(self, trace) -> None:
+        self.stats.traces_seen += 1
+
+    def on_trace_end(self, trace) -> None:
+        sampled = self._decisions.pop(trace.trace_id, None)
+        if sampled is None:
+            # エージェントが1つも実行されなかったトレース
+            sampled = self._sampled(trace.trace_id, self.default_sample_rate)
+        if sampled:
+            self._enqueue(trace)
+
+    def on_span_start(self, span) -> None:
+        # 最初に開始したエージェント（起点のエージェント）のサンプリング率で採否を決める
+        if span.trace_id not in self._decisions and isinstance(span.span_data, AgentSpanData):
+            self._decide(span.trace_id, span.span_data.name)
+
+    def on_span_end(self, span) -> None:
+        self.stats.spans_seen += 1
+        sampled = self._decisions.get(span.trace_id)
+        if sampled is None:
+            sampled = self._decide(span.trace_id, None)
+        if sampled:
+            self._enqueue(span)
+
+    def _drain(self) -> int:
+        lines = []
+        while self._queue and len(lines) < self.max_batch_size:
+            item = self._queue.popleft()
+            exported = item.export()
+            if exported:
+                lines.append(
+                    json.dumps(exported, ensure_ascii=False, separators=(",", ":"), default=str)
+                )
+        if lines:
+            with self._write_lock:
+                self.writer.write_lines(lines)
+            self.stats.written += len(lines)
+            self.stats.batches += 1
+        return len(lines)
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            while self._drain():
+                pass
+            with self._write_lock:
+                self.writer.flush()
+
+    def force_flush(self) -> None:
+        while self._drain():
+            pass
+        with self._write_lock:
+            self.writer.flush()
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
+        self._worker.join()
+        self.force_flush()
+        with self._write_lock:
+            self.writer.close()
+
+
+# 比較用: スパンが終わるたびに実行中のスレッドで JSON 化してファイルに書き込むプロセッサ
+class SyncJsonlProcessor(TracingProcessor):
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8")
+        self.spans_seen = 0
+
+    def _write(self, item):
+        exported = item.export()
+        if exported:
+            self._file.write(json.dumps(exported, ensure_ascii=False, default=str) + "\n")
+            self._file.flush()
+
+    def on_trace_start(self, trace) -> None:
+        pass
+
+    def on_trace_end(self, trace) -> None:
+        self._write(trace)
+
+    def on_span_start(self, span) -> None:
+        pass
+
+    def on_span_end(self, span) -> None:
+        self.spans_seen += 1
+        self._write(span)
+
+    def force_flush(self) -> None:
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+# 何もしないプロセッサ（SDK 自体のトレースのコストを測るため）
+class NoopProcessor(TracingProcessor):
+    def on_trace_start(self, trace) -> None:
+        pass
+
+    def on_trace_end(self, trace) -> None:
+        pass
+
+    def on_span_start(self, span) -> None:
+        pass
+
+    def on_span_end(self, span) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+# 実行中のスレッドでプロセッサの呼び出しにかかった時間を計測するラッパー
+class HotPathTimer(TracingProcessor):
+    def __init__(self, inner: TracingProcessor):
+        self.inner = inner
+        self.spans = 0
+        self.seconds = 0.0
+
+    def on_trace_start(self, trace) -> None:
+        started = time.perf_counter()
+        self.inner.on_trace_start(trace)
+        self.seconds += time.perf_counter() - started
+
+    def on_trace_end(self, trace) -> None:
+        started = time.perf_counter()
+        self.inner.on_trace_end(trace)
+        self.seconds += time.perf_counter() - started
+
+    def on_span_start(self, span) -> None:
+        started = time.perf_counter()
+        self.inner.on_span_start(span)
+        self.seconds += time.perf_counter() - started
+
+    def on_span_end(self, span) -> None:
+        started = time.perf_counter()
+        self.inner.on_span_end(span)
+        self.seconds += time.perf_counter() - started
+        self.spans += 1
+
+    def force_flush(self) -> None:
+        self.inner.force_flush()
+
+    def shutdown(self) -> None:
+        self.inner.shutdown()
+
+
+@function_tool
+def get_weather(city: str) -> str:
+    """
+    指定された都市の天気を取得します。
+
+    Args:
+        city: 都市名
+    """
+    return f"{city}の天気は晴れです。"
+
+
+# 1回目はツールを呼び出し、ツールの結果を受け取ったら応答するローカルスタブモデル
+# 実際のモデルと同じように generation スパンを記録します
+class ToolCallingStubModel(StubModelBase):
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        with generation_span(model="stub", input=input) as span:
+            await asyncio.sleep(self.latency)
+            if tools and not any(item.get("type") == "function_call_output" for item in input):
+                output = [
+                    ResponseFunctionToolCall(
+                        type="function_call",
+                        id="fc_stub",
+                        call_id="call_stub",
+                        name=tools[0].name,
+                        arguments=json.dumps({"city": "東京"}, ensure_ascii=False),
+                        status="completed",
+                    )
+                ]
+            else:
+                output = [
+                    ResponseOutputMessage(
+                        id="msg_stub",
+                        type="message",
+                        role="assistant",
+                        status="completed",
+                        content=[
+                            ResponseOutputText(
+                                type="output_text", text="東京は晴れです。", annotations=[]
+                            )
+                        ],
+                    )
+                ]
+            span.span_data.output = [item.model_dump() for item in output]
+        return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+
+async def run_concurrently(agents: List[Agent], runs: int) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(Runner.run(agents[i % len(agents)], "東京の天気は？") for i in range(runs))
+    )
+    return time.perf_counter() - started
+
+
+async def benchmark(agent: Agent, runs: int, directory: str):
+    # 同時に runs 件の実行を行い、実行中のスレッドでプロセッサに費やした時間をスパンあたりで求める
+    print(f"\n同時実行 {runs:,} 件でのスパンあたりのオーバーヘッド（実行中のスレッドで費やした時間）:")
+    await run_concurrently([agent], 50)  # ウォームアップ
+
+    set_tracing_disabled(True)
+    baseline = await run_concurrently([agent], runs)
+    set_tracing_disabled(False)
+    print(f"  {'トレース無効':<20}: 全体 {baseline:5.2f}秒")
+
+    def make_local(**kwargs):
+        writer = RotatingJsonlWriter(os.path.join(directory, "bench"), max_bytes=4 * 1024 * 1024)
+        return LocalTraceProcessor(writer, **kwargs)
+
+    configs = [
+        ("何もしない", NoopProcessor),
+        ("同期書き込み", lambda: SyncJsonlProcessor(os.path.join(directory, "sync.jsonl"))),
+        ("Local sample=1.0", make_local),
+        ("Local sample=0.1", lambda: make_local(default_sample_rate=0.1)),
+        # 小さいキュー: ワーカーは128件たまった時点で起きるが、CPU が飽和した瞬間のバーストでは破棄が出る
+        ("Local queue=256", lambda: make_local(max_queue_size=256)),
+    ]
+    for label, factory in configs:
+        processor = HotPathTimer(factory())
+        set_trace_processors([processor])
+        elapsed = await run_concurrently([agent], runs)
+        processor.shutdown()
+        per_span_us = processor.seconds / processor.spans * 1_000_000
+        line = f"  {label:<20}: 全体 {elapsed:5.2f}秒  {per_span_us:6.2f}µs/span"
+        if isinstance(processor.inner, LocalTraceProcessor):
+            stats = processor.inner.stats
+            line += f"  書き込み={stats.written:,} 破棄={stats.dropped:,}"
+        print(line)
+
+
+async def run_demo():
+    set_tracing_disabled(False)
+    model = ToolCallingStubModel()
+    weather_agent = Agent(
+        name="Weather Agent", instructions="天気を答えてください。", model=model, tools=[get_weather]
+    )
+    chat_agent = Agent(name="Chat Agent", instructions="雑談に応じてください。", model=model)
+
+    print("【Usecase-016: Local Tracing の活用】")
+    print("トレースをローカルの JSONL ファイルにまとめて書き出す例")
+    print("-" * 40)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Weather Agent はすべて記録し、Chat Agent は 10% だけ記録する
+        writer = RotatingJsonlWriter(
+            os.path.join(directory, "traces"), max_bytes=64 * 1024, max_files=5, compress=True
+        )
+        processor = LocalTraceProcessor(
+            writer, sample_rates={"Weather Agent": 1.0, "Chat Agent": 0.1}
+        )
+        # 既定のリモートへのエクスポートを置き換える
+        set_trace_processors([processor])
+
+        await run_concurrently([weather_agent, chat_agent], 200)
+        processor.shutdown()
+
+        print("統計:", processor.stats.summary())
+        files = writer.files()
+        print(f"出力ファイル: {[os.path.basename(path) for path in files]}")
+        agent_spans: Dict[str, int] = {}
+        for path in files:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    data = record.get("span_data") or {}
+                    if data.get("type") == "agent":
+                        agent_spans[data["name"]] = agent_spans.get(data["name"], 0) + 1
+        print(f"記録されたエージェントスパン: {agent_spans}")
+        print("-" * 40)
+
+        await benchmark(weather_agent, 300, directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_demo())
+
+    # 例として期待される出力：
+    # 統計: {'traces_seen': 200, 'traces_sampled': 109, 'spans_seen': 1100, 'enqueued': 845, 'dropped': 0, 'written': 845, 'batches': 4}
+    # 出力ファイル: ['traces-000001.jsonl.gz', 'traces-000002.jsonl.gz', 'traces-000003.jsonl.gz']
+    # 記録されたエージェントスパン: {'Chat Agent': 9, 'Weather Agent': 100}
+    # ----------------------------------------
+    #
+    # 同時実行 300 件でのスパンあたりのオーバーヘッド（実行中のスレッドで費やした時間）:
+    #   トレース無効              : 全体  3.41秒
+    #   何もしない               : 全体  3.36秒    1.17µs/span
+    #   同期書き込み              : 全体  3.76秒   46.08µs/span
+    #   Local sample=1.0    : 全体  3.59秒    4.71µs/span  書き込み=2,400 破棄=0
+    #   Local sample=0.1    : 全体  3.81秒    4.28µs/span  書き込み=200 破棄=0
+    #   Local queue=256     : 全体  3.03秒    4.17µs/span  書き込み=2,358 破棄=42
+    # （1 CPU の環境。queue=256 の破棄は、1 CPU で300件が同時に終わる瞬間にワーカーが追いつかない分）
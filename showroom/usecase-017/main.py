@@ -0,0 +1,592 @@
+# showroom/usecase-017/main.py
+from agents import (
+    Agent,
+    AgentOutputSchema,
+    AgentOutputSchemaBase,
+    FunctionTool,
+    GuardrailFunctionOutput,
+    Model,
+    ModelResponse,
+    MultiProvider,
+    RunHooks,
+    Runner,
+    Usage,
+    function_tool,
+    input_guardrail,
+    set_tracing_disabled,
+)
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from collections import Counter
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import cProfile
+import dataclasses
+import inspect
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Run Profiler: 実行が遅いときに、時間がモデルの待ち時間なのかクライアント側の処理なのかを切り分ける機能
+# エージェントのモデル・ツール・出力の型・ガードレール・フックを計測用のラッパーに差し替えて実行し、
+# 実行全体の経過時間を次のフェーズに振り分けます（どれにも当てはまらない時間は SDK の処理）
+# 必要に応じて、I/O 待ち以外の部分のスタックをサンプリングして flamegraph 用の collapsed 形式で書き出します
+
+PHASES = ["model", "tools", "output_parsing", "guardrails", "hooks", "sdk"]
+PHASE_LABELS = {
+    "model": "モデルの待ち時間",
+    "tools": "ツールの実行",
+    "output_parsing": "出力のパース",
+    "guardrails": "ガードレール",
+    "hooks": "フック",
+    "sdk": "SDK の処理",
+}
+# 区間が重なったときに優先するフェーズ（モデルの待ち時間は最後）
+PHASE_PRIORITY = ["hooks", "output_parsing", "guardrails", "tools", "model"]
+
+
+# 対象スレッドのスタックを一定間隔で取得するサンプリングプロファイラ
+# イベントループが select で I/O を待っている間のサンプルは数えません
+# GIL の切り替え間隔（既定 5ms）のままだと、対象スレッドが GIL を手放す select の時点ばかりが
+# サンプルされるため、サンプリング中は切り替え間隔を短くします
+class StackSampler:
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.idle_samples = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval = sys.getswitchinterval()
+
+    @staticmethod
+    def _is_idle(frame) -> bool:
+        code = frame.f_code
+        return code.co_name == "select" and code.co_filename.endswith("selectors.py")
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            if self._is_idle(frame):
+                self.idle_samples += 1
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self._stopped.clear()
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.interval / 4)
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def write_collapsed(self, path: str):
+        # flamegraph.pl / speedscope で読める「frame1;frame2;frame3 count」形式
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit: int = 5) -> List[Tuple[str, int]]:
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+# 出力の型のパース（JSON の検証）にかかる時間を計測するラッパー
+class ProfiledOutputSchema(AgentOutputSchemaBase):
+    def __init__(self, inner: AgentOutputSchemaBase, profiler: "RunProfiler"):
+        self.inner = inner
+        self.profiler = profiler
+
+    def is_plain_text(self) -> bool:
+        return self.inner.is_plain_text()
+
+    def name(self) -> str:
+        return self.inner.name()
+
+    def json_schema(self) -> Dict[str, Any]:
+        return self.inner.json_schema()
+
+    def is_strict_json_schema(self) -> bool:
+        return self.inner.is_strict_json_schema()
+
+    def validate_json(self, json_str: str) -> Any:
+        started = time.perf_counter()
+        try:
+            return self.inner.validate_json(json_str)
+        finally:
+            self.profiler.record("output_parsing", started)
+
+
+# モデル呼び出しの待ち時間を計測するラッパー
+# ストリーミングでは、イベントを待っている間だけを計測します（受け取った側の処理時間は含めない）
+class ProfiledModel(Model):
+    def __init__(self, inner: Model, profiler: "RunProfiler"):
+        self.inner = inner
+        self.profiler = profiler
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        started = time.perf_counter()
+        try:
+            return await self.inner.get_response(*args, **kwargs)
+        finally:
+            self.profiler.record("model", started)
+
+    async def stream_response(self, *args, **kwargs):
+        stream = self.inner.stream_response(*args, **kwargs).__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                event = await stream.__anext__()
+            except StopAsyncIteration:
+                self.profiler.record("model", started)
+                return
+            self.profiler.record("model", started)
+            yield event
+
+
+# ユーザーのフックの実行時間を計測するラッパー
+class ProfiledHooks(RunHooks):
+    def __init__(self, inner: Optional[RunHooks], profiler: "RunProfiler"):
+        self.inner = inner
+        self.profiler = profiler
+
+    async def _call(self, name: str, *args, **kwargs):
+        if self.inner is None:
+            return
+        started = time.perf_counter()
+        try:
+            await getattr(self.inner, name)(*args, **kwargs)
+        finally:
+            self.profiler.record("hooks", started)
+
+    async def on_llm_start(self, *args, **kwargs):
+        await self._call("on_llm_start", *args, **kwargs)
+
+    async def on_llm_end(self, *args, **kwargs):
+        await self._call("on_llm_end", *args, **kwargs)
+
+    async def on_agent_start(self, *args, **kwargs):
+        await self._call("on_agent_start", *args, **kwargs)
+
+    async def on_agent_end(self, *args, **kwargs):
+        await self._call("on_agent_end", *args, **kwargs)
+
+    async def on_handoff(self, *args, **kwargs):
+        await self._call("on_handoff", *args, **kwargs)
+
+    async def on_tool_start(self, *args, **kwargs):
+        await self._call("on_tool_start", *args, **kwargs)
+
+    async def on_tool_end(self, *args, **kwargs):
+        await self._call("on_tool_end", *args, **kwargs)
+
+
+# 1回の実行を計測するプロファイラ
+# 計測用のラッパーを差し込んだエージェントの clone で実行するので、元のエージェントは変更しません
+class RunProfiler:
+    def __init__(self, sampling: bool = False, use_cprofile: bool = False, interval: float = 0.001):
+        self.sampling = sampling
+        self.use_cprofile = use_cprofile
+        self.interval = interval
+        self.intervals: List[Tuple[float, float, str]] = []
+        self.wall_seconds = 0.0
+        self.sampler: Optional[StackSampler] = None
+        self.cprofile: Optional[cProfile.Profile] = None
+
+    def record(self, phase: str, started: float):
+        self.intervals.append((started, time.perf_counter(), phase))
+
+    def _timed(self, phase: str, func):
+        # 同期関数・非同期関数のどちらにも使えるラッパー
+        def wrapped(*args, **kwargs):
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            if inspect.isawaitable(result):
+
+                async def finish():
+                    try:
+                        return await result
+                    finally:
+                        self.record(phase, started)
+
+                return finish()
+            self.record(phase, started)
+            return result
+
+        return wrapped
+
+    def instrument(self, agent: Agent, seen: Optional[Dict[int, Agent]] = None) -> Agent:
+        seen = {} if seen is None else seen
+        if id(agent) in seen:
+            return seen[id(agent)]
+
+        model = agent.model
+        if not isinstance(model, Model):
+            model = MultiProvider().get_model(model)
+        output_type = agent.output_type
+        if output_type is not None and output_type is not str:
+            if not isinstance(output_type, AgentOutputSchemaBase):
+                output_type = AgentOutputSchema(output_type)
+            output_type = ProfiledOutputSchema(output_type, self)
+        tools = [
+            dataclasses.replace(tool, on_invoke_tool=self._timed("tools", tool.on_invoke_tool))
+            if isinstance(tool, FunctionTool)
+            else tool
+            for tool in agent.tools
+        ]
+        input_guardrails = [
+            dataclasses.replace(
+                guardrail,
+                name=guardrail.get_name(),
+                guardrail_function=self._timed("guardrails", guardrail.guardrail_function),
+            )
+            for guardrail in agent.input_guardrails
+        ]
+        output_guardrails = [
+            dataclasses.replace(
+                guardrail,
+                name=guardrail.get_name(),
+                guardrail_function=self._timed("guardrails", guardrail.guardrail_function),
+            )
+            for guardrail in agent.output_guardrails
+        ]
+        profiled = agent.clone(
+            model=ProfiledModel(model, self),
+            output_type=output_type,
+            tools=tools,
+            input_guardrails=input_guardrails,
+            output_guardrails=output_guardrails,
+        )
+        seen[id(agent)] = profiled
+        profiled.handoffs = [
+            self.instrument(handoff, seen) if isinstance(handoff, Agent) else handoff
+            for handoff in agent.handoffs
+        ]
+        return profiled
+
+    async def run(self, agent: Agent, input: Any, hooks: Optional[RunHooks] = None, **kwargs):
+        profiled_agent = self.instrument(agent)
+        profiled_hooks = ProfiledHooks(hooks, self)
+
+        if self.sampling:
+            # 複数回の実行を同じプロファイラで計測した場合はサンプルを合算する
+            if self.sampler is None:
+                self.sampler = StackSampler(threading.get_ident(), self.interval)
+            self.sampler.start()
+        if self.use_cprofile:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        started = time.perf_counter()
+        try:
+            return await Runner.run(profiled_agent, input, hooks=profiled_hooks, **kwargs)
+        finally:
+            finished = time.perf_counter()
+            self.wall_seconds += finished - started
+            self.intervals.append((started, finished, "sdk"))
+            if self.cprofile is not None:
+                self.cprofile.disable()
+            if self.sampler is not None:
+                self.sampler.stop()
+
+    def breakdown(self) -> Dict[str, float]:
+        # 各時点で最も優先度の高いフェーズに経過時間を割り当てる（合計が経過時間と一致する）
+        rank = {phase: i for i, phase in enumerate(PHASE_PRIORITY + ["sdk"])}
+        events = []
+        for start, end, phase in self.intervals:
+            events.append((start, 1, phase))
+            events.append((end, -1, phase))
+        events.sort(key=lambda event: event[0])
+
+        totals = {phase: 0.0 for phase in PHASES}
+        active: Counter = Counter()
+        previous = None
+        for timestamp, delta, phase in events:
+            if previous is not None and active:
+                current = min((p for p in active if active[p] > 0), key=rank.get, default=None)
+                if current is not None:
+                    totals[current] += timestamp - previous
+            active[phase] += delta
+            if active[phase] == 0:
+                del active[phase]
+            previous = timestamp
+        return totals
+
+    def write_profile(self, path: str):
+        # サンプリング時は collapsed 形式、cProfile 使用時は pstats 形式で書き出す
+        if self.sampler is not None:
+            self.sampler.write_collapsed(path)
+        elif self.cprofile is not None:
+            self.cprofile.dump_stats(path)
+
+    def report(self) -> str:
+        totals = self.breakdown()
+        lines = [f"経過時間: {self.wall_seconds * 1000:.1f}ms"]
+        for phase in PHASES:
+            seconds = totals[phase]
+            share = seconds / self.wall_seconds * 100 if self.wall_seconds else 0.0
+            lines.append(f"  {PHASE_LABELS[phase]:<12} {seconds * 1000:8.1f}ms {share:5.1f}%")
+        return "\n".join(lines)
+
+
+# --- 以下はデモ用（usecase-009 のタスク管理と usecase-004 の構造化出力を想定） ---
+
+tasks = [
+    {"id": i, "title": f"タスク{i}", "completed": i % 3 == 0} for i in range(1, 201)
+]
+
+
+@function_tool
+def get_all_tasks() -> List[Dict]:
+    """
+    すべてのタスクを取得します。
+    """
+    return tasks
+
+
+@function_tool
+def complete_task(task_id: int) -> Dict:
+    """
+    タスクを完了状態に変更します。
+
+    Args:
+        task_id: 完了するタスクのID
+    """
+    for task in tasks:
+        if task["id"] == task_id:
+            task["completed"] = True
+            return task
+    return {"error": "タスクが見つかりません"}
+
+
+class ProductReview(BaseModel):
+    product_name: str = Field(description="レビュー対象の商品名")
+    rating: int = Field(description="評価（1-5の整数）", ge=1, le=5)
+    pros: List[str] = Field(description="商品の良い点のリスト")
+    cons: List[str] = Field(description="商品の改善点のリスト")
+    summary: str = Field(description="レビューの要約")
+    recommendation: bool = Field(description="他の人にお勧めするかどうか")
+
+
+@input_guardrail
+def block_personal_info(ctx, agent, input) -> GuardrailFunctionOutput:
+    text = input if isinstance(input, str) else json.dumps(input, ensure_ascii=False)
+    return GuardrailFunctionOutput(
+        output_info=None, tripwire_triggered="電話番号" in text or "住所" in text
+    )
+
+
+class LoggingHooks(RunHooks):
+    def __init__(self):
+        self.events: List[str] = []
+
+    async def on_tool_start(self, context, agent, tool):
+        self.events.append(f"tool_start:{tool.name}")
+
+    async def on_tool_end(self, context, agent, tool, result):
+        self.events.append(f"tool_end:{tool.name}:{len(str(result))}")
+
+
+# 指定された順にツール呼び出しと最終応答を返すローカルスタブモデル（応答ごとに latency 秒待つ）
+class ScriptedStubModel(StubModelBase):
+    def __init__(self, script: List[Any], latency: float = 0.05):
+        self.script = script
+        self.latency = latency
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        await asyncio.sleep(self.latency)
+        turn = sum(1 for item in input if item.get("type") == "function_call_output")
+        step = self.script[min(turn, len(self.script) - 1)]
+        if isinstance(step, tuple):
+            name, arguments = step
+            output = [
+                ResponseFunctionToolCall(
+                    type="function_call",
+                    id=f"fc_{turn}",
+                    call_id=f"call_{turn}",
+                    name=name,
+                    arguments=json.dumps(arguments),
+                    status="completed",
+                )
+            ]
+        else:
+            output = [
+                ResponseOutputMessage(
+                    id=f"msg_{turn}",
+                    type="message",
+                    role="assistant",
+                    status="completed",
+                    content=[ResponseOutputText(type="output_text", text=step, annotations=[])],
+                )
+            ]
+        return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+
+async def run_demo():
+    set_tracing_disabled(True)
+    task_agent = Agent(
+        name="Task Manager",
+        instructions="あなたはタスク管理アシスタントです。",
+        model=ScriptedStubModel(
+            [("get_all_tasks", {}), ("complete_task", {"task_id": 2}), ("get_all_tasks", {}), "完了しました。"]
+        ),
+        tools=[get_all_tasks, complete_task],
+        input_guardrails=[block_personal_info],
+    )
+    review = ProductReview(
+        product_name="ワイヤレスイヤホン",
+        rating=4,
+        pros=["音質が良い"] * 20,
+        cons=["ケースが大きい"] * 20,
+        summary="全体的に満足度の高い商品です。" * 10,
+        recommendation=True,
+    )
+    review_agent = Agent(
+        name="Review Agent",
+        instructions="商品レビューを構造化して返してください。",
+        model=ScriptedStubModel([review.model_dump_json()]),
+        output_type=ProductReview,
+    )
+
+    print("【Usecase-017: Run Profiler の活用】")
+    print("実行時間をモデルの待ち時間とクライアント側の処理に振り分ける例")
+    print("-" * 40)
+
+    hooks = LoggingHooks()
+    profiler = RunProfiler(sampling=True)
+    result = await profiler.run(task_agent, "タスクID 2を完了にしてください。", hooks=hooks)
+    print("Task Manager:", result.final_output)
+    print(profiler.report())
+    print("I/O 待ち以外で多くサンプルされた関数:")
+    for function, count in profiler.sampler.top_functions():
+        print(f"  {count:4d} {function}")
+    print("-" * 40)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # cProfile で計測し、pstats 形式で書き出す
+        profiler = RunProfiler(use_cprofile=True)
+        result = await profiler.run(review_agent, "ワイヤレスイヤホンのレビューを書いてください。")
+        print("Review Agent:", result.final_output.product_name, result.final_output.rating)
+        print(profiler.report())
+        path = os.path.join(directory, "review_agent.pstats")
+        profiler.write_profile(path)
+        print("cProfile（I/O 待ちを除いた tottime 上位）:")
+        stats = pstats.Stats(path)
+        busy = [
+            (key, row)
+            for key, row in stats.stats.items()
+            if not any(name in key[2] for name in ("poll", "select"))
+        ]
+        for (filename, _, function), row in sorted(busy, key=lambda item: -item[1][2])[:5]:
+            print(f"  {row[2] * 1000:6.2f}ms {os.path.basename(filename)}:{function}")
+        print("-" * 40)
+
+        # 複数回の実行をまとめてサンプリングし、collapsed 形式で書き出す
+        profiler = RunProfiler(sampling=True)
+        for _ in range(20):
+            await profiler.run(task_agent, "タスクID 2を完了にしてください。", hooks=hooks)
+        path = os.path.join(directory, "task_agent.collapsed")
+        profiler.write_profile(path)
+        with open(path, encoding="utf-8") as f:
+            stacks = f.readlines()
+        print(f"20回分のスタックを書き出しました: {len(stacks)} 種類のスタック")
+        print("（flamegraph.pl task_agent.collapsed > flame.svg または speedscope で表示できます）")
+        print(profiler.report())
+        print("I/O 待ち以外で多くサンプルされた関数:")
+        for function, count in profiler.sampler.top_functions():
+            print(f"  {count:4d} {function}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_demo())
+
+    # 例として期待される出力：
+    # Task Manager: 完了しました。
+    # 経過時間: 316.8ms
+    #   モデルの待ち時間        207.6ms  65.5%
+    #   ツールの実行            2.2ms   0.7%
+    #   出力のパース            0.0ms   0.0%
+    #   ガードレール            0.0ms   0.0%
+    #   フック               0.6ms   0.2%
+    #   SDK の処理         106.3ms  33.6%
+    # I/O 待ち以外で多くサンプルされた関数:
+    #      1 _dataclasses.py:__init__
+    #      1 <frozen _collections_abc>:__subclasshook__
+    #      1 <frozen importlib._bootstrap_external>:_path_stat
+    #      1 selector_events.py:_write_to_self
+    #      1 tasks.py:_ensure_future
+    # ----------------------------------------
+    # Review Agent: ワイヤレスイヤホン 4
+    # 経過時間: 60.5ms
+    #   モデルの待ち時間         50.7ms  83.9%
+    #   ツールの実行            0.0ms   0.0%
+    #   出力のパース            0.3ms   0.5%
+    #   ガードレール            0.0ms   0.0%
+    #   フック               0.0ms   0.0%
+    #   SDK の処理           9.4ms  15.6%
+    # cProfile（I/O 待ちを除いた tottime 上位）:
+    #     0.55ms run.py:_run_impl
+    #     0.40ms base_events.py:_run_once
+    #     0.34ms ~:<method 'validate_python' of 'pydantic_core._pydantic_core.SchemaValidator' objects>
+    #     0.30ms events.py:__init__
+    #     0.29ms run.py:run
+    # ----------------------------------------
+    # 20回分のスタックを書き出しました: 48 種類のスタック
+    # （flamegraph.pl task_agent.collapsed > flame.svg または speedscope で表示できます）
+    # 経過時間: 4401.2ms
+    #   モデルの待ち時間       4035.0ms  91.7%
+    #   ツールの実行           22.0ms   0.5%
+    #   出力のパース            0.0ms   0.0%
+    #   ガードレール            0.3ms   0.0%
+    #   フック              11.5ms   0.3%
+    #   SDK の処理         332.4ms   7.6%
+    # I/O 待ち以外で多くサンプルされた関数:
+    #      4 items.py:_convert_tool_output
+    #      4 _tool_invocation.py:_fingerprint
+    #      4 encoder.py:iterencode
+    #      3 <frozen abc>:__instancecheck__
+    #      3 _asyncio_tasks.py:gather_with_cancel
@@ -0,0 +1,108 @@
+# showroom/usecase-018/benchmark.py
+# ツールの多い usecase-001 / usecase-009 を新しいプロセスで読み込み、起動時間を比較します
+# - function_tool : キャッシュなし（通常どおり）
+# - キャッシュ cold: 空のディスクキャッシュ（スキーマを作って保存する）
+# - キャッシュ warm: 別のワーカーが保存したディスクキャッシュから読み込む
+# 最後に、複数のワーカーが同時に同じキャッシュファイルへ書き込んでもエントリが失われないことを確認します
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+WORKER = """
+import json, sys, time
+started = time.perf_counter()
+import agents
+sdk_loaded = time.perf_counter()
+import main
+mode, number, path = sys.argv[1:4]
+if mode != "off":
+    main.install(main.ToolSchemaCache(path))
+cache_ready = time.perf_counter()
+main.load_usecase(number)
+main.uninstall()  # 新しいスキーマをディスクに書き込む（cold ではこの時間も含める）
+finished = time.perf_counter()
+print(json.dumps({
+    "sdk": sdk_loaded - started,
+    "usecase": finished - cache_ready,
+    "total": finished - started,
+}))
+"""
+
+
+def spawn(mode: str, number: str, path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER, mode, number, path],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(mode: str, number: str, directory: str, repeat: int) -> dict:
+    samples = []
+    for i in range(repeat):
+        path = os.path.join(directory, f"{mode}-{number}.json")
+        if mode == "cold" and os.path.exists(path):
+            os.remove(path)  # 毎回空のキャッシュから始める
+        samples.append(spawn(mode, number, path))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main(repeat: int = 5):
+    print("【Usecase-018 ベンチマーク: ツールの多いユースケースの起動時間】")
+    print(f"（新しいプロセスで {repeat} 回ずつ読み込んだ中央値）")
+    with tempfile.TemporaryDirectory() as directory:
+        for number in ["001", "009"]:
+            # warm 用のキャッシュを事前に作っておく
+            spawn("warm", number, os.path.join(directory, f"warm-{number}.json"))
+            print(f"\nusecase-{number}:")
+            for mode, label in [
+                ("off", "function_tool"),
+                ("cold", "キャッシュ cold"),
+                ("warm", "キャッシュ warm"),
+            ]:
+                result = measure(mode, number, directory, repeat)
+                print(
+                    f"  {label:<16}: モジュールの読み込み {result['usecase'] * 1000:6.1f}ms"
+                    f"  （agents の import を含む全体 {result['total'] * 1000:7.1f}ms）"
+                )
+
+        # usecase-001（1ツール）と usecase-009（6ツール）のワーカーを同時に起動し、同じファイルに書き込む
+        path = os.path.join(directory, "shared.json")
+        counts = []
+        for _ in range(repeat):
+            if os.path.exists(path):
+                os.remove(path)
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(lambda number: spawn("cold", number, path), ["001", "009"] * 2))
+            with open(path, encoding="utf-8") as f:
+                counts.append(len(json.load(f)))
+        print(f"\n同時に書き込んだキャッシュのエントリ数: {counts}（期待値 7）")
+
+
+if __name__ == "__main__":
+    main()
+
+    # 例として期待される出力：
+    # （新しいプロセスで 5 回ずつ読み込んだ中央値）
+    #
+    # usecase-001:
+    #   function_tool   : モジュールの読み込み    3.4ms  （agents の import を含む全体  2406.6ms）
+    #   キャッシュ cold      : モジュールの読み込み    3.2ms  （agents の import を含む全体  2266.2ms）
+    #   キャッシュ warm      : モジュールの読み込み    1.4ms  （agents の import を含む全体  2704.1ms）
+    #
+    # usecase-009:
+    #   function_tool   : モジュールの読み込み    8.8ms  （agents の import を含む全体  2512.8ms）
+    #   キャッシュ cold      : モジュールの読み込み    9.5ms  （agents の import を含む全体  2064.8ms）
+    #   キャッシュ warm      : モジュールの読み込み    2.1ms  （agents の import を含む全体  1804.1ms）
+    #
+    # 同時に書き込んだキャッシュのエントリ数: [7, 7, 7, 7, 7]（期待値 7）
+    # （起動時間の大半は agents 自体の import で、スキーマのキャッシュで減るのはモジュールの読み込み部分）
@@ -0,0 +1,376 @@
+# showroom/usecase-018/main.py
+from agents import (
+    FunctionTool,
+    ModelResponse,
+    Runner,
+    Usage,
+    set_tracing_disabled,
+)
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from typing import Any, Callable, Dict, Optional
+import agents
+import asyncio
+import atexit
+import hashlib
+import importlib.util
+import inspect
+import json
+import linecache
+import os
+import sys
+import tempfile
+import time
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Tool Schema Cache: @function_tool のスキーマ生成をキャッシュして起動を速くする機能
+# @function_tool はインポート時にシグネチャと docstring を解析し、Pydantic モデルと
+# strict な JSON スキーマを作ります。ここでは関数の修飾名とソースのハッシュをキーに
+# 名前・説明・JSON スキーマをキャッシュし、Pydantic モデルは最初の呼び出しまで作りません
+# ディスクにも保存するので、短命なワーカーは起動時にそこから読み込めます（起動時間の比較は benchmark.py）
+# 新しいエントリはメモリにためておき、uninstall() かプロセスの終了時にまとめて書き込みます
+
+SHOWROOM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# install() で差し替える前の function_tool
+_original_function_tool = agents.function_tool
+
+# スキーマに影響し、キャッシュのキーに含められる引数
+CACHEABLE_OPTIONS = {
+    "name_override",
+    "description_override",
+    "docstring_style",
+    "use_docstring_info",
+    "strict_mode",
+}
+
+
+def _sdk_version() -> str:
+    from importlib.metadata import version
+
+    return version("openai-agents")
+
+
+@contextmanager
+def _file_lock(path: str):
+    # 同じキャッシュファイルに書き込むプロセスどうしを排他する（fcntl のない Windows ではロックしない）
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_entries(path: str) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return {}  # 壊れたキャッシュは作り直す
+
+
+# 関数ごとのスキーマをメモリとディスク（1つの JSON ファイル）に保持するキャッシュ
+class ToolSchemaCache:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # まだディスクに書き込んでいないエントリ
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.sdk_version = _sdk_version()
+        if path:
+            self.entries = _read_entries(path)
+
+    @staticmethod
+    def source_of(func: Callable) -> Optional[str]:
+        # inspect.getsource はトークン解析が重いので、コードオブジェクトの行番号の範囲から
+        # ソースを切り出す（co_firstlineno はデコレータの行から始まる）
+        code = getattr(inspect.unwrap(func), "__code__", None)
+        if code is None:
+            return None
+        lines = linecache.getlines(code.co_filename)
+        if not lines:
+            return None  # REPL などソースが取得できない関数はキャッシュしない
+        if hasattr(code, "co_positions"):  # Python 3.11+ は式の終了行まで分かる
+            ends = (end for _, end, _, _ in code.co_positions() if end)
+        else:
+            ends = (line for _, _, line in code.co_lines() if line)
+        last = max(ends, default=code.co_firstlineno)
+        return "".join(lines[code.co_firstlineno - 1 : last])
+
+    def key_for(self, func: Callable, options: Dict[str, Any]) -> Optional[str]:
+        source = self.source_of(func)
+        if source is None:
+            return None
+        digest = hashlib.sha256(
+            f"{self.sdk_version}\x00{sorted(options.items())!r}\x00{source}".encode("utf-8")
+        ).hexdigest()
+        return f"{func.__module__}.{func.__qualname__}:{digest[:32]}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, tool: FunctionTool):
+        # ツールごとにファイル全体を書き直すと O(n^2) になるので、ここではメモリに追加するだけ
+        entry = {
+            "name": tool.name,
+            "description": tool.description,
+            "params_json_schema": tool.params_json_schema,
+            "strict_json_schema": tool.strict_json_schema,
+        }
+        self.entries[key] = entry
+        if self.path:
+            self.pending[key] = entry
+
+    def flush(self):
+        """まだ書き込んでいないエントリをディスクのキャッシュにまとめて書き込みます。"""
+        if not self.path or not self.pending:
+            return
+        # 他のワーカーが書き込んだエントリを消さないよう、ロックを取ってから読み直して合わせる
+        with _file_lock(self.path):
+            entries = _read_entries(self.path)
+            entries.update(self.pending)
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=".tool_schemas.", dir=os.path.dirname(os.path.abspath(self.path))
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        self.entries.update(entries)
+        self.pending.clear()
+
+
+# 最初に呼び出されたときに通常の function_tool でツールを作り、以降はそれに委譲する
+class _LazyToolInvoker:
+    def __init__(self, build: Callable[[], FunctionTool]):
+        self._build = build
+        self._tool: Optional[FunctionTool] = None
+
+    async def __call__(self, ctx, input: str) -> Any:
+        if self._tool is None:
+            self._tool = self._build()
+        return await self._tool.on_invoke_tool(ctx, input)
+
+
+_default_cache = ToolSchemaCache()
+
+
+def cached_function_tool(func=None, *, cache: Optional[ToolSchemaCache] = None, **kwargs):
+    """@function_tool と同じように使えるデコレータ。スキーマをキャッシュから取得します。"""
+
+    def decorator(f):
+        target_cache = cache or _default_cache
+        if set(kwargs) - CACHEABLE_OPTIONS:
+            # ガードレールやタイムアウトなどを指定したツールは通常どおり作る
+            return _original_function_tool(f, **kwargs)
+        key = target_cache.key_for(f, kwargs)
+        if key is None:
+            return _original_function_tool(f, **kwargs)
+
+        entry = target_cache.get(key)
+        if entry is None:
+            tool = _original_function_tool(f, **kwargs)
+            target_cache.put(key, tool)
+            return tool
+        return FunctionTool(
+            name=entry["name"],
+            description=entry["description"],
+            params_json_schema=entry["params_json_schema"],
+            strict_json_schema=entry["strict_json_schema"],
+            on_invoke_tool=_LazyToolInvoker(lambda: _original_function_tool(f, **kwargs)),
+        )
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def install(cache: Optional[ToolSchemaCache] = None):
+    """
+    以降にインポートされるモジュールの `from agents import function_tool` を
+    キャッシュ付きのデコレータに差し替えます。既存のコードを変更せずに使えます。
+    新しいスキーマは uninstall() かプロセスの終了時にディスクへ書き込まれます。
+    """
+    global _default_cache
+    if cache is not None:
+        _default_cache.flush()
+        _default_cache = cache
+        atexit.register(cache.flush)
+    agents.function_tool = cached_function_tool
+
+
+def uninstall():
+    agents.function_tool = _original_function_tool
+    _default_cache.flush()
+
+
+def load_usecase(number: str):
+    # showroom/usecase-XXX/main.py を別名のモジュールとして読み込む
+    path = os.path.join(SHOWROOM_DIR, f"usecase-{number}", "main.py")
+    spec = importlib.util.spec_from_file_location(f"usecase_{number}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# get_weather を呼び出してから応答するローカルスタブモデル
+class WeatherStubModel(StubModelBase):
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        outputs = [item for item in input if item.get("type") == "function_call_output"]
+        if not outputs:
+            output = ResponseFunctionToolCall(
+                type="function_call",
+                id="fc_stub",
+                call_id="call_stub",
+                name="get_weather",
+                arguments=json.dumps({"city": "東京"}, ensure_ascii=False),
+                status="completed",
+            )
+        else:
+            output = ResponseOutputMessage(
+                id="msg_stub",
+                type="message",
+                role="assistant",
+                status="completed",
+                content=[
+                    ResponseOutputText(
+                        type="output_text", text=str(outputs[-1]["output"]), annotations=[]
+                    )
+                ],
+            )
+        return ModelResponse(output=[output], usage=Usage(requests=1), response_id=None)
+
+
+TASK_TOOLS = ["get_all_tasks", "get_task", "get_tasks", "add_task", "complete_task", "complete_tasks"]
+
+
+# 定義コストの計測用（usecase-009 の get_task と同じ形の関数）
+def get_task(task_id: int) -> Dict:
+    """
+    指定されたIDのタスクを取得します。
+
+    Args:
+        task_id: 取得するタスクのID
+    """
+    return {"id": task_id}
+
+
+def tool_definition_cost(decorator, func, repeat: int = 200) -> float:
+    # 1つのツールを定義するのにかかる時間（マイクロ秒）
+    started = time.perf_counter()
+    for _ in range(repeat):
+        decorator(func)
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+async def run_demo():
+    set_tracing_disabled(True)
+    print("【Usecase-018: Tool Schema Cache の活用】")
+    print("function_tool のスキーマをキャッシュして起動を速くする例")
+    print("-" * 40)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tool_schemas.json")
+
+        # 1. 空のキャッシュで usecase-001 / usecase-009 を読み込む（スキーマを作ってディスクに保存）
+        #    2つのワーカーが同じファイルに同時に書き込む場合を想定して、別々のキャッシュで読み込む
+        cold_001 = ToolSchemaCache(path)
+        cold_009 = ToolSchemaCache(path)
+        install(cold_001)
+        load_usecase("001")
+        install(cold_009)
+        load_usecase("009")
+        uninstall()  # ワーカーの終了時と同じく、ここでまとめてディスクに書き込む
+        misses = cold_001.misses + cold_009.misses
+        print(f"1回目の読み込み: hit={cold_001.hits + cold_009.hits} miss={misses}")
+
+        # 2. 新しいワーカーを想定して、ディスクのキャッシュから読み込む
+        warm = ToolSchemaCache(path)
+        install(warm)
+        usecase_001 = load_usecase("001")
+        usecase_009 = load_usecase("009")
+        print(f"2回目の読み込み: hit={warm.hits} miss={warm.misses}")
+        uninstall()
+
+        # キャッシュから作ったツールのスキーマが通常のものと一致するか確認
+        plain_009 = load_usecase("009")
+        same = all(
+            getattr(usecase_009, name).params_json_schema
+            == getattr(plain_009, name).params_json_schema
+            and getattr(usecase_009, name).description == getattr(plain_009, name).description
+            for name in TASK_TOOLS
+        )
+        print(f"キャッシュから作ったスキーマが通常と一致: {same}")
+
+        # キャッシュから作ったツールも通常どおり実行できる（Pydantic モデルはここで初めて作られる）
+        agent = usecase_001.agent.clone(model=WeatherStubModel())
+        result = await Runner.run(agent, "東京の天気を教えてください")
+        print(f"usecase-001 の get_weather を実行: {result.final_output}")
+        print("-" * 40)
+
+        # 3. ツール1つを定義するコスト
+        uncached = tool_definition_cost(_original_function_tool, get_task)
+        cached = tool_definition_cost(lambda f: cached_function_tool(f, cache=warm), get_task)
+        print("ツール1つを定義するコスト:")
+        print(f"  function_tool        : {uncached:7.1f} µs")
+        print(f"  cached_function_tool : {cached:7.1f} µs")
+        warm.flush()  # 一時ディレクトリを消す前に書き込んでおく
+
+
+if __name__ == "__main__":
+    asyncio.run(run_demo())
+
+    # 例として期待される出力：
+    # 1回目の読み込み: hit=0 miss=7
+    # 2回目の読み込み: hit=7 miss=0
+    # キャッシュから作ったスキーマが通常と一致: True
+    # usecase-001 の get_weather を実行: 東京 の天気は晴れです
+    # ----------------------------------------
+    # ツール1つを定義するコスト:
+    #   function_tool        :   872.9 µs
+    #   cached_function_tool :    42.8 µs
@@ -0,0 +1,96 @@
+# showroom/usecase-019/benchmark.py
+# 短いジョブ（main.py）を CLI から起動したときの待ち時間を比較します
+# - cold  : python showroom/usecase-019/main.py（毎回 agents などを import する）
+# - daemon: python -m showroom 019（事前に fork されたウォームなワーカーで実行する）
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+SHOWROOM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(SHOWROOM_DIR)
+
+
+def timed(command: List[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(command, cwd=REPO_DIR, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - started
+
+
+def summary(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p90 = samples[int(len(samples) * 0.9) - 1]
+    return f"p50 {statistics.median(samples) * 1000:7.1f}ms  p90 {p90 * 1000:7.1f}ms"
+
+
+def wait_for_socket(path: str, daemon: subprocess.Popen, timeout: float = 60.0):
+    # ソケットのファイルは listen() より前に作られるので、接続できるまで待つ
+    # （接続できないうちにクライアントを起動すると、デーモンを使わずに実行されてしまう）
+    # 確認の接続を受けたワーカーは何も実行せずに終了し、デーモンが新しいワーカーを fork する
+    deadline = time.monotonic() + timeout
+    while True:
+        if daemon.poll() is not None:
+            raise RuntimeError("デーモンが終了しました")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise TimeoutError("デーモンが起動しませんでした")
+            time.sleep(0.05)
+        finally:
+            probe.close()
+
+
+def main(repeat: int = 10, burst: int = 8, workers: int = 4):
+    print("【Usecase-019 ベンチマーク: コールドスタート vs ウォームなデーモン】")
+    print(f"（各 {repeat} 回、逐次実行）")
+
+    floor = [timed([sys.executable, "-c", "pass"]) for _ in range(repeat)]
+    cold = [timed([sys.executable, "showroom/usecase-019/main.py"]) for _ in range(repeat)]
+    print(f"  Python の起動のみ         : {summary(floor)}")
+    print(f"  cold（main.py を直接実行）: {summary(cold)}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "showroom.sock")
+        started = time.perf_counter()
+        daemon = subprocess.Popen(
+            [sys.executable, "-m", "showroom", "daemon", "--socket", socket_path,
+             "--workers", str(workers)],
+            cwd=REPO_DIR,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_socket(socket_path, daemon)
+            print(f"  （デーモンの起動: {time.perf_counter() - started:.2f}秒、ワーカー {workers} 個）")
+            client = [sys.executable, "-m", "showroom", "019", "--socket", socket_path]
+            warm = [timed(client) for _ in range(repeat)]
+            print(f"  daemon（python -m showroom）: {summary(warm)}")
+
+            # 同時に burst 件のリクエストを送る（ワーカーの数だけ並行に処理される）
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=burst) as pool:
+                list(pool.map(lambda _: timed(client), range(burst)))
+            print(f"  daemon に {burst} 件同時    : 全体 {(time.perf_counter() - started) * 1000:7.1f}ms")
+        finally:
+            daemon.send_signal(signal.SIGTERM)
+            daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
+
+    # 例として期待される出力：
+    # （各 10 回、逐次実行）
+    #   Python の起動のみ         : p50    57.0ms  p90    58.4ms
+    #   cold（main.py を直接実行）: p50  2615.9ms  p90  2807.4ms
+    #   （デーモンの起動: 1.86秒、ワーカー 4 個）
+    #   daemon（python -m showroom）: p50    83.8ms  p90    86.6ms
+    #   daemon に 8 件同時    : 全体   805.0ms
@@ -0,0 +1,75 @@
+# showroom/usecase-019/main.py
+from agents import Agent, Runner, ModelResponse, Usage, set_tracing_disabled
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from dotenv import load_dotenv
+import os
+import sys
+import time
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Launcher: CLI から呼ばれる短いジョブを、ウォームなデーモンで実行する例
+# このジョブ自体の処理は数ミリ秒ですが、`python showroom/usecase-019/main.py` で起動すると
+# agents などの import に数秒かかります。`python -m showroom daemon` を起動しておくと、
+# `python -m showroom 019` は事前に import 済みのワーカーで実行されます（比較は benchmark.py）
+
+
+# 問い合わせの種類を即座に返すローカルスタブモデル
+class ClassifierStubModel(StubModelBase):
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        text = input if isinstance(input, str) else str(input[-1].get("content", ""))
+        label = "請求" if "請求" in text or "料金" in text else "技術サポート"
+        message = ResponseOutputMessage(
+            id="msg_stub",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=label, annotations=[])],
+        )
+        return ModelResponse(output=[message], usage=Usage(requests=1), response_id=None)
+
+
+if __name__ == "__main__":
+    set_tracing_disabled(True)
+    agent = Agent(
+        name="Ticket Classifier",
+        instructions="問い合わせを「請求」か「技術サポート」に分類してください。",
+        model=ClassifierStubModel(),
+    )
+
+    query = " ".join(sys.argv[1:]) or "今月の料金が二重に請求されています。"
+    started = time.perf_counter()
+    result = Runner.run_sync(agent, query)
+    elapsed = time.perf_counter() - started
+
+    print("【Usecase-019: Launcher の活用】")
+    print("Query:", query)
+    print("分類:", result.final_output)
+    print(f"ジョブの処理時間: {elapsed * 1000:.1f}ms")
+
+    # 例として期待される出力：
+    # 【Usecase-019: Launcher の活用】
+    # Query: 今月の料金が二重に請求されています。
+    # 分類: 請求
+    # ジョブの処理時間: 4.2ms
@@ -0,0 +1,490 @@
+# showroom/usecase-020/main.py
+from agents import Agent, Runner, ModelResponse, Usage, set_tracing_disabled
+from openai.types.responses import (
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+)
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import gc
+import importlib.util
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+# 共通のスタブモデル（showroom/stub_model.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stub_model import StubModelBase
+
+# Load environment variables
+load_dotenv()
+
+# Set OpenAI API key
+openai_api_key = os.getenv("OPENAI_API_KEY")
+from agents import set_default_openai_key
+
+set_default_openai_key(openai_api_key)
+
+# Load Simulator: 多数のセッションが同時に会話したときのメモリの増え方を測る機能
+# usecase-003 のようにセッションごとに状態を持つエージェントに対して、仮想ユーザーが
+# 考える時間をはさみながら複数ターンの会話を行い、RSS・tracemalloc・イベントループの遅延を
+# 定期的に記録します。最後にセッションあたり・ターンあたりのバイト数を求め、
+# ターン数に比例した増加やセッション終了後に解放されないメモリを警告するレポートを書き出します
+#
+#   python showroom/usecase-020/main.py --users 10000 --turns 10 --think-time 30
+#   python showroom/usecase-020/main.py --mode transcript --tracemalloc  # 増加の大きい行も記録
+
+SHOWROOM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FACT_PATTERN = re.compile(r"私の(\w+?)は(\w+?)です")
+USER_MESSAGES = [
+    "私の名前は田中です。",
+    "今日はいい天気ですね。",
+    "私の趣味は読書です。",
+    "おすすめの本を教えてください。",
+    "私の出身は大阪です。",
+    "週末の予定を考えています。",
+    "私の名前と趣味を教えてください。",
+]
+
+
+def load_usecase(number: str):
+    # showroom/usecase-XXX/main.py を別名のモジュールとして読み込む
+    path = os.path.join(SHOWROOM_DIR, f"usecase-{number}", "main.py")
+    spec = importlib.util.spec_from_file_location(f"usecase_{number}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+usecase_003 = load_usecase("003")
+
+
+# 変更前の usecase-003: 会話履歴をすべて指示に埋め込む
+def get_transcript_instructions(context_wrapper, agent):
+    instructions = "ユーザーの過去の発言や情報を覚えておき、一貫性のある応答を行ってください。\n"
+    for entry in context_wrapper.context["conversation_history"]:
+        role = "ユーザー" if entry["role"] == "user" else "アシスタント"
+        instructions += f"{role}: {entry['content']}\n"
+    return instructions
+
+
+# 少し待ってから応答するローカルスタブモデル
+# ユーザーが事実を述べたときは remember_fact ツールを呼び出す（usecase-003 と同じ）
+class StubModel(StubModelBase):
+    def __init__(self, latency: float = 0.005):
+        self.latency = latency
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        await asyncio.sleep(self.latency)
+        last = input[-1]
+        user_message = last.get("content", "") if last.get("role") == "user" else ""
+        match = FACT_PATTERN.search(user_message)
+        if match and any(tool.name == "remember_fact" for tool in tools):
+            output = ResponseFunctionToolCall(
+                type="function_call",
+                id="fc_stub",
+                call_id="call_stub",
+                name="remember_fact",
+                arguments=json.dumps(
+                    {"key": match.group(1), "value": match.group(2)}, ensure_ascii=False
+                ),
+                status="completed",
+            )
+        else:
+            output = ResponseOutputMessage(
+                id="msg_stub",
+                type="message",
+                role="assistant",
+                status="completed",
+                content=[
+                    ResponseOutputText(
+                        type="output_text",
+                        text="かしこまりました。ご質問の内容について、これまでの会話をふまえてお答えします。",
+                        annotations=[],
+                    )
+                ],
+            )
+        return ModelResponse(output=[output], usage=Usage(requests=1), response_id=None)
+
+
+@dataclass
+class Session:
+    context: Dict[str, Any]
+    results: List[Any] = field(default_factory=list)  # 実行結果を保持するパターンで使う
+    turns: int = 0
+
+
+@dataclass
+class Sample:
+    elapsed: float
+    live_sessions: int
+    turns: int
+    rss: int
+    traced: int
+    blocks: int
+
+
+def current_rss() -> int:
+    # Linux は /proc から現在の RSS を読む。それ以外はピーク値で代用する（Windows では 0）
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def linear_fit(xs: List[float], ys: List[float]) -> Tuple[float, float]:
+    # 最小二乗法の傾きと決定係数 R²
+    if len(xs) < 3 or len(set(xs)) < 2:
+        return 0.0, 0.0
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    slope = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy else 0.0
+    return slope, r2
+
+
+# 仮想ユーザーを同時に実行し、メモリとイベントループの遅延を記録するシミュレータ
+class LoadSimulator:
+    def __init__(
+        self,
+        mode: str = "transcript",
+        users: int = 300,
+        turns: int = 10,
+        think_time: float = 1.0,
+        sample_interval: float = 0.5,
+        use_tracemalloc: bool = False,
+        seed: int = 0,
+    ):
+        self.mode = mode
+        self.users = users
+        self.turns = turns
+        self.think_time = think_time
+        self.sample_interval = sample_interval
+        self.use_tracemalloc = use_tracemalloc
+        self.random = random.Random(seed)
+        self.sessions: List[Session] = []
+        self.samples: List[Sample] = []
+        self.lags: List[float] = []
+        self.completed_turns = 0
+        self.live_sessions = 0
+        self.top_growth: List[str] = []
+
+        model = StubModel()
+        if mode == "transcript":
+            # 変更前の usecase-003: 会話履歴を指示に埋め込み、実行結果もすべて保持する
+            self.agent = Agent(
+                name="Context Agent", instructions=get_transcript_instructions, model=model
+            )
+        else:
+            # 現在の usecase-003: 事実ストアから関連する事実だけを指示に追加する
+            self.agent = Agent(
+                name="Context Agent",
+                instructions=usecase_003.get_instructions,
+                model=model,
+                tools=[usecase_003.remember_fact],
+            )
+
+    def new_session(self) -> Session:
+        if self.mode == "transcript":
+            return Session(context={"conversation_history": []})
+        return Session(context={"facts": usecase_003.FactStore()})
+
+    async def virtual_user(self, session: Session):
+        self.live_sessions += 1
+        for turn in range(self.turns):
+            # 考える時間（指数分布）
+            await asyncio.sleep(self.random.expovariate(1 / self.think_time))
+            query = USER_MESSAGES[turn % len(USER_MESSAGES)]
+            if self.mode == "transcript":
+                result = await Runner.run(self.agent, query, context=session.context)
+                history = session.context["conversation_history"]
+                history.append({"role": "user", "content": query})
+                history.append({"role": "assistant", "content": result.final_output})
+                session.results.append(result)
+            else:
+                await Runner.run(self.agent, query, context=session.context)
+            session.turns += 1
+            self.completed_turns += 1
+        self.live_sessions -= 1
+
+    def sample(self, started: float):
+        traced = tracemalloc.get_traced_memory()[0] if self.use_tracemalloc else 0
+        self.samples.append(
+            Sample(
+                elapsed=time.perf_counter() - started,
+                live_sessions=self.live_sessions,
+                turns=self.completed_turns,
+                rss=current_rss(),
+                traced=traced,
+                blocks=sys.getallocatedblocks(),
+            )
+        )
+
+    async def monitor(self, started: float, done: asyncio.Event):
+        # sleep が予定より遅れて戻った時間をイベントループの遅延として記録する
+        loop = asyncio.get_running_loop()
+        while not done.is_set():
+            expected = loop.time() + self.sample_interval
+            await asyncio.sleep(self.sample_interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+            self.sample(started)
+
+    async def run(self) -> Dict[str, Any]:
+        # 初回実行時の遅延 import やスキーマ構築を計測から除くため、先に1セッション分実行しておく
+        warmup = self.new_session()
+        for query in USER_MESSAGES:
+            await Runner.run(self.agent, query, context=warmup.context)
+        del warmup
+        gc.collect()
+        if self.use_tracemalloc:
+            tracemalloc.start()
+            baseline_snapshot = tracemalloc.take_snapshot()
+        baseline_rss = current_rss()
+        baseline_traced = tracemalloc.get_traced_memory()[0] if self.use_tracemalloc else 0
+        baseline_blocks = sys.getallocatedblocks()
+
+        started = time.perf_counter()
+        done = asyncio.Event()
+        monitor = asyncio.create_task(self.monitor(started, done))
+        self.sessions = [self.new_session() for _ in range(self.users)]
+        await asyncio.gather(*(self.virtual_user(session) for session in self.sessions))
+        done.set()
+        await monitor
+        gc.collect()
+        self.sample(started)
+        final = self.samples[-1]
+        peak_traced = max(s.traced for s in self.samples)
+        peak_rss = max(s.rss for s in self.samples)
+        peak_blocks = max(s.blocks for s in self.samples)
+
+        if self.use_tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            stats = snapshot.compare_to(baseline_snapshot, "lineno")
+            self.top_growth = [
+                f"{stat.size_diff / 1024:10.1f} KiB  "
+                f"{'/'.join(stat.traceback[0].filename.split(os.sep)[-2:])}:{stat.traceback[0].lineno}"
+                for stat in stats[:5]
+            ]
+            del snapshot, stats
+
+        # セッションを破棄した後に残るメモリ（解放されなければリークの可能性）
+        # RSS はアロケータが OS に返さない分を含むため、確保中のブロック数で判定する
+        self.sessions = []
+        gc.collect()
+        residual_traced = tracemalloc.get_traced_memory()[0] if self.use_tracemalloc else 0
+        residual_blocks = sys.getallocatedblocks() - baseline_blocks
+        residual_rss = current_rss()
+        if self.use_tracemalloc:
+            tracemalloc.stop()
+
+        # バイト数は tracemalloc（有効なとき）か RSS から、増加の判定はアロケータに左右されない
+        # 確保中のブロック数（≒ 生きているオブジェクト）の傾きと決定係数から求める
+        turns = [s.turns for s in self.samples]
+        if self.use_tracemalloc:
+            grown = peak_traced - baseline_traced
+            bytes_per_turn, _ = linear_fit(turns, [s.traced for s in self.samples])
+        else:
+            grown = peak_rss - baseline_rss
+            bytes_per_turn, _ = linear_fit(turns, [s.rss for s in self.samples])
+        blocks_per_turn, r2 = linear_fit(turns, [s.blocks for s in self.samples])
+        return {
+            "mode": self.mode,
+            "users": self.users,
+            "turns_per_user": self.turns,
+            "think_time": self.think_time,
+            "seconds": round(final.elapsed, 2),
+            "completed_turns": self.completed_turns,
+            "memory_source": "tracemalloc" if self.use_tracemalloc else "rss",
+            "baseline_rss_mib": round(baseline_rss / 2**20, 1),
+            "peak_rss_mib": round(peak_rss / 2**20, 1),
+            "residual_rss_mib": round(residual_rss / 2**20, 1),
+            "bytes_per_session": round(grown / self.users),
+            "bytes_per_turn": round(bytes_per_turn),
+            "blocks_per_session": round((peak_blocks - baseline_blocks) / self.users, 1),
+            "blocks_per_turn": round(blocks_per_turn, 1),
+            "growth_r2": round(r2, 3),
+            "peak_blocks": peak_blocks - baseline_blocks,
+            "residual_blocks": residual_blocks,
+            "residual_traced_bytes": (residual_traced - baseline_traced) if self.use_tracemalloc else None,
+            "loop_lag_p50_ms": round(statistics.median(self.lags) * 1000, 1) if self.lags else 0.0,
+            "loop_lag_max_ms": round(max(self.lags) * 1000, 1) if self.lags else 0.0,
+            "top_growth": self.top_growth,
+            "timeline": [s.__dict__ for s in self.samples],
+        }
+
+
+def findings(
+    result: Dict[str, Any], per_turn_threshold: float = 10, leak_blocks_threshold: int = 10000
+) -> List[str]:
+    notes = []
+    if result["growth_r2"] >= 0.9 and result["blocks_per_turn"] > per_turn_threshold:
+        notes.append(
+            f"警告: メモリがターン数に比例して増えています（{result['blocks_per_turn']} ブロック, "
+            f"約 {result['bytes_per_turn']:,} bytes/turn, R²={result['growth_r2']}）。"
+            "セッションが長くなるほど際限なく増えます。"
+        )
+    if result["residual_blocks"] > max(leak_blocks_threshold, 0.1 * result["peak_blocks"]):
+        notes.append(
+            f"警告: セッション破棄後も {result['residual_blocks']:,} ブロックが解放されていません（リークの可能性）。"
+        )
+    if result["loop_lag_max_ms"] > 100:
+        notes.append(f"注意: イベントループの遅延が最大 {result['loop_lag_max_ms']}ms に達しました。")
+    if not notes:
+        notes.append("問題は見つかりませんでした。")
+    return notes
+
+
+def write_report(results: List[Dict[str, Any]], path: str):
+    # path が "-" なら標準出力に書き出す
+    lines = ["# 負荷シミュレーションのレポート", ""]
+    for result in results:
+        lines.append(f"## {result['mode']}（{result['users']:,} ユーザー × {result['turns_per_user']} ターン）")
+        lines.append("")
+        for key in [
+            "seconds",
+            "completed_turns",
+            "baseline_rss_mib",
+            "peak_rss_mib",
+            "residual_rss_mib",
+            "memory_source",
+            "bytes_per_session",
+            "bytes_per_turn",
+            "blocks_per_session",
+            "blocks_per_turn",
+            "growth_r2",
+            "peak_blocks",
+            "residual_blocks",
+            "residual_traced_bytes",
+            "loop_lag_p50_ms",
+            "loop_lag_max_ms",
+        ]:
+            lines.append(f"- {key}: {result[key]}")
+        lines.append("")
+        lines.extend(f"> {note}" for note in findings(result))
+        lines.append("")
+        if result["top_growth"]:
+            lines.append("増加の大きい行（tracemalloc）:")
+            lines.append("```")
+            lines.extend(result["top_growth"])
+            lines.append("```")
+            lines.append("")
+        lines.append("| 経過秒 | 進行中 | 完了ターン | RSS MiB | traced MiB |")
+        lines.append("|---:|---:|---:|---:|---:|")
+        for s in result["timeline"]:
+            lines.append(
+                f"| {s['elapsed']:.1f} | {s['live_sessions']} | {s['turns']} | "
+                f"{s['rss'] / 2**20:.1f} | {s['traced'] / 2**20:.1f} |"
+            )
+        lines.append("")
+    if path == "-":
+        print("\n".join(lines))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+async def run_demo(options):
+    set_tracing_disabled(True)
+    print("【Usecase-020: Load Simulator の活用】")
+    print("多数のセッションが同時に会話したときのメモリの増え方を測る例")
+    print("-" * 40)
+
+    results = []
+    # 先に実行したモードが解放したメモリは RSS 上で再利用されるため、増加の小さい facts から測る
+    modes = ["facts", "transcript"] if options.mode == "both" else [options.mode]
+    for mode in modes:
+        simulator = LoadSimulator(
+            mode=mode,
+            users=options.users,
+            turns=options.turns,
+            think_time=options.think_time,
+            use_tracemalloc=options.tracemalloc,
+        )
+        result = await simulator.run()
+        results.append(result)
+        print(f"[{mode}] {result['users']:,} ユーザー × {result['turns_per_user']} ターン: {result['seconds']}秒")
+        print(
+            f"  保持ブロック: セッションあたり {result['blocks_per_session']} / ターンあたり "
+            f"{result['blocks_per_turn']} (R²={result['growth_r2']})"
+        )
+        print(
+            f"  メモリ（{result['memory_source']}）: セッションあたり {result['bytes_per_session']:,} bytes / "
+            f"ターンあたり {result['bytes_per_turn']:,} bytes"
+        )
+        print(
+            f"  RSS {result['baseline_rss_mib']} → {result['peak_rss_mib']} MiB, "
+            f"ループ遅延 p50 {result['loop_lag_p50_ms']}ms / 最大 {result['loop_lag_max_ms']}ms"
+        )
+        for note in findings(result):
+            print(f"  {note}")
+        print("-" * 40)
+
+    write_report(results, options.report)
+    if options.report != "-":
+        print(f"レポートを書き出しました: {options.report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--think-time", type=float, default=1.0, help="考える時間の平均（秒）")
+    parser.add_argument("--mode", choices=["transcript", "facts", "both"], default="both")
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="tracemalloc で増加の大きい行も記録する（実行が数倍遅くなり、ループ遅延も大きくなる）",
+    )
+    parser.add_argument(
+        "--report", default="-", help="Markdown のレポートの出力先（既定は標準出力）"
+    )
+    asyncio.run(run_demo(parser.parse_args()))
+
+    # 例として期待される出力：
+    # 【Usecase-020: Load Simulator の活用】
+    # 多数のセッションが同時に会話したときのメモリの増え方を測る例
+    # ----------------------------------------
+    # [facts] 300 ユーザー × 10 ターン: 24.26秒
+    #   保持ブロック: セッションあたり 24.5 / ターンあたり -16.1 (R²=0.533)
+    #   メモリ（rss）: セッションあたり 29,437 bytes / ターンあたり 936 bytes
+    #   RSS 102.7 → 111.1 MiB, ループ遅延 p50 4.7ms / 最大 107.3ms
+    #   注意: イベントループの遅延が最大 107.3ms に達しました。
+    # ----------------------------------------
+    # [transcript] 300 ユーザー × 10 ターン: 22.32秒
+    #   保持ブロック: セッションあたり 819.2 / ターンあたり 78.5 (R²=0.999)
+    #   メモリ（rss）: セッションあたり 68,116 bytes / ターンあたり 8,176 bytes
+    #   RSS 111.1 → 130.6 MiB, ループ遅延 p50 0.8ms / 最大 105.3ms
+    #   警告: メモリがターン数に比例して増えています（78.5 ブロック, 約 8,176 bytes/turn, R²=0.999）。セッションが長くなるほど際限なく増えます。
+    #   注意: イベントループの遅延が最大 105.3ms に達しました。
+    # ----------------------------------------
+    # # 負荷シミュレーションのレポート
+    #
+    # ## facts（300 ユーザー × 10 ターン）
+    # ...